@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Current Density Benchmark
+###########################
+Times the current density of CH3NH2 (Gaussian 09 outputs shipped in
+exatomic/static) on a cubic grid: symbolic basis functions and gradients with
+the former pairwise (numexpr) kernel against the matrix product formulation
+of :meth:`~exatomic.algorithms.numerical.Shells.current_density` (timed
+including basis function evaluation).
+
+.. code-block:: bash
+
+    python benchmarks/current_density.py        # 41^3 points
+    python benchmarks/current_density.py 21     # 21^3 points
+"""
+import bz2
+import sys
+import numpy as np
+from time import time
+from os.path import abspath, join
+from numexpr import evaluate
+import exatomic
+from exatomic.gaussian import Output
+from exatomic.algorithms.numerical import Shells
+from exatomic.algorithms.orbital_util import (make_fps, numerical_grid_from_field_params,
+                                              gen_bfns, gen_gradients, _evaluate_symbolic)
+
+
+def pairwise_current_density(bvs, gvx, gvy, gvz, cmatr, cmati, occvec):
+    """The former O(nbas^2 npts) kernel (one numexpr update per function pair)."""
+    npts = bvs.shape[1]
+    curx = np.zeros(npts, dtype=np.float64)
+    cury = np.zeros(npts, dtype=np.float64)
+    curz = np.zeros(npts, dtype=np.float64)
+    for mu in range(len(bvs)):
+        for nu in range(len(bvs)):
+            cval = evaluate('-0.5 * (occvec * (crmu * cinu - cimu * crnu))',
+                            local_dict={'occvec': occvec, 'crmu': cmatr[mu], 'cimu': cmati[mu],
+                                        'crnu': cmatr[nu], 'cinu': cmati[nu]}).sum()
+            pair = {'cval': cval, 'bvmu': bvs[mu], 'bvnu': bvs[nu]}
+            for cur, gv in ((curx, gvx), (cury, gvy), (curz, gvz)):
+                pair.update(cur=cur, gvmu=gv[mu], gvnu=gv[nu])
+                evaluate('cur + cval * (bvmu * gvnu - gvmu * bvnu)', local_dict=pair, out=cur)
+    return np.array([curx, cury, curz])
+
+
+def run(name, nr):
+    path = abspath(join(abspath(exatomic.__file__), "../static/gaussian/"))
+    with bz2.open(join(path, name)) as f:
+        uni = Output(f.read().decode('utf-8')).to_universe()
+    x, y, z = numerical_grid_from_field_params(make_fps(rmin=-6, rmax=6, nr=nr))
+    # Complex coefficients from the real MOs and a fixed perturbation
+    cmatr = uni.momatrix.square().values
+    cmati = 0.1 * np.random.RandomState(0).rand(*cmatr.shape)
+    occvec = uni.orbital['occupation'].values.astype(np.float64)
+    t0 = time()
+    bfns = gen_bfns(uni, frame=0)
+    grx, gry, grz = gen_gradients(bfns)
+    bvs = _evaluate_symbolic(bfns, x, y, z)
+    grads = [_evaluate_symbolic(g, x, y, z) for g in (grx, gry, grz)]
+    ref = pairwise_current_density(bvs, *grads, cmatr=cmatr, cmati=cmati, occvec=occvec)
+    t1 = time()
+    shells = Shells.from_universe(uni, frame=0)
+    cur = shells.current_density(x, y, z, cmatr, cmati, occvec, tol=1e-14)
+    t2 = time()
+    print('{:<30} {:>5} functions, {}^3 points: {:7.2f} s -> {:5.2f} s, max abs difference {:.1e}'.format(
+        name, len(bvs), nr, t1 - t0, t2 - t1, np.abs(cur - ref).max()))
+
+
+if __name__ == '__main__':
+    nr = int(sys.argv[1]) if len(sys.argv) > 1 else 41
+    for name in ['g09-ch3nh2-631g.out.bz2', 'g09-ch3nh2-augccpvdz.out.bz2']:
+        run(name, nr)
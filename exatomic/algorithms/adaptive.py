@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Adaptive Grids
+################
+Fields that are only needed for isosurfaces (e.g. molecular orbitals for
+visualization) need not be evaluated on the full, fine grid. The grid is
+split into cubic blocks; the field is first evaluated on the block corners
+(a coarse grid) and only blocks whose corner values straddle one of the
+requested isovalues (and their neighbors) are evaluated on the fine grid.
+
+.. code-block:: Python
+
+    fld = adaptive_field(func, fps, isovalues=[0.03, -0.03])
+    fld.fraction            # Fraction of fine grid points evaluated
+    for i in range(fld.nblock):
+        (sx, sy, sz), vals = fld.block(i)   # Fine values of refined blocks
+    cube = fld.todense()    # Uniform grid (coarse values interpolated elsewhere)
+"""
+import numpy as np
+import pandas as pd
+from scipy.ndimage import binary_dilation
+
+
+def _axis(fps, cart):
+    """Grid coordinates along a Cartesian direction of orthogonal field parameters."""
+    o = fps['o' + cart]
+    n = int(fps['n' + cart])
+    d = fps['d' + cart + {'x': 'i', 'y': 'j', 'z': 'k'}[cart]]
+    return np.linspace(o, o + (n - 1) * d, n)
+
+
+def _coarse_index(n, size):
+    """Fine grid indices of the block corners along one direction."""
+    idx = np.arange(0, n, size)
+    if idx[-1] != n - 1:
+        idx = np.append(idx, n - 1)
+    return idx
+
+
+def _block_slice(idx, b):
+    """
+    Fine grid indices of block b along one direction; blocks own their lower
+    corner only (except for the last block) so that no point is evaluated
+    twice.
+    """
+    return slice(idx[b], idx[b + 1] + (b + 2 == len(idx)))
+
+
+def _interpolation_matrix(n, idx):
+    """Linear interpolation weights (n, len(idx)) from corner indices to all indices."""
+    w = np.zeros((n, len(idx)), dtype=np.float64)
+    fine = np.arange(n)
+    a = np.minimum(np.searchsorted(idx, fine, side='right') - 1, len(idx) - 2)
+    t = (fine - idx[a]) / (idx[a + 1] - idx[a])
+    w[fine, a] = 1 - t
+    w[fine, a + 1] += t
+    return w
+
+
+class BlockField(object):
+    """
+    A field on a uniform grid of which only some cubic blocks are known at
+    full resolution; everywhere else only the values on the block corners
+    (the coarse grid) are known.
+
+    Attributes:
+        fps (:class:`~pandas.Series`): Field parameters of the fine grid
+        size (int): Block edge length (in fine grid points)
+        cidx (tuple): Fine grid indices of the block corners along x, y and z
+        coarse (array): Field values at the block corners
+        blocks (array): Block indices (nblock, 3) of the refined blocks
+        vptr (array): Offsets of the values of each refined block
+        values (array): Values of the refined blocks (x major, flattened)
+    """
+    @property
+    def nblock(self):
+        return len(self.blocks)
+
+    @property
+    def shape(self):
+        return tuple(int(self.fps['n' + c]) for c in 'xyz')
+
+    @property
+    def fraction(self):
+        """Fraction of fine grid points that were evaluated."""
+        return len(self.values) / np.prod(self.shape)
+
+    def extent(self, i):
+        """Fine grid slices (x, y, z) of refined block i."""
+        return tuple(_block_slice(idx, b) for idx, b in zip(self.cidx, self.blocks[i]))
+
+    def block(self, i):
+        """Return the fine grid slices and values (3D) of refined block i."""
+        sl = self.extent(i)
+        shape = tuple(s.stop - s.start for s in sl)
+        return sl, self.values[self.vptr[i]:self.vptr[i + 1]].reshape(shape)
+
+    def todense(self):
+        """
+        Return the values on the full (fine) grid, flattened in the same
+        order as :func:`~exatomic.algorithms.orbital_util.numerical_grid_from_field_params`.
+        Values outside of refined blocks are linearly interpolated from the
+        coarse grid.
+        """
+        shape = self.shape
+        wx, wy, wz = [_interpolation_matrix(n, idx) for n, idx in zip(shape, self.cidx)]
+        dense = np.einsum('ia,abc->ibc', wx, self.coarse)
+        dense = np.einsum('jb,ibc->ijc', wy, dense)
+        dense = np.einsum('kc,ijc->ijk', wz, dense)
+        for i in range(self.nblock):
+            sl, vals = self.block(i)
+            dense[sl] = vals
+        return dense.ravel()
+
+    def __init__(self, fps, size, cidx, coarse, blocks, vptr, values):
+        self.fps = fps
+        self.size = size
+        self.cidx = cidx
+        self.coarse = coarse
+        self.blocks = blocks
+        self.vptr = vptr
+        self.values = values
+
+
+def adaptive_field(func, fps, isovalues, size=8, dilate=1):
+    """
+    Evaluate a field adaptively for the given isovalues.
+
+    The fine grid (given by the field parameters) is split into cubic blocks
+    of size**3 points. The field is evaluated on the block corners and only
+    blocks in which the corner values straddle an isovalue, plus dilate
+    layers of neighboring blocks (to catch features smaller than a block),
+    are evaluated on the fine grid.
+
+    Args:
+        func (callable): Evaluates the field on points, func(x, y, z) -> values
+        fps (:class:`~pandas.Series`): Field parameters of the (orthogonal) fine grid
+        isovalues (list): Isovalue(s) of interest
+        size (int): Block edge length in fine grid points
+        dilate (int): Number of layers of neighboring blocks to refine as well
+
+    Returns:
+        field (:class:`~exatomic.algorithms.adaptive.BlockField`): Adaptively evaluated field
+    """
+    if isinstance(fps, pd.DataFrame):
+        fps = fps.loc[0]
+    axes = [_axis(fps, c) for c in 'xyz']
+    if min(len(ax) for ax in axes) < 2:
+        raise ValueError("Adaptive grids require at least 2 points per direction")
+    cidx = tuple(_coarse_index(len(ax), size) for ax in axes)
+    cx, cy, cz = np.meshgrid(*[ax[idx] for ax, idx in zip(axes, cidx)], indexing='ij')
+    coarse = np.asarray(func(cx.ravel(), cy.ravel(), cz.ravel())).reshape(cx.shape)
+    # Range of the corner values of each block
+    nb = tuple(len(idx) - 1 for idx in cidx)
+    lo = np.full(nb, np.inf)
+    hi = np.full(nb, -np.inf)
+    for di in (0, 1):
+        for dj in (0, 1):
+            for dk in (0, 1):
+                corner = coarse[di:di + nb[0], dj:dj + nb[1], dk:dk + nb[2]]
+                lo = np.minimum(lo, corner)
+                hi = np.maximum(hi, corner)
+    refine = np.zeros(nb, dtype=bool)
+    for iso in np.atleast_1d(isovalues):
+        refine |= (lo <= iso) & (hi >= iso)
+    if dilate and refine.any():
+        refine = binary_dilation(refine, structure=np.ones((3, 3, 3), dtype=bool),
+                                 iterations=dilate)
+    blocks = np.argwhere(refine)
+    # Fine grid points of all refined blocks
+    pts, sizes = [], []
+    for b in blocks:
+        sl = [ax[_block_slice(idx, i)] for ax, idx, i in zip(axes, cidx, b)]
+        px, py, pz = np.meshgrid(*sl, indexing='ij')
+        pts.append(np.stack([px.ravel(), py.ravel(), pz.ravel()]))
+        sizes.append(px.size)
+    vptr = np.zeros((len(blocks) + 1, ), dtype=np.int64)
+    vptr[1:] = np.cumsum(sizes)
+    if len(blocks):
+        pts = np.concatenate(pts, axis=1)
+        values = np.asarray(func(pts[0], pts[1], pts[2]), dtype=np.float64)
+    else:
+        values = np.empty((0, ), dtype=np.float64)
+    return BlockField(fps, size, cidx, coarse, blocks, vptr, values)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Structural Alignment
+######################
+Optimal (least squares) superposition of structures using the Kabsch
+algorithm. Functions here operate on arrays of shape (nframes, natoms, 3)
+(see :meth:`~exatomic.core.atom.Atom.trajectory_array`) so that every frame
+of a trajectory is aligned in a single vectorized operation.
+
+.. code-block:: Python
+
+    rmsd = trajectory_rmsd(uni)                         # RMSD to the first frame
+    rmsd, atom = trajectory_rmsd(uni, aligned=True)     # ...and aligned positions
+    mat = trajectory_rmsd_matrix(uni, symbols=['C'])    # Pairwise frame RMSD
+"""
+import numpy as np
+import pandas as pd
+import numba as nb
+from exatomic.base import sym2mass
+
+
+def kabsch(xyz, ref, weights=None):
+    """
+    Compute optimal rotations superposing each frame onto a reference.
+
+    Args:
+        xyz (array): Positions of shape (nframes, natoms, 3)
+        ref (array): Reference positions of shape (natoms, 3)
+        weights (array): Per atom weights (default uniform)
+
+    Returns:
+        rot (array): Rotation matrices of shape (nframes, 3, 3)
+        com (array): Weighted centroids of each frame, shape (nframes, 3)
+        refcom (array): Weighted centroid of the reference
+
+    Note:
+        Aligned positions are given by ``(xyz - com[:, None]) @ rot + refcom``.
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    ref = np.asarray(ref, dtype=np.float64)
+    w = np.ones(xyz.shape[1]) if weights is None else np.asarray(weights, dtype=np.float64)
+    w = w / w.sum()
+    com = np.einsum('fai,a->fi', xyz, w)
+    refcom = np.dot(w, ref)
+    h = np.einsum('fai,a,aj->fij', xyz - com[:, None], w, ref - refcom)
+    u, s, vt = np.linalg.svd(h)
+    d = np.sign(np.linalg.det(np.matmul(u, vt)))
+    u[:, :, 2] *= d[:, None]
+    return np.matmul(u, vt), com, refcom
+
+
+def superpose(xyz, ref, weights=None, aligned=False):
+    """
+    Superpose each frame onto a reference structure (batched Kabsch).
+
+    Args:
+        xyz (array): Positions of shape (nframes, natoms, 3)
+        ref (array): Reference positions of shape (natoms, 3)
+        weights (array): Per atom weights (default uniform)
+        aligned (bool): Also return the aligned positions
+
+    Returns:
+        rmsd (array): Root mean squared deviation per frame
+        xyz (array): Aligned positions (only if aligned is True)
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    w = np.ones(xyz.shape[1]) if weights is None else np.asarray(weights, dtype=np.float64)
+    rot, com, refcom = kabsch(xyz, ref, w)
+    fit = np.matmul(xyz - com[:, None], rot) + refcom
+    rmsd = np.sqrt(np.einsum('fai,a->f', (fit - ref)**2, w) / w.sum())
+    if aligned:
+        return rmsd, fit
+    return rmsd
+
+
+@nb.jit(nopython=True, nogil=True, parallel=True)
+def _pairwise_rmsd(xyz, w):
+    """Pairwise RMSD between centered, weight normalized frames."""
+    n = xyz.shape[0]
+    g = np.empty((n, ), dtype=np.float64)
+    for i in range(n):
+        g[i] = (w * (xyz[i]**2).sum(axis=1)).sum()
+    out = np.zeros((n, n), dtype=np.float64)
+    for i in nb.prange(n):
+        wi = xyz[i] * w.reshape(-1, 1)
+        for j in range(i + 1, n):
+            h = np.dot(wi.T, xyz[j])
+            s = np.linalg.svd(h)[1]
+            if np.linalg.det(h) < 0:
+                s[2] = -s[2]
+            msd = g[i] + g[j] - 2*s.sum()
+            out[i, j] = np.sqrt(max(msd, 0.0))
+            out[j, i] = out[i, j]
+    return out
+
+
+def pairwise_rmsd(xyz, weights=None):
+    """
+    Compute the (optimally superposed) RMSD between all pairs of frames.
+
+    Pairs are computed in parallel; each pair requires only a 3x3 singular
+    value decomposition of the cross-covariance of the centered frames.
+
+    Args:
+        xyz (array): Positions of shape (nframes, natoms, 3)
+        weights (array): Per atom weights (default uniform)
+
+    Returns:
+        rmsd (array): Symmetric matrix of shape (nframes, nframes)
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    w = np.ones(xyz.shape[1]) if weights is None else np.asarray(weights, dtype=np.float64)
+    w = w / w.sum()
+    xyz = xyz - np.einsum('fai,a->fi', xyz, w)[:, None]
+    return _pairwise_rmsd(np.ascontiguousarray(xyz), w)
+
+
+def _selection(universe, symbols, mass):
+    """Boolean atom selection (per frame) and weights."""
+    first = universe.atom['frame'].astype(np.int64).min()
+    atom = universe.atom[universe.atom['frame'].astype(np.int64) == first]
+    sym = atom['symbol'].astype(str)
+    mask = np.ones(len(atom), dtype=bool) if symbols is None else sym.isin(symbols).values
+    weights = sym.map(sym2mass).values[mask] if mass else None
+    return mask, weights
+
+
+def trajectory_rmsd(universe, ref_frame=None, symbols=None, mass=False,
+                    aligned=False):
+    """
+    RMSD of each frame of a trajectory with respect to a reference frame.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Universe with a trajectory
+        ref_frame (int): Reference frame (default first frame)
+        symbols (list): Only use these atom symbols for fitting (default all atoms)
+        mass (bool): Use mass weighted fitting (default false)
+        aligned (bool): Also return an atom table with aligned positions
+
+    Returns:
+        rmsd (:class:`~pandas.Series`): RMSD indexed by frame
+        atom (:class:`~exatomic.core.atom.Atom`): Aligned atom table (only if aligned is True)
+    """
+    xyz = universe.atom.trajectory_array()
+    frames = np.sort(universe.atom['frame'].astype(np.int64).unique())
+    ref = 0 if ref_frame is None else np.where(frames == ref_frame)[0][0]
+    mask, weights = _selection(universe, symbols, mass)
+    sel = xyz[:, mask]
+    rmsd = pd.Series(superpose(sel, sel[ref], weights), index=frames)
+    rmsd.index.name = 'frame'
+    if not aligned:
+        return rmsd
+    rot, com, refcom = kabsch(sel, sel[ref], weights)
+    fit = np.matmul(xyz - com[:, None], rot) + refcom
+    atom = universe.atom.copy()
+    order = np.argsort(atom['frame'].astype(np.int64).values, kind='mergesort')
+    for i, col in enumerate(['x', 'y', 'z']):
+        values = np.empty((len(atom), ), dtype=np.float64)
+        values[order] = fit[:, :, i].ravel()
+        atom[col] = values
+    return rmsd, atom
+
+
+def trajectory_rmsd_matrix(universe, symbols=None, mass=False):
+    """
+    Pairwise RMSD between all frames of a trajectory (e.g. for conformational
+    clustering).
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Universe with a trajectory
+        symbols (list): Only use these atom symbols (default all atoms)
+        mass (bool): Use mass weighted fitting (default false)
+
+    Returns:
+        rmsd (:class:`~pandas.DataFrame`): Square matrix indexed by frame
+    """
+    xyz = universe.atom.trajectory_array()
+    frames = np.sort(universe.atom['frame'].astype(np.int64).unique())
+    mask, weights = _selection(universe, symbols, mass)
+    df = pd.DataFrame(pairwise_rmsd(xyz[:, mask], weights), index=frames,
+                      columns=frames)
+    df.index.name = 'frame'
+    df.columns.name = 'frame'
+    return df
@@ -14,6 +14,7 @@ import re
 #import sympy
 import numpy as np
 #from sympy import Add, Mul
+from functools import lru_cache
 from collections import OrderedDict
 from numba import jit, vectorize
 
@@ -89,6 +90,95 @@ def solid_harmonics(l_max):
     return sh
 
 
+@lru_cache(maxsize=None)
+def _symbolic_sh(l_max):
+    """Symbolic solid harmonics, only built (once) when actually needed."""
+    return solid_harmonics(l_max)
+
+
+def sh_keys(l_max):
+    """
+    The (L, ml) pairs of all real solid harmonics up to l_max, in the order
+    of :func:`~exatomic.algorithms.basis.solid_harmonics` (row L*L + L + ml
+    of :func:`~exatomic.algorithms.harmonics.evaluate_solid_harmonics`).
+    """
+    return [(L, ml) for L in range(l_max + 1) for ml in range(-L, L + 1)]
+
+
+def _shift(poly, axis, k=1):
+    """Multiply a monomial coefficient cube by x**k, y**k or z**k."""
+    out = np.zeros_like(poly)
+    sl = [slice(None)] * 3
+    sl[axis] = slice(k, None)
+    src = [slice(None)] * 3
+    src[axis] = slice(None, -k)
+    out[tuple(sl)] = poly[tuple(src)]
+    return out
+
+
+def sh_coefficients(l_max):
+    """
+    Numerical monomial coefficients of the real solid harmonics up to l_max,
+    generated with the same recursion as
+    :func:`~exatomic.algorithms.basis.solid_harmonics` but on arrays of
+    coefficients instead of symbolic expressions.
+
+    Args:
+        l_max (int): Maximum angular momentum
+
+    Returns:
+        coefs (array): Shape ((l_max + 1)**2, l_max + 1, l_max + 1, l_max + 1);
+                       coefs[L*L + L + ml, a, b, c] is the coefficient of x**a y**b z**c
+    """
+    n = l_max + 1
+    coefs = np.zeros((n * n, n, n, n), dtype=np.float64)
+    coefs[0, 0, 0, 0] = 1.
+    for l in range(1, n):
+        lp = l - 1
+        kr = 1 if lp == 0 else 0
+        cur = l * l + l
+        pre = lp * lp + lp
+        fac = np.sqrt(2 ** kr * (2 * lp + 1) / (2 * lp + 2))
+        sp, sm = coefs[pre + lp], (1 - kr) * coefs[pre - lp]
+        coefs[cur - l] = fac * (_shift(sp, 1) + _shift(sm, 0))
+        coefs[cur + l] = fac * (_shift(sp, 0) - _shift(sm, 1))
+        for ml in range(-l + 1, l):
+            den = np.sqrt((lp + ml + 1) * (lp - ml + 1))
+            poly = (2 * lp + 1) * _shift(coefs[pre + ml], 2)
+            if abs(ml) <= lp - 1:
+                prev = coefs[(lp - 1) * (lp - 1) + lp - 1 + ml]
+                r2 = _shift(prev, 0, 2) + _shift(prev, 1, 2) + _shift(prev, 2, 2)
+                poly = poly - np.sqrt((lp + ml) * (lp - ml)) * r2
+            coefs[cur + ml] = poly / den
+    return coefs
+
+
+_c2s_cache = {}
+
+
+def car2sph_matrix(L, cart=enum_cartesian):
+    """
+    Numerical Cartesian to spherical transformation matrix for a single
+    angular momentum, cached per L (and Cartesian ordering).
+
+    Args:
+        L (int): Angular momentum
+        cart (dict): Dictionary of L and Cartesian l, m, n ordering
+
+    Returns:
+        c2s (array): Shape (number of Cartesian, 2L + 1) functions; column
+                     L + ml holds the coefficients of solid harmonic (L, ml)
+    """
+    order = tuple(tuple(lmn) for lmn in cart[L])
+    key = (L, order)
+    if key not in _c2s_cache:
+        coefs = sh_coefficients(L)[L * L:]
+        c2s = np.array([coefs[:, l, m, n] for l, m, n in order])
+        c2s.setflags(write=False)
+        _c2s_cache[key] = c2s
+    return _c2s_cache[key]
+
+
 class PrimitiveFunction(object):
 
     cart = {'x': x, 'y': y, 'z': z}
@@ -196,8 +286,6 @@ class CartesianBasisFunction(BasisFunction):
 
 class SphericalBasisFunction(BasisFunction):
 
-    sh = solid_harmonics(6)
-
     def __repr__(self):
         return 'BsFn(x={:.2f},y={:.2f},z={:.2f},'\
                'prim={},L={},ml={})'.format(
@@ -205,7 +293,7 @@ class SphericalBasisFunction(BasisFunction):
                    self.prim, self.L, self.ml)
 
     def __init__(self, xa, ya, za, Ns, alphas, L, ml):
-        pre = self.sh[(L, ml)]
+        pre = _symbolic_sh(6)[(L, ml)]
         super(SphericalBasisFunction, self).__init__(
             xa, ya, za, pre, Ns, alphas)
         self.L = L
@@ -234,46 +322,53 @@ def clean_sh(sh):
 
 def car2sph(sh, cart):
     """
-    Turns symbolic solid harmonic functions into a dictionary of
-    arrays containing cartesian to spherical transformation matrices.
+    Dictionary of arrays containing cartesian to spherical transformation
+    matrices (see :func:`~exatomic.algorithms.basis.car2sph_matrix`).
 
     Args
-        sh (OrderedDict): the result of solid_harmonics(l_tot)
+        sh: the result of solid_harmonics(l_tot) or simply l_tot
         cart (dict): dictionary of l, cartesian l, m, n ordering
+
+    Note:
+        P functions are kept in the cartesian ordering.
     """
-    conv, prevL, mlcnt = {}, 0, 0
-    for (L, ml), sym in sh.items():
-        if L > 5: continue
-        mlcnt = mlcnt if prevL == L else 0
-        conv.setdefault(L, np.zeros((cart_lml_count[L],
-                                     spher_lml_count[L]),
-                                    dtype=np.float64))
-        coefs = sym.expand().as_coefficients_dict()
-        for i, (l, m, n) in enumerate(cart[L]):
-            if L == 1:
-                conv[L] = np.array(cart[L])
-                break
-            key = x ** l * y ** m * z ** n
-            conv[L][i, mlcnt] = coefs[key]
-        prevL = L
-        mlcnt += 1
+    lmax = sh if isinstance(sh, (int, np.integer)) else max(L for L, ml in sh)
+    conv = {}
+    for L in range(min(lmax, 5) + 1):
+        if L == 1:
+            conv[L] = np.array(cart[L])
+        else:
+            conv[L] = car2sph_matrix(L, cart).copy()
     return conv
 
 
 
+# Factorials (n <= 20) and double factorials (n <= 33) that fit into int64
+_fac_table = np.cumprod(np.append(1, np.arange(1, 21, dtype=np.int64)))
+_fac2_table = np.ones((34, ), dtype=np.int64)
+for _n in range(2, 34):
+    _fac2_table[_n] = _n * _fac2_table[_n - 2]
+
 @jit(nopython=True, cache=True)
-def _fac(n,v): return _fac(n-1, n*v) if n else v
+def _fac(n,v):
+    for k in range(2, n + 1): v *= k
+    return v
 
 @jit(nopython=True, cache=True)
-def fac(n): return _fac(n, 1)
+def fac(n):
+    if 0 <= n < 21: return _fac_table[n]
+    return _fac(n, 1)
 
 @jit(nopython=True, cache=True)
-def _fac2(n,v): return _fac2(n-2, n*v) if n > 0 else v
+def _fac2(n,v):
+    for k in range(n, 1, -2): v *= k
+    return v
 
 @jit(nopython=True, cache=True)
 def fac2(n):
     if n < -1: return 0
     if n < 2: return 1
+    if n < 34: return _fac2_table[n]
     return _fac2(n, 1)
 
 @jit(nopython=True, cache=True)
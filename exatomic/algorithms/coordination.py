@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Coordination Numbers
+######################
+Per atom, per frame coordination numbers computed directly from positions
+(no two body table is required). Neighbors are counted with a smooth
+(differentiable) rational switching function,
+
+.. math::
+
+    s\\left(r\\right) = \\frac{1 - \\left(r/r_{0}\\right)^{n}}{1 - \\left(r/r_{0}\\right)^{m}}
+
+which is the same form as commonly used for coordination number collective
+variables in enhanced sampling simulations.
+
+.. code-block:: Python
+
+    cn = coordination_numbers(uni, 'Na', 'O', r0=5.6)   # frames x Na atoms
+    cn.mean(axis=1).plot()                              # Average over Na
+"""
+import numpy as np
+import pandas as pd
+import numba as nb
+from exatomic.algorithms.distance import (_trajectory_arrays, _cell_arrays,
+                                          _bin_atoms, _neighbors)
+
+
+@nb.jit(nopython=True, nogil=True)
+def switching_function(r, r0, n, m):
+    """
+    Rational switching function (1 - (r/r0)^n)/(1 - (r/r0)^m).
+    """
+    x = r / r0
+    if abs(x - 1.0) < 1e-8:
+        return n / m
+    return (1.0 - x**n) / (1.0 - x**m)
+
+
+@nb.jit(nopython=True, nogil=True, parallel=True)
+def _coordination(xyz, cell, inv, origin, periodic, centers, neighbors, r0, n, m, rcut):
+    """
+    Frame parallel coordination numbers of the center atoms.
+    """
+    nf, nat = xyz.shape[:2]
+    out = np.zeros((nf, len(centers)), dtype=np.float64)
+    for f in nb.prange(nf):
+        frac, nbins, start, order = _bin_atoms(xyz[f], cell[f], inv[f], origin[f], periodic, rcut)
+        idx = np.empty((nat, ), dtype=np.int64)
+        vec = np.empty((nat, 3), dtype=np.float64)
+        for k in range(len(centers)):
+            cnt = _neighbors(centers[k], frac, cell[f], periodic, nbins, start,
+                             order, neighbors, rcut, idx, vec)
+            for p in range(cnt):
+                r = np.sqrt(vec[p, 0]**2 + vec[p, 1]**2 + vec[p, 2]**2)
+                out[f, k] += switching_function(r, r0, n, m)
+    return out
+
+
+def coordination_numbers(universe, a, b, r0, n=6, m=12, rcut=None, tol=1e-3):
+    """
+    Compute the coordination number of each atom of type(s) a by atoms of
+    type(s) b for every frame.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Universe (free or periodic)
+        a (str or list): Center atom symbol(s)
+        b (str or list): Neighbor atom symbol(s)
+        r0 (float): Switching function midpoint (au)
+        n (int): Numerator exponent
+        m (int): Denominator exponent (m > n)
+        rcut (float): Neighbor search cutoff (default where s(r) ~ tol)
+        tol (float): Switching function value used to determine default cutoff
+
+    Returns:
+        cn (:class:`~pandas.DataFrame`): Frames (index) by center atom (columns)
+
+    Note:
+        Atoms must appear in the same order in each frame (see
+        :meth:`~exatomic.core.atom.Atom.trajectory_array`); columns are the
+        positions (0 to natoms - 1) of the center atoms within a frame.
+    """
+    a = [a] if isinstance(a, str) else list(a)
+    b = [b] if isinstance(b, str) else list(b)
+    if rcut is None:
+        rcut = r0 * tol**(-1.0 / (m - n))
+    xyz, frames, order, symbols = _trajectory_arrays(universe)
+    centers = np.where(np.in1d(symbols, a))[0]
+    neighbors = np.in1d(symbols, b)
+    cell, inv, origin, periodic = _cell_arrays(universe, xyz, rcut)
+    cn = _coordination(np.ascontiguousarray(xyz), cell, inv, origin, periodic,
+                       centers, neighbors, float(r0), float(n), float(m), float(rcut))
+    df = pd.DataFrame(cn, index=frames, columns=centers)
+    df.index.name = 'frame'
+    df.columns.name = 'label'
+    return df
@@ -6,6 +6,10 @@ Diffusion Coefficients
 ##########################
 Various algorithms for computing diffusion coefficients are coded here.
 """
+import numpy as np
+import pandas as pd
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from exa.util.units import Length, Time
 from exatomic.algorithms.displacement import absolute_squared_displacement
 
@@ -37,3 +41,109 @@ def einstein_relation(universe, length='cm', time='s'):
     msd *= Length['au', length]**2
     t /= Time['au', time]
     return msd / (6 * t)
+
+
+def block_averaged_diffusion(universe, nblocks=5, window=0.5, fit=(0.2, 0.8),
+                             nlags=50, by='symbol', length='cm', time='s',
+                             processes=None):
+    """
+    Compute diffusion coefficients (with error bars) per species by block
+    averaging.
+
+    The trajectory is split into **nblocks** contiguous blocks. In each block
+    the mean squared displacement (MSD) is computed as a function of lag time
+    using every frame of the block as a time origin (windowed MSD). The slope
+    of the linear region of the MSD gives a diffusion coefficient per block,
+
+    .. math::
+
+        \\left<\\left|\\mathbf{r}\\left(t_{0} + \\tau\\right) - \\mathbf{r}\\left(t_{0}\\right)\\right|^{2}\\right>
+            = 6D\\tau + b
+
+    and the reported value is the mean over blocks along with the standard
+    error of the mean. Blocks are processed in parallel using a process pool.
+
+    .. code-block:: Python
+
+        dc = block_averaged_diffusion(uni, nblocks=10)
+        dc.loc['Li', 'D']           # Diffusion coefficient of Li in cm^2/s
+        dc.loc['Li', 'stderr']      # Standard error
+
+    Args:
+        universe (:class:`~exatomic.Universe`): Universe with unwrapped positions and frame times
+        nblocks (int): Number of blocks to split the trajectory into (at least 2)
+        window (float): Largest lag time as a fraction of the block length
+        fit (tuple): Fractions of the largest lag time bounding the linear fit
+        nlags (int): Maximum number of lag times to evaluate per block
+        by (str): Atom table column defining species (default symbol)
+        length (str): Output unit of length
+        time (str): Output unit of time
+        processes (int): Number of worker processes (default number of CPUs, 1 for serial)
+
+    Returns:
+        df (:class:`~pandas.DataFrame`): Diffusion coefficient and standard error per species
+
+    Note:
+        As with :func:`~exatomic.algorithms.displacement.absolute_squared_displacement`,
+        positions must not be wrapped into the unit cell and atoms must appear
+        in the same order in each frame.
+    """
+    if nblocks < 2:
+        raise ValueError("At least 2 blocks are required for a standard error")
+    xyz = universe.atom.trajectory_array()
+    nframes = xyz.shape[0]
+    blocksize = nframes // nblocks
+    if blocksize < 3:
+        raise ValueError("Too few frames ({}) for {} blocks".format(nframes, nblocks))
+    maxlag = max(2, int(blocksize * window))
+    lags = np.unique(np.linspace(1, maxlag, min(nlags, maxlag)).astype(np.int64))
+    t = universe.frame['time'].values.astype(np.float64)
+    dt = np.diff(t).mean()
+    first = universe.atom['frame'].astype(np.int64).min()
+    species = universe.atom.loc[universe.atom['frame'].astype(np.int64) == first, by]
+    species = species.astype(str).values
+    names, groups = np.unique(species, return_inverse=True)
+    args = [(xyz[i*blocksize:(i + 1)*blocksize], lags, groups, len(names))
+            for i in range(nblocks)]
+    if processes == 1:
+        msds = [_block_msd(*arg) for arg in args]
+    else:
+        # Workers are spawned, forking after numba's threading layer started may hang
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as executor:
+            msds = list(executor.map(_block_msd, *zip(*args)))
+    tau = lags * dt
+    lo, hi = fit
+    mask = (lags >= lo*lags[-1]) & (lags <= hi*lags[-1])
+    if mask.sum() < 2:
+        mask[:] = True
+    d = np.empty((nblocks, len(names)), dtype=np.float64)
+    for i, msd in enumerate(msds):
+        d[i] = np.polyfit(tau[mask], msd[:, mask].T, 1)[0] / 6
+    d *= Length['au', length]**2 / Time['au', time]
+    df = pd.DataFrame.from_dict({'D': d.mean(axis=0),
+                                 'stderr': d.std(axis=0, ddof=1) / np.sqrt(nblocks)})
+    df.index = names
+    df.index.name = by
+    return df[['D', 'stderr']]
+
+
+def _block_msd(xyz, lags, groups, ngroups):
+    """
+    Windowed mean squared displacement of a single block of frames.
+
+    Args:
+        xyz (array): Positions of shape (nframes, natoms, 3)
+        lags (array): Lag times (in frames) at which to evaluate the MSD
+        groups (array): Species index of each atom
+        ngroups (int): Number of species
+
+    Returns:
+        msd (array): MSD of shape (ngroups, nlags)
+    """
+    counts = np.bincount(groups, minlength=ngroups)
+    msd = np.empty((ngroups, len(lags)), dtype=np.float64)
+    for i, lag in enumerate(lags):
+        dr2 = ((xyz[lag:] - xyz[:-lag])**2).sum(axis=2).mean(axis=0)
+        msd[:, i] = np.bincount(groups, weights=dr2, minlength=ngroups) / counts
+    return msd
@@ -276,3 +276,156 @@ def pdist_nv(x, y, z, index, dmax=8.0):
     atom0 = atom0[:k]
     atom1 = atom1[:k]
     return dr, atom0, atom1
+
+
+def _trajectory_arrays(universe):
+    """
+    Per frame positions and the symbols of the atoms (which must appear in
+    the same order in every frame, see
+    :meth:`~exatomic.core.atom.Atom.trajectory_array`).
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Universe
+
+    Returns:
+        xyz (array): Positions of shape (nframes, natoms, 3)
+        frames (array): Sorted frame indices (nframes, )
+        order (array): Order of the atom table rows by frame
+        symbols (array): Symbols of the atoms of a frame (natoms, )
+    """
+    atom = universe.atom
+    xyz = atom.trajectory_array()
+    frame = atom['frame'].astype(np.int64).values
+    order = np.argsort(frame, kind='mergesort')
+    symbols = atom['symbol'].astype(str).values[order][:xyz.shape[1]]
+    return xyz, np.unique(frame), order, symbols
+
+
+def _cell_arrays(universe, xyz, rcut):
+    """
+    Per frame cell matrices for neighbor searching.
+
+    For periodic universes the cell vectors (rows) are taken from the frame
+    table; free boundary frames get a (non-periodic) bounding box padded by
+    the cutoff.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Universe
+        xyz (array): Positions of shape (nframes, natoms, 3)
+        rcut (float): Largest distance of interest
+
+    Returns:
+        cell (array): Cell vectors (rows) of shape (nframes, 3, 3)
+        inv (array): Inverse cell matrices
+        origin (array): Cell origin of shape (nframes, 3)
+        periodic (bool): True if minimum image convention applies
+
+    Raises:
+        ValueError: If the cutoff exceeds half the perpendicular width of a
+            periodic cell (pairs through a second image would be missed)
+    """
+    periodic = bool(universe.frame.is_periodic())
+    if periodic:
+        frames = np.sort(universe.atom['frame'].astype(np.int64).unique())
+        cols = ['xi', 'yi', 'zi', 'xj', 'yj', 'zj', 'xk', 'yk', 'zk']
+        cell = universe.frame.loc[frames, cols].values.astype(np.float64).reshape(-1, 3, 3)
+        origin = np.zeros((len(frames), 3), dtype=np.float64)
+        inv = np.linalg.inv(cell)
+        width = (1.0/np.linalg.norm(inv, axis=1)).min()
+        if 2*rcut > width:
+            raise ValueError("Cutoff {} exceeds half the narrowest cell width ({:.4f}); "
+                             "the minimum image convention does not apply".format(rcut, width))
+        return cell, inv, origin, periodic
+    else:
+        origin = xyz.min(axis=1) - rcut/2
+        extent = xyz.max(axis=1) - origin + rcut/2
+        cell = np.zeros((len(xyz), 3, 3), dtype=np.float64)
+        for i in range(3):
+            cell[:, i, i] = extent[:, i]
+    return cell, np.linalg.inv(cell), origin, periodic
+
+
+@nb.jit(nopython=True, nogil=True)
+def _bin_atoms(xyz, cell, inv, origin, periodic, rcut):
+    """
+    Sort atoms (of a single frame) into a grid of bins no smaller than the cutoff
+    (a cell list).
+
+    Returns:
+        frac (array): Fractional coordinates
+        nbins (array): Number of bins along each cell vector
+        start (array): Offsets (into order) of each bin
+        order (array): Atom indices sorted by bin
+    """
+    n = xyz.shape[0]
+    frac = np.dot(xyz - origin, inv)
+    if periodic:
+        frac = frac - np.floor(frac)
+    nbins = np.empty((3, ), dtype=np.int64)
+    for k in range(3):
+        width = 1.0 / np.sqrt((inv[:, k]**2).sum())
+        nbins[k] = int(width // rcut)
+        if nbins[k] < 3:
+            nbins[k] = 1
+    binid = np.empty((n, ), dtype=np.int64)
+    for i in range(n):
+        b = 0
+        for k in range(3):
+            bk = int(frac[i, k] * nbins[k])
+            bk = min(max(bk, 0), nbins[k] - 1)
+            b = b*nbins[k] + bk
+        binid[i] = b
+    start = np.zeros((nbins[0]*nbins[1]*nbins[2] + 1, ), dtype=np.int64)
+    for i in range(n):
+        start[binid[i] + 1] += 1
+    start = np.cumsum(start)
+    order = np.argsort(binid, kind='mergesort')
+    return frac, nbins, start, order
+
+
+@nb.jit(nopython=True, nogil=True)
+def _neighbors(i, frac, cell, periodic, nbins, start, order, mask, rcut, idx, vec):
+    """
+    Find atoms j (with mask[j] true) within the cutoff of atom i using a cell
+    list (see :func:`~exatomic.algorithms.distance._bin_atoms`), applying the
+    minimum image convention (any cell shape) if periodic.
+
+    Neighbor indices and distance vectors (j - i) are written to the idx and
+    vec buffers; the number of neighbors found is returned.
+    """
+    rcut2 = rcut**2
+    home = np.empty((3, ), dtype=np.int64)
+    for k in range(3):
+        home[k] = min(max(int(frac[i, k] * nbins[k]), 0), nbins[k] - 1)
+    lo = np.empty((3, ), dtype=np.int64)
+    for k in range(3):
+        lo[k] = 0 if nbins[k] == 1 else -1
+    count = 0
+    for a in range(lo[0], -lo[0] + 1):
+        ba = (home[0] + a) % nbins[0]
+        for b in range(lo[1], -lo[1] + 1):
+            bb = (home[1] + b) % nbins[1]
+            for c in range(lo[2], -lo[2] + 1):
+                bc = (home[2] + c) % nbins[2]
+                binid = (ba*nbins[1] + bb)*nbins[2] + bc
+                for p in range(start[binid], start[binid + 1]):
+                    j = order[p]
+                    if j == i or not mask[j]:
+                        continue
+                    f0 = frac[j, 0] - frac[i, 0]
+                    f1 = frac[j, 1] - frac[i, 1]
+                    f2 = frac[j, 2] - frac[i, 2]
+                    if periodic:
+                        f0 -= np.floor(f0 + 0.5)
+                        f1 -= np.floor(f1 + 0.5)
+                        f2 -= np.floor(f2 + 0.5)
+                    dx = f0*cell[0, 0] + f1*cell[1, 0] + f2*cell[2, 0]
+                    dy = f0*cell[0, 1] + f1*cell[1, 1] + f2*cell[2, 1]
+                    dz = f0*cell[0, 2] + f1*cell[1, 2] + f2*cell[2, 2]
+                    if dx**2 + dy**2 + dz**2 < rcut2:
+                        idx[count] = j
+                        vec[count, 0] = dx
+                        vec[count, 1] = dy
+                        vec[count, 2] = dz
+                        count += 1
+    return count
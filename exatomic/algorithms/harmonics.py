@@ -4,14 +4,46 @@ Spherical and Solid Harmonics
 =================================================
 These functions generate and manipulate spherical and solid harmonics. For solid harmonics, this
 module provides numerical approaches for dealing with them.
+
+.. code-block:: Python
+
+    sh = evaluate_solid_harmonics(x, y, z, 4)           # Row L*L + L + ml holds (L, ml)
+    sh, grad = evaluate_solid_harmonics(x, y, z, 4, gradient=True)
+
+Symbolic expressions (:func:`~exatomic.algorithms.harmonics.solid_harmonics`)
+are only generated on request; numerical work uses compiled recursions.
 """
 import re
 import numpy as np
-import pandas as pd
-import sympy as sy
-from numba import vectorize
-from sympy.parsing.sympy_parser import parse_expr
-from sympy.physics.secondquant import KroneckerDelta as kr
+from exatomic.algorithms.numerical import _solid_harmonics, _solid_harmonics_grad
+
+
+def evaluate_solid_harmonics(x, y, z, lmax, gradient=False):
+    """
+    Evaluate all (unnormalized) real solid harmonics up to lmax on a set of
+    points (relative to the origin) using a compiled recursion.
+
+    Args:
+        x (array): Cartesian x coordinates
+        y (array): Cartesian y coordinates
+        z (array): Cartesian z coordinates
+        lmax (int): Maximum angular momentum
+        gradient (bool): If true, also return the Cartesian derivatives
+
+    Returns:
+        sh (array): Shape ((lmax + 1)**2, npts); row L*L + L + ml holds (L, ml)
+        grad (array): Shape (3, (lmax + 1)**2, npts) (only if gradient is true)
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64).ravel()
+    y = np.ascontiguousarray(y, dtype=np.float64).ravel()
+    z = np.ascontiguousarray(z, dtype=np.float64).ravel()
+    sh = np.empty(((lmax + 1)**2, len(x)), dtype=np.float64)
+    if not gradient:
+        _solid_harmonics(x, y, z, lmax, sh)
+        return sh
+    grad = np.empty((3, ) + sh.shape, dtype=np.float64)
+    _solid_harmonics_grad(x, y, z, lmax, sh, grad[0], grad[1], grad[2])
+    return sh, grad
 
 
 class SolidHarmonic:
@@ -45,7 +77,15 @@ def solid_harmonics(l, return_all=False, vectorize=False, standard_symbols=True)
 
     Returns:
         functions (dict): Dictionary of (l, ml) keys and symbolic function values
+
+    Note:
+        For numerical values use
+        :func:`~exatomic.algorithms.harmonics.evaluate_solid_harmonics`.
     """
+    import sympy as sy
+    from numba import vectorize as nbvectorize
+    from sympy.parsing.sympy_parser import parse_expr
+    from sympy.physics.secondquant import KroneckerDelta as kr
     x, y, z = sy.symbols('x y z', imaginary=False)
     r2 = x**2 + y**2 + z**2
     desired_l = l
@@ -101,7 +141,7 @@ def solid_harmonics(l, return_all=False, vectorize=False, standard_symbols=True)
                     funcs[key] = (symbols, lambda r: r)
                 else:
                     f = sy.lambdify(symbols, s[key], 'numpy')
-                    vec = vectorize(['float64({})'.format(', '.join(['float64'] * len(symbols)))], nopython=True)
+                    vec = nbvectorize(['float64({})'.format(', '.join(['float64'] * len(symbols)))], nopython=True)
                     f = vec(f)
                     funcs[key] = (symbols, f)
         s = funcs
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Hydrogen Bonds
+################
+Geometric detection of hydrogen bonds over trajectories. A hydrogen bond
+D-H...A is counted when the donor-acceptor distance is below a cutoff and the
+D-H...A angle (at the hydrogen) is above a cutoff. Atoms are located using a
+cell list (see :func:`~exatomic.algorithms.distance._bin_atoms`) so that
+free boundary, orthorhombic, and triclinic periodic universes are handled
+identically; frames are processed in parallel.
+
+.. code-block:: Python
+
+    hb, counts = hydrogen_bonds(uni)        # Table of donor, hydrogen, acceptor, ... and counts per frame
+    corr = hbond_correlation(hb, frames=counts.index)   # Intermittent lifetime correlation
+"""
+import numpy as np
+import pandas as pd
+import numba as nb
+from exatomic.algorithms.distance import (_trajectory_arrays, _cell_arrays,
+                                          _bin_atoms, _neighbors)
+
+
+@nb.jit(nopython=True, nogil=True)
+def _frame_hbonds(xyz, cell, inv, origin, periodic, donor, hydrogen, acceptor,
+                  rda, rdh, cosmax, fill, out_idx, out_val):
+    """
+    Hydrogen bonds of a single frame; if fill is false only count them.
+    """
+    n = xyz.shape[0]
+    frac, nbins, start, order = _bin_atoms(xyz, cell, inv, origin, periodic, max(rda, rdh))
+    hidx = np.empty((n, ), dtype=np.int64)
+    hvec = np.empty((n, 3), dtype=np.float64)
+    aidx = np.empty((n, ), dtype=np.int64)
+    avec = np.empty((n, 3), dtype=np.float64)
+    count = 0
+    for d in range(n):
+        if not donor[d]:
+            continue
+        nh = _neighbors(d, frac, cell, periodic, nbins, start, order, hydrogen, rdh, hidx, hvec)
+        if nh == 0:
+            continue
+        na = _neighbors(d, frac, cell, periodic, nbins, start, order, acceptor, rda, aidx, avec)
+        for p in range(nh):
+            rh = np.sqrt((hvec[p]**2).sum())
+            for q in range(na):
+                # Vectors from the hydrogen to the donor and to the acceptor
+                hd = -hvec[p]
+                ha = avec[q] - hvec[p]
+                rha = np.sqrt((ha**2).sum())
+                cos = (hd*ha).sum() / (rh*rha)
+                if cos <= cosmax:
+                    if fill:
+                        out_idx[count, 0] = d
+                        out_idx[count, 1] = hidx[p]
+                        out_idx[count, 2] = aidx[q]
+                        out_val[count, 0] = np.sqrt((avec[q]**2).sum())
+                        out_val[count, 1] = rha
+                        out_val[count, 2] = np.degrees(np.arccos(max(cos, -1.0)))
+                    count += 1
+    return count
+
+
+@nb.jit(nopython=True, nogil=True, parallel=True)
+def _hbonds(xyz, cell, inv, origin, periodic, donor, hydrogen, acceptor, rda, rdh, cosmax):
+    """
+    Frame parallel hydrogen bond search (count pass followed by a fill pass).
+    """
+    nf = xyz.shape[0]
+    dummy_idx = np.empty((0, 3), dtype=np.int64)
+    dummy_val = np.empty((0, 3), dtype=np.float64)
+    counts = np.empty((nf, ), dtype=np.int64)
+    for f in nb.prange(nf):
+        counts[f] = _frame_hbonds(xyz[f], cell[f], inv[f], origin[f], periodic,
+                                  donor, hydrogen, acceptor, rda, rdh, cosmax,
+                                  False, dummy_idx, dummy_val)
+    offsets = np.zeros((nf + 1, ), dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    idx = np.empty((offsets[-1], 3), dtype=np.int64)
+    val = np.empty((offsets[-1], 3), dtype=np.float64)
+    for f in nb.prange(nf):
+        _frame_hbonds(xyz[f], cell[f], inv[f], origin[f], periodic, donor,
+                      hydrogen, acceptor, rda, rdh, cosmax, True,
+                      idx[offsets[f]:offsets[f + 1]], val[offsets[f]:offsets[f + 1]])
+    return counts, idx, val
+
+
+def hydrogen_bonds(universe, donors=('N', 'O', 'F'), acceptors=('N', 'O', 'F'),
+                   hydrogens=('H', ), rda=6.6, rdh=2.3, angle=150.0):
+    """
+    Find hydrogen bonds in every frame of a universe.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Universe (free or periodic)
+        donors (iter): Donor atom symbols
+        acceptors (iter): Acceptor atom symbols
+        hydrogens (iter): Hydrogen atom symbols
+        rda (float): Maximum donor-acceptor distance (default 3.5 Angstrom, in au)
+        rdh (float): Maximum donor-hydrogen (covalent) distance (default 1.2 Angstrom, in au)
+        angle (float): Minimum D-H...A angle in degrees
+
+    Returns:
+        hbonds (:class:`~pandas.DataFrame`): Columns frame, donor, hydrogen, acceptor (atom index), distance (D-A), ha (H-A), angle
+        counts (:class:`~pandas.Series`): Number of hydrogen bonds of every frame (including frames without any)
+
+    Note:
+        Atoms must appear in the same order in each frame (see
+        :meth:`~exatomic.core.atom.Atom.trajectory_array`).
+    """
+    xyz, frames, order, symbols = _trajectory_arrays(universe)
+    nf, nat = xyz.shape[:2]
+    labels = universe.atom.index.values[order].reshape(nf, nat)
+    donor = np.in1d(symbols, donors)
+    hydrogen = np.in1d(symbols, hydrogens)
+    acceptor = np.in1d(symbols, acceptors)
+    cell, inv, origin, periodic = _cell_arrays(universe, xyz, max(rda, rdh))
+    cosmax = np.cos(np.radians(angle))
+    counts, idx, val = _hbonds(np.ascontiguousarray(xyz), cell, inv, origin, periodic,
+                               donor, hydrogen, acceptor, float(rda), float(rdh), cosmax)
+    fdx = np.repeat(np.arange(nf), counts)
+    df = pd.DataFrame.from_dict({'frame': frames[fdx],
+                                 'donor': labels[fdx, idx[:, 0]],
+                                 'hydrogen': labels[fdx, idx[:, 1]],
+                                 'acceptor': labels[fdx, idx[:, 2]],
+                                 'distance': val[:, 0], 'ha': val[:, 1],
+                                 'angle': val[:, 2]})
+    counts = pd.Series(counts, index=pd.Index(frames, name='frame'), name='count')
+    return df[['frame', 'donor', 'hydrogen', 'acceptor', 'distance', 'ha', 'angle']], counts
+
+
+def hbond_correlation(hbonds, frames=None, maxlag=None):
+    """
+    Intermittent hydrogen bond (lifetime) correlation function,
+
+    .. math::
+
+        C\\left(\\tau\\right) = \\frac{\\left<h\\left(t_{0}\\right)h\\left(t_{0} + \\tau\\right)\\right>}{\\left<h\\right>}
+
+    where h is 1 if a given donor, hydrogen, acceptor triple is bonded and 0
+    otherwise.
+
+    Args:
+        hbonds (:class:`~pandas.DataFrame`): Output of :func:`~exatomic.algorithms.hbond.hydrogen_bonds`
+        frames (array): All frames of the trajectory (default frames present in hbonds; pass counts.index to include frames without hydrogen bonds)
+        maxlag (int): Largest lag (in frames) to compute (default half the frames)
+
+    Returns:
+        corr (:class:`~pandas.Series`): Correlation function indexed by lag
+    """
+    if frames is None:
+        frames = np.sort(hbonds['frame'].unique())
+    fdx = np.searchsorted(frames, hbonds['frame'].values)
+    keys = hbonds[['donor', 'hydrogen', 'acceptor']].values
+    bonds = np.unique(keys, axis=0, return_inverse=True)[1]
+    h = np.zeros((len(frames), bonds.max() + 1 if len(bonds) else 0), dtype=np.float64)
+    h[fdx, bonds] = 1.0
+    maxlag = len(frames)//2 if maxlag is None else maxlag
+    corr = np.empty((maxlag + 1, ), dtype=np.float64)
+    norm = (h**2).sum(axis=1).mean()
+    for lag in range(maxlag + 1):
+        corr[lag] = (h[lag:] * h[:len(frames) - lag]).sum(axis=1).mean() / norm
+    corr = pd.Series(corr)
+    corr.index.name = 'lag'
+    return corr
@@ -0,0 +1,519 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Molecular Integrals
+#####################
+Compiled one-electron integrals over the contracted Gaussian shells of
+:class:`~exatomic.algorithms.numerical.Shells`. Overlap, kinetic energy and
+multipole integrals over Cartesian primitive pairs are built from one
+dimensional Obara-Saika recurrence tables, nuclear attraction integrals from
+Hermite (McMurchie-Davidson) expansions and the Boys function. Integrals are
+contracted and transformed to the basis functions (solid harmonics or
+Cartesian functions) inside the kernel, one shell pair at a time and in
+parallel over the (screened) shell pairs.
+
+.. code-block:: Python
+
+    shells = Shells.from_universe(uni)
+    smat = overlap_matrix(shells)           # (nbas, nbas)
+    tmat = kinetic_matrix(shells)
+    dip = multipole_matrix(shells, order=1) # (3, nbas, nbas): x, y, z
+    vmat = nuclear_matrix(shells, xyz, charges)
+    ovl = Overlap.from_universe(uni)        # Lower triangle as an Overlap table
+"""
+import numpy as np
+import pandas as pd
+from math import erf
+from numba import jit, prange
+from exatomic.algorithms.basis import car2sph_matrix, enum_cartesian
+from exatomic.algorithms.numerical import ShellPairs
+
+
+# Operators of _one_electron and their number of components
+_OVERLAP, _KINETIC, _DIPOLE, _QUADRUPOLE, _NUCLEAR = range(5)
+_ncomp = {_OVERLAP: 1, _KINETIC: 1, _DIPOLE: 3, _QUADRUPOLE: 6, _NUCLEAR: 1}
+# Cartesian directions of the quadrupole components xx, xy, xz, yy, yz, zz
+_quad = np.array([[0, 0], [0, 1], [0, 2], [1, 1], [1, 2], [2, 2]], dtype=np.int64)
+
+
+@jit(nopython=True, nogil=True)
+def _cart_powers(L):
+    """Cartesian powers (l, m, n) of angular momentum L in enum_cartesian order."""
+    out = np.empty(((L + 1)*(L + 2)//2, 3), dtype=np.int64)
+    k = 0
+    for i in range(L + 1):
+        for j in range(i + 1):
+            out[k, 0] = L - i
+            out[k, 1] = i - j
+            out[k, 2] = j
+            k += 1
+    return out
+
+
+@jit(nopython=True, nogil=True)
+def _os_table(pa, pb, p2, la, lb, out):
+    """
+    One dimensional Obara-Saika overlap table (without the Gaussian product
+    prefactor): out[i, j] for i <= la and j <= lb with
+
+    .. math::
+
+        E_{i+1,j} = X_{PA}E_{ij} + \\frac{1}{2p}\\left(iE_{i-1,j} + jE_{i,j-1}\\right)
+
+    and likewise for j + 1 with :math:`X_{PB}`; p2 is 1/(2p).
+    """
+    out[0, 0] = 1.0
+    for i in range(la):
+        out[i + 1, 0] = pa*out[i, 0]
+        if i:
+            out[i + 1, 0] += i*p2*out[i - 1, 0]
+    for j in range(lb):
+        for i in range(la + 1):
+            v = pb*out[i, j]
+            if i:
+                v += i*p2*out[i - 1, j]
+            if j:
+                v += j*p2*out[i, j - 1]
+            out[i, j + 1] = v
+
+
+@jit(nopython=True, nogil=True)
+def _hermite_table(pa, pb, p2, la, lb, out):
+    """
+    One dimensional Hermite expansion coefficients :math:`E^{ij}_{t}`
+    (without the Gaussian product prefactor) of the product of Cartesian
+    Gaussian factors i (on A) and j (on B):
+
+    .. math::
+
+        E^{i+1,j}_{t} = \\frac{1}{2p}E^{ij}_{t-1} + X_{PA}E^{ij}_{t} + (t + 1)E^{ij}_{t+1}
+
+    and likewise for j + 1 with :math:`X_{PB}`; p2 is 1/(2p).
+    """
+    out[:, :, :] = 0.0
+    out[0, 0, 0] = 1.0
+    for i in range(la + 1):
+        for j in range(lb + 1):
+            if i == 0 and j == 0:
+                continue
+            if i:
+                i0, j0, x = i - 1, j, pa
+            else:
+                i0, j0, x = i, j - 1, pb
+            for t in range(i + j + 1):
+                v = x*out[i0, j0, t]
+                if t:
+                    v += p2*out[i0, j0, t - 1]
+                if t + 1 <= i0 + j0:
+                    v += (t + 1)*out[i0, j0, t + 1]
+                out[i, j, t] = v
+
+
+@jit(nopython=True, nogil=True)
+def _boys(nmax, t, out):
+    """
+    Boys function :math:`F_{n}\\left(T\\right) = \\int_{0}^{1}u^{2n}e^{-Tu^{2}}du`
+    for n <= nmax: series expansion of the highest order and downward
+    recursion for small T, closed form F_0 and upward recursion for large T.
+    """
+    et = np.exp(-t)
+    if t < 30.0:
+        term = 1.0/(2*nmax + 1)
+        total = term
+        k = 1
+        while term > 1e-17*total:
+            term *= 2*t/(2*nmax + 2*k + 1)
+            total += term
+            k += 1
+        out[nmax] = et*total
+        for n in range(nmax, 0, -1):
+            out[n - 1] = (2*t*out[n] + et)/(2*n - 1)
+    else:
+        out[0] = 0.5*np.sqrt(np.pi/t)*erf(np.sqrt(t))
+        for n in range(nmax):
+            out[n + 1] = ((2*n + 1)*out[n] - et)/(2*t)
+
+
+@jit(nopython=True, nogil=True)
+def _hermite_coulomb(p, pc, L, boys, out):
+    """
+    Hermite Coulomb integrals :math:`R^{n}_{tuv}` (t + u + v <= L - n) of a
+    Gaussian with exponent p at distance pc (P - C) from a point charge,
+
+    .. math::
+
+        R^{n}_{t+1,u,v} = tR^{n+1}_{t-1,u,v} + X_{PC}R^{n+1}_{tuv}
+
+    (likewise for u and v) from :math:`R^{n}_{000} = \\left(-2p\\right)^{n}F_{n}\\left(pR_{PC}^{2}\\right)`.
+    """
+    _boys(L, p*(pc[0]*pc[0] + pc[1]*pc[1] + pc[2]*pc[2]), boys)
+    for n in range(L, -1, -1):
+        out[n, 0, 0, 0] = (-2*p)**n*boys[n]
+        for t in range(L - n + 1):
+            for u in range(L - n - t + 1):
+                for v in range(L - n - t - u + 1):
+                    if t:
+                        r = pc[0]*out[n + 1, t - 1, u, v]
+                        if t > 1:
+                            r += (t - 1)*out[n + 1, t - 2, u, v]
+                    elif u:
+                        r = pc[1]*out[n + 1, t, u - 1, v]
+                        if u > 1:
+                            r += (u - 1)*out[n + 1, t, u - 2, v]
+                    elif v:
+                        r = pc[2]*out[n + 1, t, u, v - 1]
+                        if v > 1:
+                            r += (v - 1)*out[n + 1, t, u, v - 2]
+                    else:
+                        continue
+                    out[n, t, u, v] = r
+
+
+@jit(nopython=True, nogil=True)
+def _pair_integrals(op, a, b, center, lval, ptr, alpha, coef, points, charges,
+                    cart):
+    """
+    Contracted Cartesian integrals of shells a and b (see _one_electron);
+    cart has shape (ncomp, ncart(a), ncart(b)).
+    """
+    la = lval[a]
+    lb = lval[b]
+    pwa = _cart_powers(la)
+    pwb = _cart_powers(lb)
+    nca = len(pwa)
+    ncb = len(pwb)
+    ab = center[a] - center[b]
+    ab2 = ab[0]*ab[0] + ab[1]*ab[1] + ab[2]*ab[2]
+    # Multipole operators are shifted to B: x - C = (x - B) + (B - C)
+    bc = center[b] - points[0]
+    ext = 0 if op == _OVERLAP else 2
+    tab = np.empty((3, la + 1, lb + ext + 1), dtype=np.float64)
+    op1 = np.empty((3, la + 1, lb + 1), dtype=np.float64)
+    op2 = np.empty((3, la + 1, lb + 1), dtype=np.float64)
+    if op == _NUCLEAR:
+        L = la + lb
+        her = np.empty((3, la + 1, lb + 1, L + 1), dtype=np.float64)
+        rtab = np.zeros((L + 2, L + 1, L + 1, L + 1), dtype=np.float64)
+        boys = np.empty((L + 1, ), dtype=np.float64)
+        pc = np.empty((3, ), dtype=np.float64)
+    cart[:, :, :] = 0.0
+    for i in range(ptr[a], ptr[a + 1]):
+        ai = alpha[i]
+        for j in range(ptr[b], ptr[b + 1]):
+            aj = alpha[j]
+            p = ai + aj
+            mu = ai*aj/p
+            if mu*ab2 > 700.0:
+                continue
+            cc = coef[i]*coef[j]*np.exp(-mu*ab2)
+            p2 = 0.5/p
+            if op == _NUCLEAR:
+                # P - A = -aj/p (A - B) and P - B = ai/p (A - B)
+                for d in range(3):
+                    _hermite_table(-aj/p*ab[d], ai/p*ab[d], p2, la, lb, her[d])
+                for c in range(len(charges)):
+                    for d in range(3):
+                        pc[d] = (ai*center[a, d] + aj*center[b, d])/p - points[c, d]
+                    _hermite_coulomb(p, pc, L, boys, rtab)
+                    pre = -charges[c]*cc*2*np.pi/p
+                    for u in range(nca):
+                        l1, m1, n1 = pwa[u, 0], pwa[u, 1], pwa[u, 2]
+                        for v in range(ncb):
+                            l2, m2, n2 = pwb[v, 0], pwb[v, 1], pwb[v, 2]
+                            val = 0.0
+                            for t in range(l1 + l2 + 1):
+                                et = her[0, l1, l2, t]
+                                if et == 0.0:
+                                    continue
+                                for s in range(m1 + m2 + 1):
+                                    es = et*her[1, m1, m2, s]
+                                    if es == 0.0:
+                                        continue
+                                    for r in range(n1 + n2 + 1):
+                                        val += es*her[2, n1, n2, r]*rtab[0, t, s, r]
+                            cart[0, u, v] += pre*val
+                continue
+            pre = cc*(np.pi/p)**1.5
+            for d in range(3):
+                _os_table(-aj/p*ab[d], ai/p*ab[d], p2, la, lb + ext, tab[d])
+            if op == _KINETIC:
+                # -1/2 d2/dx2 acting on B
+                for d in range(3):
+                    for k in range(la + 1):
+                        for l in range(lb + 1):
+                            v = 4*aj*aj*tab[d, k, l + 2] - 2*aj*(2*l + 1)*tab[d, k, l]
+                            if l > 1:
+                                v += l*(l - 1)*tab[d, k, l - 2]
+                            op1[d, k, l] = -0.5*v
+            elif op == _DIPOLE or op == _QUADRUPOLE:
+                for d in range(3):
+                    for k in range(la + 1):
+                        for l in range(lb + 1):
+                            s0 = tab[d, k, l]
+                            s1 = tab[d, k, l + 1]
+                            op1[d, k, l] = s1 + bc[d]*s0
+                            op2[d, k, l] = tab[d, k, l + 2] + 2*bc[d]*s1 + bc[d]*bc[d]*s0
+            for u in range(nca):
+                l1, m1, n1 = pwa[u, 0], pwa[u, 1], pwa[u, 2]
+                for v in range(ncb):
+                    l2, m2, n2 = pwb[v, 0], pwb[v, 1], pwb[v, 2]
+                    sx = tab[0, l1, l2]
+                    sy = tab[1, m1, m2]
+                    sz = tab[2, n1, n2]
+                    if op == _OVERLAP:
+                        cart[0, u, v] += pre*sx*sy*sz
+                    elif op == _KINETIC:
+                        cart[0, u, v] += pre*(op1[0, l1, l2]*sy*sz +
+                                              sx*op1[1, m1, m2]*sz +
+                                              sx*sy*op1[2, n1, n2])
+                    elif op == _DIPOLE:
+                        cart[0, u, v] += pre*op1[0, l1, l2]*sy*sz
+                        cart[1, u, v] += pre*sx*op1[1, m1, m2]*sz
+                        cart[2, u, v] += pre*sx*sy*op1[2, n1, n2]
+                    else:
+                        s = (sx, sy, sz)
+                        m = (op1[0, l1, l2], op1[1, m1, m2], op1[2, n1, n2])
+                        q = (op2[0, l1, l2], op2[1, m1, m2], op2[2, n1, n2])
+                        for k in range(6):
+                            d0 = _quad[k, 0]
+                            d1 = _quad[k, 1]
+                            val = pre
+                            for d in range(3):
+                                if d == d0 and d == d1:
+                                    val *= q[d]
+                                elif d == d0 or d == d1:
+                                    val *= m[d]
+                                else:
+                                    val *= s[d]
+                            cart[k, u, v] += val
+
+
+@jit(nopython=True, nogil=True)
+def _scatter(a, b, cart, tptr, trans, fptr, forder, out):
+    """
+    Transform the contracted Cartesian block of shells a and b to their basis
+    functions, :math:`T_{a}^{T}S^{c}T_{b}`, and write it (and its transpose)
+    to out.
+    """
+    nca, ncb = cart.shape
+    nfa = fptr[a + 1] - fptr[a]
+    nfb = fptr[b + 1] - fptr[b]
+    ta = trans[tptr[a]:tptr[a + 1]].reshape((nca, nfa))
+    tb = trans[tptr[b]:tptr[b + 1]].reshape((ncb, nfb))
+    half = np.zeros((nca, nfb), dtype=np.float64)
+    for i in range(nca):
+        for k in range(ncb):
+            c = cart[i, k]
+            if c != 0.0:
+                for j in range(nfb):
+                    half[i, j] += c*tb[k, j]
+    for fi in range(nfa):
+        mu = forder[fptr[a] + fi]
+        for fj in range(nfb):
+            nu = forder[fptr[b] + fj]
+            v = 0.0
+            for i in range(nca):
+                v += ta[i, fi]*half[i, fj]
+            out[mu, nu] = v
+            out[nu, mu] = v
+
+
+@jit(nopython=True, nogil=True, parallel=True)
+def _one_electron(op, ncomp, pairs, center, lval, ptr, alpha, coef, tptr,
+                  trans, fptr, forder, points, charges, out):
+    """
+    Contracted one-electron integrals of all given shell pairs, parallel over
+    pairs. As every basis function belongs to exactly one shell, each pair
+    writes to its own blocks of out.
+
+    Args:
+        op (int): Operator (overlap, kinetic, dipole, quadrupole or nuclear)
+        ncomp (int): Number of components of the operator
+        pairs (array): Shell pairs (npair, 2)
+        center (array): Shell centers (nshell, 3)
+        lval (array): Shell angular momenta
+        ptr (array): Offsets of the primitives of each shell
+        alpha (array): Primitive exponents
+        coef (array): Primitive (normalized) contraction coefficients
+        tptr (array): Offsets of the transformation matrix of each shell
+        trans (array): Cartesian to basis function matrices (ncart, nfunc) of all shells
+        fptr (array): Offsets of the functions of each shell (into forder)
+        forder (array): Basis function indices sorted by shell
+        points (array): Multipole origin (first row) or nuclear positions (npoint, 3)
+        charges (array): Nuclear charges (npoint, )
+        out (array): Output matrices (ncomp, nbas, nbas)
+    """
+    for k in prange(len(pairs)):
+        a = pairs[k, 0]
+        b = pairs[k, 1]
+        cart = np.empty((ncomp, (lval[a] + 1)*(lval[a] + 2)//2,
+                         (lval[b] + 1)*(lval[b] + 2)//2), dtype=np.float64)
+        _pair_integrals(op, a, b, center, lval, ptr, alpha, coef, points,
+                        charges, cart)
+        for c in range(ncomp):
+            _scatter(a, b, cart[c], tptr, trans, fptr, forder, out[c])
+
+
+def shell_transforms(shells):
+    """
+    Matrices mapping the Cartesian components (in enum_cartesian order) of
+    each shell to its basis functions: columns of the Cartesian to spherical
+    matrix for solid harmonics, unit vectors for Cartesian functions.
+
+    Args:
+        shells (:class:`~exatomic.algorithms.numerical.Shells`): Basis functions
+
+    Returns:
+        tptr (array): Offsets of the (ncart, nfunc) matrix of each shell
+        trans (array): Flattened (row major) matrices of all shells
+    """
+    fptr, forder = shells.function_order()
+    ncart = (shells.L + 1)*(shells.L + 2)//2
+    tptr = np.zeros((shells.nshell + 1, ), dtype=np.int64)
+    tptr[1:] = np.cumsum(ncart*np.diff(fptr))
+    trans = np.zeros((tptr[-1], ), dtype=np.float64)
+    for s, L in enumerate(shells.L):
+        funcs = forder[fptr[s]:fptr[s + 1]]
+        block = trans[tptr[s]:tptr[s + 1]].reshape(ncart[s], len(funcs))
+        if shells.spherical:
+            block[:] = car2sph_matrix(L, enum_cartesian)[:, L + shells.fang[funcs, 0]]
+        else:
+            l, m = shells.fang[funcs, 0], shells.fang[funcs, 1]
+            # Position of (l, m, n) in enum_cartesian order
+            idx = (L - l)*(L - l + 1)//2 + L - l - m
+            block[idx, np.arange(len(funcs))] = 1.0
+    return tptr, trans
+
+
+def shell_pairs(shells, tol=None):
+    """
+    Significant shell pairs (a >= b, see
+    :class:`~exatomic.algorithms.numerical.ShellPairs`), grouped by angular
+    momentum class so that pairs of similar cost are processed together.
+
+    Args:
+        shells (:class:`~exatomic.algorithms.numerical.Shells`): Basis functions
+        tol (float): Screening tolerance (default keep all pairs)
+
+    Returns:
+        pairs (array): Shell pairs (npair, 2)
+    """
+    return shells.pairs(0.0 if tol is None else tol).by_class()
+
+
+def _integrals(shells, op, pairs, tol, points=None, charges=None):
+    """Compute the (ncomp, nbas, nbas) integrals of an operator."""
+    if pairs is None:
+        pairs = shell_pairs(shells, tol)
+    elif isinstance(pairs, ShellPairs):
+        pairs = pairs.by_class()
+    pairs = np.asarray(pairs, dtype=np.int64)
+    points = np.zeros((1, 3)) if points is None else points
+    charges = np.zeros((0, )) if charges is None else charges
+    fptr, forder = shells.function_order()
+    tptr, trans = shell_transforms(shells)
+    ncomp = _ncomp[op]
+    out = np.zeros((ncomp, shells.nbas, shells.nbas), dtype=np.float64)
+    _one_electron(op, ncomp, pairs, shells.center, shells.L, shells.ptr,
+                  shells.alpha, shells.coef, tptr, trans, fptr, forder,
+                  np.ascontiguousarray(points, dtype=np.float64),
+                  np.ascontiguousarray(charges, dtype=np.float64), out)
+    return out
+
+
+def overlap_matrix(shells, pairs=None, tol=1e-14):
+    """
+    Overlap matrix of the contracted basis functions,
+    :math:`S_{\\mu\\nu} = \\int\\chi_{\\mu}\\chi_{\\nu}dV`.
+
+    Args:
+        shells (:class:`~exatomic.algorithms.numerical.Shells`): Basis functions
+        pairs (array): Shell pairs (a >= b) or ShellPairs to compute (default screened pairs)
+        tol (float): Shell pair screening tolerance (see shell_pairs)
+
+    Returns:
+        smat (array): Overlap matrix (nbas, nbas); elements of pairs not computed are zero
+    """
+    return _integrals(shells, _OVERLAP, pairs, tol)[0]
+
+
+def kinetic_matrix(shells, pairs=None, tol=1e-14):
+    """
+    Kinetic energy matrix of the contracted basis functions,
+    :math:`T_{\\mu\\nu} = -\\frac{1}{2}\\int\\chi_{\\mu}\\nabla^{2}\\chi_{\\nu}dV`.
+
+    Args:
+        shells (:class:`~exatomic.algorithms.numerical.Shells`): Basis functions
+        pairs (array): Shell pairs (a >= b) or ShellPairs to compute (default screened pairs)
+        tol (float): Shell pair screening tolerance (see shell_pairs)
+
+    Returns:
+        tmat (array): Kinetic energy matrix (nbas, nbas)
+    """
+    return _integrals(shells, _KINETIC, pairs, tol)[0]
+
+
+def multipole_matrix(shells, order=1, origin=(0.0, 0.0, 0.0), pairs=None,
+                     tol=1e-14):
+    """
+    Dipole (order 1) or quadrupole (order 2) integrals of the contracted basis
+    functions relative to an origin, e.g.
+    :math:`\\int\\chi_{\\mu}\\left(x - O_{x}\\right)\\chi_{\\nu}dV`.
+
+    Args:
+        shells (:class:`~exatomic.algorithms.numerical.Shells`): Basis functions
+        order (int): Multipole order (1 or 2)
+        origin (array): Origin of the multipole operators
+        pairs (array): Shell pairs (a >= b) or ShellPairs to compute (default screened pairs)
+        tol (float): Shell pair screening tolerance (see shell_pairs)
+
+    Returns:
+        mats (array): Components x, y, z (order 1) or xx, xy, xz, yy, yz, zz
+                      (order 2) of shape (ncomp, nbas, nbas)
+    """
+    if order not in (1, 2):
+        raise NotImplementedError("Only dipole and quadrupole integrals are supported.")
+    op = _DIPOLE if order == 1 else _QUADRUPOLE
+    points = np.asarray(origin, dtype=np.float64).reshape(1, 3)
+    return _integrals(shells, op, pairs, tol, points=points)
+
+
+def nuclear_matrix(shells, xyz, charges, pairs=None, tol=1e-14):
+    """
+    Nuclear attraction integrals of the contracted basis functions,
+    :math:`V_{\\mu\\nu} = -\\sum_{C}Z_{C}\\int\\frac{\\chi_{\\mu}\\chi_{\\nu}}{\\left|\\mathbf{r} - \\mathbf{R}_{C}\\right|}dV`.
+
+    Args:
+        shells (:class:`~exatomic.algorithms.numerical.Shells`): Basis functions
+        xyz (array): Nuclear positions (nnuc, 3)
+        charges (array): Nuclear charges (nnuc, )
+        pairs (array): Shell pairs (a >= b) or ShellPairs to compute (default screened pairs)
+        tol (float): Shell pair screening tolerance (see shell_pairs)
+
+    Returns:
+        vmat (array): Nuclear attraction matrix (nbas, nbas)
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    return _integrals(shells, _NUCLEAR, pairs, tol, points=xyz,
+                      charges=np.asarray(charges, dtype=np.float64))[0]
+
+
+def lower_triangle(mats, columns, frame=0):
+    """
+    Table of the lower triangles (chi0 >= chi1) of symmetric matrices in the
+    layout of :class:`~exatomic.core.basis.Overlap` (or the multipole table).
+
+    Args:
+        mats (array): Matrices (nmat, nbas, nbas)
+        columns (list): Column name of each matrix
+        frame (int): Frame index
+
+    Returns:
+        df (:class:`~pandas.DataFrame`): Columns chi0, chi1, frame and the matrix columns
+    """
+    chi0, chi1 = np.tril_indices(mats.shape[-1])
+    df = pd.DataFrame.from_dict({'chi0': chi0, 'chi1': chi1, 'frame': frame})
+    for col, mat in zip(columns, mats):
+        df[col] = mat[chi0, chi1]
+    return df
@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Isosurfaces and Contours
+##########################
+Marching cubes extraction of triangle meshes from scalar fields on (possibly
+non-orthogonal) uniform grids. Vertices lie on the grid edges crossed by the
+isovalue (linearly interpolated) and are shared between neighboring cubes, so
+the resulting meshes are indexed (welded). The lookup tables and the cube
+vertex/edge numbering are the same as those of the JavaScript implementation
+(see appthree.js). Contour lines of 2D slices are computed with marching
+squares for any number of levels in a single pass.
+
+.. code-block:: Python
+
+    verts, faces = marching_cubes(values, 0.03)                 # values.shape == (nx, ny, nz)
+    meshes = field.isosurfaces(0, [0.03, -0.03])                # From an AtomicField
+    segs, ptr = marching_squares(plane, contour_levels(10, (-7, -1)))
+    segs, ptr = field.contours(0, contour_levels(10, (-7, -1)), axis='z', value=0.0)
+"""
+import numpy as np
+from numba import jit
+
+
+# Cube vertex offsets (i, j, k) and edges (pairs of cube vertices)
+_cube_vertices = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                           [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]], dtype=np.int64)
+_cube_edges = np.array([[0, 1], [1, 2], [2, 3], [3, 0], [4, 5], [5, 6],
+                        [6, 7], [7, 4], [0, 4], [1, 5], [2, 6], [3, 7]], dtype=np.int64)
+# Triangles (as triples of cube edges) for each of the 256 cube configurations;
+# bit m of the configuration is set if the value at vertex m is below the isovalue.
+_tri_table = [
+    [],
+    [0, 8, 3],
+    [0, 1, 9],
+    [1, 8, 3, 9, 8, 1],
+    [1, 2, 10],
+    [0, 8, 3, 1, 2, 10],
+    [9, 2, 10, 0, 2, 9],
+    [2, 8, 3, 2, 10, 8, 10, 9, 8],
+    [3, 11, 2],
+    [0, 11, 2, 8, 11, 0],
+    [1, 9, 0, 2, 3, 11],
+    [1, 11, 2, 1, 9, 11, 9, 8, 11],
+    [3, 10, 1, 11, 10, 3],
+    [0, 10, 1, 0, 8, 10, 8, 11, 10],
+    [3, 9, 0, 3, 11, 9, 11, 10, 9],
+    [9, 8, 10, 10, 8, 11],
+    [4, 7, 8],
+    [4, 3, 0, 7, 3, 4],
+    [0, 1, 9, 8, 4, 7],
+    [4, 1, 9, 4, 7, 1, 7, 3, 1],
+    [1, 2, 10, 8, 4, 7],
+    [3, 4, 7, 3, 0, 4, 1, 2, 10],
+    [9, 2, 10, 9, 0, 2, 8, 4, 7],
+    [2, 10, 9, 2, 9, 7, 2, 7, 3, 7, 9, 4],
+    [8, 4, 7, 3, 11, 2],
+    [11, 4, 7, 11, 2, 4, 2, 0, 4],
+    [9, 0, 1, 8, 4, 7, 2, 3, 11],
+    [4, 7, 11, 9, 4, 11, 9, 11, 2, 9, 2, 1],
+    [3, 10, 1, 3, 11, 10, 7, 8, 4],
+    [1, 11, 10, 1, 4, 11, 1, 0, 4, 7, 11, 4],
+    [4, 7, 8, 9, 0, 11, 9, 11, 10, 11, 0, 3],
+    [4, 7, 11, 4, 11, 9, 9, 11, 10],
+    [9, 5, 4],
+    [9, 5, 4, 0, 8, 3],
+    [0, 5, 4, 1, 5, 0],
+    [8, 5, 4, 8, 3, 5, 3, 1, 5],
+    [1, 2, 10, 9, 5, 4],
+    [3, 0, 8, 1, 2, 10, 4, 9, 5],
+    [5, 2, 10, 5, 4, 2, 4, 0, 2],
+    [2, 10, 5, 3, 2, 5, 3, 5, 4, 3, 4, 8],
+    [9, 5, 4, 2, 3, 11],
+    [0, 11, 2, 0, 8, 11, 4, 9, 5],
+    [0, 5, 4, 0, 1, 5, 2, 3, 11],
+    [2, 1, 5, 2, 5, 8, 2, 8, 11, 4, 8, 5],
+    [10, 3, 11, 10, 1, 3, 9, 5, 4],
+    [4, 9, 5, 0, 8, 1, 8, 10, 1, 8, 11, 10],
+    [5, 4, 0, 5, 0, 11, 5, 11, 10, 11, 0, 3],
+    [5, 4, 8, 5, 8, 10, 10, 8, 11],
+    [9, 7, 8, 5, 7, 9],
+    [9, 3, 0, 9, 5, 3, 5, 7, 3],
+    [0, 7, 8, 0, 1, 7, 1, 5, 7],
+    [1, 5, 3, 3, 5, 7],
+    [9, 7, 8, 9, 5, 7, 10, 1, 2],
+    [10, 1, 2, 9, 5, 0, 5, 3, 0, 5, 7, 3],
+    [8, 0, 2, 8, 2, 5, 8, 5, 7, 10, 5, 2],
+    [2, 10, 5, 2, 5, 3, 3, 5, 7],
+    [7, 9, 5, 7, 8, 9, 3, 11, 2],
+    [9, 5, 7, 9, 7, 2, 9, 2, 0, 2, 7, 11],
+    [2, 3, 11, 0, 1, 8, 1, 7, 8, 1, 5, 7],
+    [11, 2, 1, 11, 1, 7, 7, 1, 5],
+    [9, 5, 8, 8, 5, 7, 10, 1, 3, 10, 3, 11],
+    [5, 7, 0, 5, 0, 9, 7, 11, 0, 1, 0, 10, 11, 10, 0],
+    [11, 10, 0, 11, 0, 3, 10, 5, 0, 8, 0, 7, 5, 7, 0],
+    [11, 10, 5, 7, 11, 5],
+    [10, 6, 5],
+    [0, 8, 3, 5, 10, 6],
+    [9, 0, 1, 5, 10, 6],
+    [1, 8, 3, 1, 9, 8, 5, 10, 6],
+    [1, 6, 5, 2, 6, 1],
+    [1, 6, 5, 1, 2, 6, 3, 0, 8],
+    [9, 6, 5, 9, 0, 6, 0, 2, 6],
+    [5, 9, 8, 5, 8, 2, 5, 2, 6, 3, 2, 8],
+    [2, 3, 11, 10, 6, 5],
+    [11, 0, 8, 11, 2, 0, 10, 6, 5],
+    [0, 1, 9, 2, 3, 11, 5, 10, 6],
+    [5, 10, 6, 1, 9, 2, 9, 11, 2, 9, 8, 11],
+    [6, 3, 11, 6, 5, 3, 5, 1, 3],
+    [0, 8, 11, 0, 11, 5, 0, 5, 1, 5, 11, 6],
+    [3, 11, 6, 0, 3, 6, 0, 6, 5, 0, 5, 9],
+    [6, 5, 9, 6, 9, 11, 11, 9, 8],
+    [5, 10, 6, 4, 7, 8],
+    [4, 3, 0, 4, 7, 3, 6, 5, 10],
+    [1, 9, 0, 5, 10, 6, 8, 4, 7],
+    [10, 6, 5, 1, 9, 7, 1, 7, 3, 7, 9, 4],
+    [6, 1, 2, 6, 5, 1, 4, 7, 8],
+    [1, 2, 5, 5, 2, 6, 3, 0, 4, 3, 4, 7],
+    [8, 4, 7, 9, 0, 5, 0, 6, 5, 0, 2, 6],
+    [7, 3, 9, 7, 9, 4, 3, 2, 9, 5, 9, 6, 2, 6, 9],
+    [3, 11, 2, 7, 8, 4, 10, 6, 5],
+    [5, 10, 6, 4, 7, 2, 4, 2, 0, 2, 7, 11],
+    [0, 1, 9, 4, 7, 8, 2, 3, 11, 5, 10, 6],
+    [9, 2, 1, 9, 11, 2, 9, 4, 11, 7, 11, 4, 5, 10, 6],
+    [8, 4, 7, 3, 11, 5, 3, 5, 1, 5, 11, 6],
+    [5, 1, 11, 5, 11, 6, 1, 0, 11, 7, 11, 4, 0, 4, 11],
+    [0, 5, 9, 0, 6, 5, 0, 3, 6, 11, 6, 3, 8, 4, 7],
+    [6, 5, 9, 6, 9, 11, 4, 7, 9, 7, 11, 9],
+    [10, 4, 9, 6, 4, 10],
+    [4, 10, 6, 4, 9, 10, 0, 8, 3],
+    [10, 0, 1, 10, 6, 0, 6, 4, 0],
+    [8, 3, 1, 8, 1, 6, 8, 6, 4, 6, 1, 10],
+    [1, 4, 9, 1, 2, 4, 2, 6, 4],
+    [3, 0, 8, 1, 2, 9, 2, 4, 9, 2, 6, 4],
+    [0, 2, 4, 4, 2, 6],
+    [8, 3, 2, 8, 2, 4, 4, 2, 6],
+    [10, 4, 9, 10, 6, 4, 11, 2, 3],
+    [0, 8, 2, 2, 8, 11, 4, 9, 10, 4, 10, 6],
+    [3, 11, 2, 0, 1, 6, 0, 6, 4, 6, 1, 10],
+    [6, 4, 1, 6, 1, 10, 4, 8, 1, 2, 1, 11, 8, 11, 1],
+    [9, 6, 4, 9, 3, 6, 9, 1, 3, 11, 6, 3],
+    [8, 11, 1, 8, 1, 0, 11, 6, 1, 9, 1, 4, 6, 4, 1],
+    [3, 11, 6, 3, 6, 0, 0, 6, 4],
+    [6, 4, 8, 11, 6, 8],
+    [7, 10, 6, 7, 8, 10, 8, 9, 10],
+    [0, 7, 3, 0, 10, 7, 0, 9, 10, 6, 7, 10],
+    [10, 6, 7, 1, 10, 7, 1, 7, 8, 1, 8, 0],
+    [10, 6, 7, 10, 7, 1, 1, 7, 3],
+    [1, 2, 6, 1, 6, 8, 1, 8, 9, 8, 6, 7],
+    [2, 6, 9, 2, 9, 1, 6, 7, 9, 0, 9, 3, 7, 3, 9],
+    [7, 8, 0, 7, 0, 6, 6, 0, 2],
+    [7, 3, 2, 6, 7, 2],
+    [2, 3, 11, 10, 6, 8, 10, 8, 9, 8, 6, 7],
+    [2, 0, 7, 2, 7, 11, 0, 9, 7, 6, 7, 10, 9, 10, 7],
+    [1, 8, 0, 1, 7, 8, 1, 10, 7, 6, 7, 10, 2, 3, 11],
+    [11, 2, 1, 11, 1, 7, 10, 6, 1, 6, 7, 1],
+    [8, 9, 6, 8, 6, 7, 9, 1, 6, 11, 6, 3, 1, 3, 6],
+    [0, 9, 1, 11, 6, 7],
+    [7, 8, 0, 7, 0, 6, 3, 11, 0, 11, 6, 0],
+    [7, 11, 6],
+    [7, 6, 11],
+    [3, 0, 8, 11, 7, 6],
+    [0, 1, 9, 11, 7, 6],
+    [8, 1, 9, 8, 3, 1, 11, 7, 6],
+    [10, 1, 2, 6, 11, 7],
+    [1, 2, 10, 3, 0, 8, 6, 11, 7],
+    [2, 9, 0, 2, 10, 9, 6, 11, 7],
+    [6, 11, 7, 2, 10, 3, 10, 8, 3, 10, 9, 8],
+    [7, 2, 3, 6, 2, 7],
+    [7, 0, 8, 7, 6, 0, 6, 2, 0],
+    [2, 7, 6, 2, 3, 7, 0, 1, 9],
+    [1, 6, 2, 1, 8, 6, 1, 9, 8, 8, 7, 6],
+    [10, 7, 6, 10, 1, 7, 1, 3, 7],
+    [10, 7, 6, 1, 7, 10, 1, 8, 7, 1, 0, 8],
+    [0, 3, 7, 0, 7, 10, 0, 10, 9, 6, 10, 7],
+    [7, 6, 10, 7, 10, 8, 8, 10, 9],
+    [6, 8, 4, 11, 8, 6],
+    [3, 6, 11, 3, 0, 6, 0, 4, 6],
+    [8, 6, 11, 8, 4, 6, 9, 0, 1],
+    [9, 4, 6, 9, 6, 3, 9, 3, 1, 11, 3, 6],
+    [6, 8, 4, 6, 11, 8, 2, 10, 1],
+    [1, 2, 10, 3, 0, 11, 0, 6, 11, 0, 4, 6],
+    [4, 11, 8, 4, 6, 11, 0, 2, 9, 2, 10, 9],
+    [10, 9, 3, 10, 3, 2, 9, 4, 3, 11, 3, 6, 4, 6, 3],
+    [8, 2, 3, 8, 4, 2, 4, 6, 2],
+    [0, 4, 2, 4, 6, 2],
+    [1, 9, 0, 2, 3, 4, 2, 4, 6, 4, 3, 8],
+    [1, 9, 4, 1, 4, 2, 2, 4, 6],
+    [8, 1, 3, 8, 6, 1, 8, 4, 6, 6, 10, 1],
+    [10, 1, 0, 10, 0, 6, 6, 0, 4],
+    [4, 6, 3, 4, 3, 8, 6, 10, 3, 0, 3, 9, 10, 9, 3],
+    [10, 9, 4, 6, 10, 4],
+    [4, 9, 5, 7, 6, 11],
+    [0, 8, 3, 4, 9, 5, 11, 7, 6],
+    [5, 0, 1, 5, 4, 0, 7, 6, 11],
+    [11, 7, 6, 8, 3, 4, 3, 5, 4, 3, 1, 5],
+    [9, 5, 4, 10, 1, 2, 7, 6, 11],
+    [6, 11, 7, 1, 2, 10, 0, 8, 3, 4, 9, 5],
+    [7, 6, 11, 5, 4, 10, 4, 2, 10, 4, 0, 2],
+    [3, 4, 8, 3, 5, 4, 3, 2, 5, 10, 5, 2, 11, 7, 6],
+    [7, 2, 3, 7, 6, 2, 5, 4, 9],
+    [9, 5, 4, 0, 8, 6, 0, 6, 2, 6, 8, 7],
+    [3, 6, 2, 3, 7, 6, 1, 5, 0, 5, 4, 0],
+    [6, 2, 8, 6, 8, 7, 2, 1, 8, 4, 8, 5, 1, 5, 8],
+    [9, 5, 4, 10, 1, 6, 1, 7, 6, 1, 3, 7],
+    [1, 6, 10, 1, 7, 6, 1, 0, 7, 8, 7, 0, 9, 5, 4],
+    [4, 0, 10, 4, 10, 5, 0, 3, 10, 6, 10, 7, 3, 7, 10],
+    [7, 6, 10, 7, 10, 8, 5, 4, 10, 4, 8, 10],
+    [6, 9, 5, 6, 11, 9, 11, 8, 9],
+    [3, 6, 11, 0, 6, 3, 0, 5, 6, 0, 9, 5],
+    [0, 11, 8, 0, 5, 11, 0, 1, 5, 5, 6, 11],
+    [6, 11, 3, 6, 3, 5, 5, 3, 1],
+    [1, 2, 10, 9, 5, 11, 9, 11, 8, 11, 5, 6],
+    [0, 11, 3, 0, 6, 11, 0, 9, 6, 5, 6, 9, 1, 2, 10],
+    [11, 8, 5, 11, 5, 6, 8, 0, 5, 10, 5, 2, 0, 2, 5],
+    [6, 11, 3, 6, 3, 5, 2, 10, 3, 10, 5, 3],
+    [5, 8, 9, 5, 2, 8, 5, 6, 2, 3, 8, 2],
+    [9, 5, 6, 9, 6, 0, 0, 6, 2],
+    [1, 5, 8, 1, 8, 0, 5, 6, 8, 3, 8, 2, 6, 2, 8],
+    [1, 5, 6, 2, 1, 6],
+    [1, 3, 6, 1, 6, 10, 3, 8, 6, 5, 6, 9, 8, 9, 6],
+    [10, 1, 0, 10, 0, 6, 9, 5, 0, 5, 6, 0],
+    [0, 3, 8, 5, 6, 10],
+    [10, 5, 6],
+    [11, 5, 10, 7, 5, 11],
+    [11, 5, 10, 11, 7, 5, 8, 3, 0],
+    [5, 11, 7, 5, 10, 11, 1, 9, 0],
+    [10, 7, 5, 10, 11, 7, 9, 8, 1, 8, 3, 1],
+    [11, 1, 2, 11, 7, 1, 7, 5, 1],
+    [0, 8, 3, 1, 2, 7, 1, 7, 5, 7, 2, 11],
+    [9, 7, 5, 9, 2, 7, 9, 0, 2, 2, 11, 7],
+    [7, 5, 2, 7, 2, 11, 5, 9, 2, 3, 2, 8, 9, 8, 2],
+    [2, 5, 10, 2, 3, 5, 3, 7, 5],
+    [8, 2, 0, 8, 5, 2, 8, 7, 5, 10, 2, 5],
+    [9, 0, 1, 5, 10, 3, 5, 3, 7, 3, 10, 2],
+    [9, 8, 2, 9, 2, 1, 8, 7, 2, 10, 2, 5, 7, 5, 2],
+    [1, 3, 5, 3, 7, 5],
+    [0, 8, 7, 0, 7, 1, 1, 7, 5],
+    [9, 0, 3, 9, 3, 5, 5, 3, 7],
+    [9, 8, 7, 5, 9, 7],
+    [5, 8, 4, 5, 10, 8, 10, 11, 8],
+    [5, 0, 4, 5, 11, 0, 5, 10, 11, 11, 3, 0],
+    [0, 1, 9, 8, 4, 10, 8, 10, 11, 10, 4, 5],
+    [10, 11, 4, 10, 4, 5, 11, 3, 4, 9, 4, 1, 3, 1, 4],
+    [2, 5, 1, 2, 8, 5, 2, 11, 8, 4, 5, 8],
+    [0, 4, 11, 0, 11, 3, 4, 5, 11, 2, 11, 1, 5, 1, 11],
+    [0, 2, 5, 0, 5, 9, 2, 11, 5, 4, 5, 8, 11, 8, 5],
+    [9, 4, 5, 2, 11, 3],
+    [2, 5, 10, 3, 5, 2, 3, 4, 5, 3, 8, 4],
+    [5, 10, 2, 5, 2, 4, 4, 2, 0],
+    [3, 10, 2, 3, 5, 10, 3, 8, 5, 4, 5, 8, 0, 1, 9],
+    [5, 10, 2, 5, 2, 4, 1, 9, 2, 9, 4, 2],
+    [8, 4, 5, 8, 5, 3, 3, 5, 1],
+    [0, 4, 5, 1, 0, 5],
+    [8, 4, 5, 8, 5, 3, 9, 0, 5, 0, 3, 5],
+    [9, 4, 5],
+    [4, 11, 7, 4, 9, 11, 9, 10, 11],
+    [0, 8, 3, 4, 9, 7, 9, 11, 7, 9, 10, 11],
+    [1, 10, 11, 1, 11, 4, 1, 4, 0, 7, 4, 11],
+    [3, 1, 4, 3, 4, 8, 1, 10, 4, 7, 4, 11, 10, 11, 4],
+    [4, 11, 7, 9, 11, 4, 9, 2, 11, 9, 1, 2],
+    [9, 7, 4, 9, 11, 7, 9, 1, 11, 2, 11, 1, 0, 8, 3],
+    [11, 7, 4, 11, 4, 2, 2, 4, 0],
+    [11, 7, 4, 11, 4, 2, 8, 3, 4, 3, 2, 4],
+    [2, 9, 10, 2, 7, 9, 2, 3, 7, 7, 4, 9],
+    [9, 10, 7, 9, 7, 4, 10, 2, 7, 8, 7, 0, 2, 0, 7],
+    [3, 7, 10, 3, 10, 2, 7, 4, 10, 1, 10, 0, 4, 0, 10],
+    [1, 10, 2, 8, 7, 4],
+    [4, 9, 1, 4, 1, 7, 7, 1, 3],
+    [4, 9, 1, 4, 1, 7, 0, 8, 1, 8, 7, 1],
+    [4, 0, 3, 7, 4, 3],
+    [4, 8, 7],
+    [9, 10, 8, 10, 11, 8],
+    [3, 0, 9, 3, 9, 11, 11, 9, 10],
+    [0, 1, 10, 0, 10, 8, 8, 10, 11],
+    [3, 1, 10, 11, 3, 10],
+    [1, 2, 11, 1, 11, 9, 9, 11, 8],
+    [3, 0, 9, 3, 9, 11, 1, 2, 9, 2, 11, 9],
+    [0, 2, 11, 8, 0, 11],
+    [3, 2, 11],
+    [2, 3, 8, 2, 8, 10, 10, 8, 9],
+    [9, 10, 2, 0, 9, 2],
+    [2, 3, 8, 2, 8, 10, 0, 1, 8, 1, 10, 8],
+    [1, 10, 2],
+    [1, 3, 8, 9, 1, 8],
+    [0, 9, 1],
+    [0, 3, 8],
+    [],
+]
+
+
+def _tables():
+    """Padded triangle table, triangle counts, and grid edge of each cube edge."""
+    tris = np.full((256, 16), -1, dtype=np.int64)
+    ntri = np.zeros((256, ), dtype=np.int64)
+    for case, edges in enumerate(_tri_table):
+        tris[case, :len(edges)] = edges
+        ntri[case] = len(edges) // 3
+    a = _cube_vertices[_cube_edges[:, 0]]
+    b = _cube_vertices[_cube_edges[:, 1]]
+    eaxis = np.argmax(a != b, axis=1)
+    eoff = np.minimum(a, b)
+    return tris, ntri, eaxis, eoff
+
+
+_tris, _ntri, _eaxis, _eoff = _tables()
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _marching_cubes(v, iso, tris, ntri, eaxis, eoff, cverts):
+    """
+    Marching cubes on a 3D array; returns vertices in fractional grid
+    index coordinates and faces (triples of vertex indices).
+    """
+    nx, ny, nz = v.shape
+    # Vertices on the grid edges (along x, y and z) crossed by the isovalue
+    ids = np.full((3, nx, ny, nz), -1, dtype=np.int32)
+    nv = 0
+    for i in range(nx):
+        for j in range(ny):
+            for k in range(nz):
+                below = v[i, j, k] < iso
+                if i + 1 < nx and (v[i + 1, j, k] < iso) != below:
+                    ids[0, i, j, k] = nv
+                    nv += 1
+                if j + 1 < ny and (v[i, j + 1, k] < iso) != below:
+                    ids[1, i, j, k] = nv
+                    nv += 1
+                if k + 1 < nz and (v[i, j, k + 1] < iso) != below:
+                    ids[2, i, j, k] = nv
+                    nv += 1
+    verts = np.empty((nv, 3), dtype=np.float64)
+    for i in range(nx):
+        for j in range(ny):
+            for k in range(nz):
+                for d in range(3):
+                    n = ids[d, i, j, k]
+                    if n < 0:
+                        continue
+                    a = v[i, j, k]
+                    if d == 0:
+                        b = v[i + 1, j, k]
+                    elif d == 1:
+                        b = v[i, j + 1, k]
+                    else:
+                        b = v[i, j, k + 1]
+                    t = (iso - a) / (b - a)
+                    verts[n, 0] = i
+                    verts[n, 1] = j
+                    verts[n, 2] = k
+                    verts[n, d] += t
+    # Cube configurations and triangle count
+    cases = np.zeros((max(nx - 1, 0), max(ny - 1, 0), max(nz - 1, 0)), dtype=np.uint8)
+    nf = 0
+    for i in range(nx - 1):
+        for j in range(ny - 1):
+            for k in range(nz - 1):
+                case = 0
+                for m in range(8):
+                    if v[i + cverts[m, 0], j + cverts[m, 1], k + cverts[m, 2]] < iso:
+                        case |= 1 << m
+                cases[i, j, k] = case
+                nf += ntri[case]
+    faces = np.empty((nf, 3), dtype=np.int64)
+    f = 0
+    for i in range(nx - 1):
+        for j in range(ny - 1):
+            for k in range(nz - 1):
+                case = cases[i, j, k]
+                for q in range(ntri[case]):
+                    for c in range(3):
+                        e = tris[case, 3*q + c]
+                        faces[f, c] = ids[eaxis[e], i + eoff[e, 0], j + eoff[e, 1],
+                                          k + eoff[e, 2]]
+                    f += 1
+    return verts, faces
+
+
+def marching_cubes(values, isovalue, origin=None, basis=None):
+    """
+    Extract the isosurface of a scalar field on a uniform grid.
+
+    Args:
+        values (array): Field values of shape (nx, ny, nz)
+        isovalue (float): Isovalue of the surface
+        origin (array): Position of the first grid point (default the origin)
+        basis (array): Rows are the grid step vectors along i, j and k (default unit steps)
+
+    Returns:
+        verts (array): Vertex positions (nverts, 3)
+        faces (array): Triangles as vertex indices (nfaces, 3)
+    """
+    values = np.asarray(values)
+    if values.ndim != 3:
+        raise ValueError("values must be a 3D array, not {}D".format(values.ndim))
+    verts, faces = _marching_cubes(values, float(isovalue), _tris, _ntri, _eaxis,
+                                   _eoff, _cube_vertices)
+    if basis is not None:
+        verts = np.dot(verts, np.asarray(basis, dtype=np.float64))
+    if origin is not None:
+        verts += np.asarray(origin, dtype=np.float64)
+    return verts, faces
+
+
+# Edges (pairs of square corners (0, 0), (1, 0), (1, 1), (0, 1)) joined by
+# contour segments for each of the 16 square configurations; bit m is set if
+# the value at corner m is at or above the level. Saddles (5 and 10) are
+# given for a center value below the level; the other resolution is the
+# complementary configuration.
+_square_corners = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.int64)
+_square_edges = np.array([[0, 1], [1, 2], [2, 3], [3, 0]], dtype=np.int64)
+_square_table = np.array([[-1, -1, -1, -1], [3, 0, -1, -1], [0, 1, -1, -1], [3, 1, -1, -1],
+                          [1, 2, -1, -1], [3, 0, 1, 2], [0, 2, -1, -1], [3, 2, -1, -1],
+                          [2, 3, -1, -1], [0, 2, -1, -1], [0, 1, 2, 3], [1, 2, -1, -1],
+                          [1, 3, -1, -1], [0, 1, -1, -1], [3, 0, -1, -1], [-1, -1, -1, -1]],
+                         dtype=np.int64)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _square_case(v, i, j, lev, corners):
+    """Configuration of square (i, j) for a given level (saddles resolved)."""
+    case = 0
+    for m in range(4):
+        if v[i + corners[m, 0], j + corners[m, 1]] >= lev:
+            case |= 1 << m
+    if case == 5 or case == 10:
+        center = 0.25*(v[i, j] + v[i + 1, j] + v[i + 1, j + 1] + v[i, j + 1])
+        if center >= lev:
+            case = 15 - case
+    return case
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _marching_squares(v, levels, table, corners, edges):
+    """
+    Marching squares over all levels in one pass over the squares; returns
+    segments (in fractional grid index coordinates) grouped by level and the
+    offsets of each level's segments.
+    """
+    n0, n1 = v.shape
+    nlev = len(levels)
+    counts = np.zeros((nlev, ), dtype=np.int64)
+    for i in range(n0 - 1):
+        for j in range(n1 - 1):
+            lo = min(min(v[i, j], v[i + 1, j]), min(v[i + 1, j + 1], v[i, j + 1]))
+            hi = max(max(v[i, j], v[i + 1, j]), max(v[i + 1, j + 1], v[i, j + 1]))
+            for l in range(np.searchsorted(levels, lo, side='right'),
+                           np.searchsorted(levels, hi, side='right')):
+                case = _square_case(v, i, j, levels[l], corners)
+                counts[l] += (table[case, 0] >= 0) + (table[case, 2] >= 0)
+    ptr = np.zeros((nlev + 1, ), dtype=np.int64)
+    for l in range(nlev):
+        ptr[l + 1] = ptr[l] + counts[l]
+    segs = np.empty((ptr[-1], 2, 2), dtype=np.float64)
+    fill = ptr[:-1].copy()
+    for i in range(n0 - 1):
+        for j in range(n1 - 1):
+            lo = min(min(v[i, j], v[i + 1, j]), min(v[i + 1, j + 1], v[i, j + 1]))
+            hi = max(max(v[i, j], v[i + 1, j]), max(v[i + 1, j + 1], v[i, j + 1]))
+            for l in range(np.searchsorted(levels, lo, side='right'),
+                           np.searchsorted(levels, hi, side='right')):
+                lev = levels[l]
+                case = _square_case(v, i, j, lev, corners)
+                for q in range(0, 4, 2):
+                    if table[case, q] < 0:
+                        break
+                    n = fill[l]
+                    for c in range(2):
+                        e = table[case, q + c]
+                        # Interpolate from the lower corner so that end points
+                        # shared by neighboring squares are identical
+                        a = edges[e, 0]
+                        b = edges[e, 1]
+                        if corners[a, 0] + corners[a, 1] > corners[b, 0] + corners[b, 1]:
+                            a, b = b, a
+                        ia = i + corners[a, 0]
+                        ja = j + corners[a, 1]
+                        ib = i + corners[b, 0]
+                        jb = j + corners[b, 1]
+                        t = (lev - v[ia, ja]) / (v[ib, jb] - v[ia, ja])
+                        segs[n, c, 0] = ia + t*(ib - ia)
+                        segs[n, c, 1] = ja + t*(jb - ja)
+                    fill[l] += 1
+    return segs, ptr
+
+
+def contour_levels(num, lims):
+    """
+    Logarithmically spaced, signed contour levels: num negative and num
+    positive levels whose magnitudes range from 10**lims[0] to 10**lims[1].
+
+    Args:
+        num (int): Number of levels per sign
+        lims (tuple): Exponents (base 10) of the smallest and largest magnitude
+
+    Returns:
+        levels (array): Sorted levels (2 * num)
+    """
+    mags = np.logspace(lims[0], lims[1], num)
+    return np.concatenate([-mags[::-1], mags])
+
+
+def marching_squares(values, levels):
+    """
+    Contour lines of a 2D array for many levels at once.
+
+    Args:
+        values (array): Values of shape (n0, n1)
+        levels (array): Contour levels
+
+    Returns:
+        segs (array): Line segments (nseg, 2, 2) in fractional index coordinates
+        ptr (array): Segments of (sorted) level i are segs[ptr[i]:ptr[i + 1]]
+    """
+    values = np.asarray(values)
+    if values.ndim != 2:
+        raise ValueError("values must be a 2D array, not {}D".format(values.ndim))
+    levels = np.sort(np.asarray(levels, dtype=np.float64))
+    return _marching_squares(values, levels, _square_table, _square_corners,
+                             _square_edges)
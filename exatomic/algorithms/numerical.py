@@ -0,0 +1,1222 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Numerical Basis Functions
+###########################
+Numerical (compiled) evaluation of contracted Gaussian basis functions on
+arbitrary points. Instead of building one symbolic expression per basis
+function (see :mod:`~exatomic.algorithms.basis`), the basis set is packed
+into flat arrays of shells (:class:`~exatomic.algorithms.numerical.Shells`).
+For each shell the radial contraction is computed once per point and the
+angular factors (real solid harmonics or Cartesian monomials) of all of
+its functions are obtained together.
+
+.. code-block:: Python
+
+    x, y, z = numerical_grid_from_field_params(fps)
+    bvs = evaluate_basis(uni, x, y, z)      # (nbas, npts)
+    bvs, grad = evaluate_basis(uni, x, y, z, gradient=True)     # grad is (3, nbas, npts)
+    shells = Shells.from_universe(uni)
+    mos = shells.contract(x, y, z, cmat)    # (ncol, npts), evaluated in chunks
+    rho, grad = shells.density(x, y, z, dmat=dmat, gradient=True)
+    pairs = shells.pairs(tol=1e-12)         # Significant shell pairs (cached)
+"""
+import os
+import hashlib
+import tempfile
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from numba import jit, prange
+
+
+@jit(nopython=True, nogil=True)
+def _solid_harmonics(x, y, z, lmax, out):
+    """
+    Evaluate the (unnormalized) real solid harmonics for all L up to lmax on
+    a set of points using the same recursion as
+    :func:`~exatomic.algorithms.basis.solid_harmonics`. The values for (L, ml)
+    are stored in row L*L + L + ml of out (shape ((lmax + 1)**2, npts)).
+    """
+    n = len(x)
+    for p in range(n):
+        out[0, p] = 1.0
+    for l in range(1, lmax + 1):
+        lp = l - 1
+        kr = 1.0 if lp == 0 else 0.0
+        cur = l*l + l
+        pre = lp*lp + lp
+        fac = np.sqrt(2.0**kr*(2*lp + 1)/(2*lp + 2))
+        for p in range(n):
+            sp = out[pre + lp, p]
+            sm = out[pre - lp, p]
+            out[cur - l, p] = fac*(y[p]*sp + (1 - kr)*x[p]*sm)
+            out[cur + l, p] = fac*(x[p]*sp - (1 - kr)*y[p]*sm)
+        for ml in range(-l + 1, l):
+            a = (2*lp + 1) / np.sqrt((lp + ml + 1)*(lp - ml + 1))
+            b = np.sqrt((lp + ml)*(lp - ml)) / np.sqrt((lp + ml + 1)*(lp - ml + 1))
+            if abs(ml) <= lp - 1:
+                prev = (lp - 1)*(lp - 1) + lp - 1 + ml
+                for p in range(n):
+                    r2 = x[p]*x[p] + y[p]*y[p] + z[p]*z[p]
+                    out[cur + ml, p] = a*z[p]*out[pre + ml, p] - b*r2*out[prev, p]
+            else:
+                for p in range(n):
+                    out[cur + ml, p] = a*z[p]*out[pre + ml, p]
+
+
+@jit(nopython=True, nogil=True)
+def _solid_harmonics_grad(x, y, z, lmax, out, gx, gy, gz):
+    """
+    As :func:`~exatomic.algorithms.numerical._solid_harmonics` but also
+    computes the Cartesian derivatives (gx, gy, gz; same layout as out) by
+    differentiating the recursion.
+    """
+    n = len(x)
+    for p in range(n):
+        out[0, p] = 1.0
+        gx[0, p] = 0.0
+        gy[0, p] = 0.0
+        gz[0, p] = 0.0
+    for l in range(1, lmax + 1):
+        lp = l - 1
+        kr = 1.0 if lp == 0 else 0.0
+        cur = l*l + l
+        pre = lp*lp + lp
+        fac = np.sqrt(2.0**kr*(2*lp + 1)/(2*lp + 2))
+        for p in range(n):
+            sp = out[pre + lp, p]
+            sm = (1 - kr)*out[pre - lp, p]
+            smx = (1 - kr)*gx[pre - lp, p]
+            smy = (1 - kr)*gy[pre - lp, p]
+            smz = (1 - kr)*gz[pre - lp, p]
+            out[cur - l, p] = fac*(y[p]*sp + x[p]*sm)
+            gx[cur - l, p] = fac*(y[p]*gx[pre + lp, p] + sm + x[p]*smx)
+            gy[cur - l, p] = fac*(sp + y[p]*gy[pre + lp, p] + x[p]*smy)
+            gz[cur - l, p] = fac*(y[p]*gz[pre + lp, p] + x[p]*smz)
+            out[cur + l, p] = fac*(x[p]*sp - y[p]*sm)
+            gx[cur + l, p] = fac*(sp + x[p]*gx[pre + lp, p] - y[p]*smx)
+            gy[cur + l, p] = fac*(x[p]*gy[pre + lp, p] - sm - y[p]*smy)
+            gz[cur + l, p] = fac*(x[p]*gz[pre + lp, p] - y[p]*smz)
+        for ml in range(-l + 1, l):
+            a = (2*lp + 1) / np.sqrt((lp + ml + 1)*(lp - ml + 1))
+            b = np.sqrt((lp + ml)*(lp - ml)) / np.sqrt((lp + ml + 1)*(lp - ml + 1))
+            prev = (lp - 1)*(lp - 1) + lp - 1 + ml
+            low = abs(ml) <= lp - 1
+            for p in range(n):
+                q = out[pre + ml, p]
+                out[cur + ml, p] = a*z[p]*q
+                gx[cur + ml, p] = a*z[p]*gx[pre + ml, p]
+                gy[cur + ml, p] = a*z[p]*gy[pre + ml, p]
+                gz[cur + ml, p] = a*(q + z[p]*gz[pre + ml, p])
+                if low:
+                    r2 = x[p]*x[p] + y[p]*y[p] + z[p]*z[p]
+                    t = out[prev, p]
+                    out[cur + ml, p] -= b*r2*t
+                    gx[cur + ml, p] -= b*(2*x[p]*t + r2*gx[prev, p])
+                    gy[cur + ml, p] -= b*(2*y[p]*t + r2*gy[prev, p])
+                    gz[cur + ml, p] -= b*(2*z[p]*t + r2*gz[prev, p])
+
+
+@jit(nopython=True, nogil=True)
+def _shell_chunk(x, y, z, s, center, lval, ptr, alpha, coef, spherical,
+                 fptr, forder, fang, out, row, col, grad):
+    """
+    Evaluate the functions of shell s on a (small) set of points.
+
+    Values are written to out[row + i, col:col + npts] for the i-th function
+    of the shell or, if row is negative, to out[f, col:col + npts] where f is
+    the basis function index. If grad is not empty (shape (3, ) + out.shape)
+    the Cartesian gradients are written to grad[:, row + i, ...] likewise.
+    """
+    n = len(x)
+    L = lval[s]
+    dograd = grad.shape[1] > 0
+    dx = np.empty((n, ), dtype=np.float64)
+    dy = np.empty((n, ), dtype=np.float64)
+    dz = np.empty((n, ), dtype=np.float64)
+    rad = np.zeros((n, ), dtype=np.float64)
+    drad = np.zeros((n, ), dtype=np.float64)
+    for p in range(n):
+        dx[p] = x[p] - center[s, 0]
+        dy[p] = y[p] - center[s, 1]
+        dz[p] = z[p] - center[s, 2]
+    for k in range(ptr[s], ptr[s + 1]):
+        a = alpha[k]
+        c = coef[k]
+        for p in range(n):
+            ar2 = a*(dx[p]*dx[p] + dy[p]*dy[p] + dz[p]*dz[p])
+            if ar2 < 600.0:
+                e = c*np.exp(-ar2)
+                rad[p] += e
+                drad[p] -= 2*a*e
+    if spherical:
+        nsh = (L + 1)*(L + 1)
+        sh = np.empty((nsh, n), dtype=np.float64)
+        if dograd:
+            shx = np.empty((nsh, n), dtype=np.float64)
+            shy = np.empty((nsh, n), dtype=np.float64)
+            shz = np.empty((nsh, n), dtype=np.float64)
+            _solid_harmonics_grad(dx, dy, dz, L, sh, shx, shy, shz)
+        else:
+            _solid_harmonics(dx, dy, dz, L, sh)
+    for k in range(fptr[s], fptr[s + 1]):
+        f = forder[k]
+        i = f if row < 0 else row + k - fptr[s]
+        if spherical:
+            ml = L*L + L + fang[f, 0]
+            for p in range(n):
+                out[i, col + p] = rad[p]*sh[ml, p]
+            if dograd:
+                for p in range(n):
+                    g = drad[p]*sh[ml, p]
+                    grad[0, i, col + p] = rad[p]*shx[ml, p] + g*dx[p]
+                    grad[1, i, col + p] = rad[p]*shy[ml, p] + g*dy[p]
+                    grad[2, i, col + p] = rad[p]*shz[ml, p] + g*dz[p]
+        else:
+            l = fang[f, 0]
+            m = fang[f, 1]
+            nn = fang[f, 2]
+            for p in range(n):
+                out[i, col + p] = rad[p]*dx[p]**l*dy[p]**m*dz[p]**nn
+            if dograd:
+                for p in range(n):
+                    ang = dx[p]**l*dy[p]**m*dz[p]**nn
+                    g = drad[p]*ang
+                    ax = l*dx[p]**(l - 1)*dy[p]**m*dz[p]**nn if l > 0 else 0.0
+                    ay = m*dx[p]**l*dy[p]**(m - 1)*dz[p]**nn if m > 0 else 0.0
+                    az = nn*dx[p]**l*dy[p]**m*dz[p]**(nn - 1) if nn > 0 else 0.0
+                    grad[0, i, col + p] = rad[p]*ax + g*dx[p]
+                    grad[1, i, col + p] = rad[p]*ay + g*dy[p]
+                    grad[2, i, col + p] = rad[p]*az + g*dz[p]
+
+
+@jit(nopython=True, nogil=True, parallel=True)
+def _evaluate_shells(x, y, z, center, lval, ptr, alpha, coef, spherical,
+                     fptr, forder, fang, out, grad, chunk=256):
+    """
+    Evaluate all basis functions on the given points, parallel over shells
+    (points are processed in chunks so that inner loops vectorize).
+
+    Args:
+        x (array): Points in x
+        y (array): Points in y
+        z (array): Points in z
+        center (array): Shell centers (nshell, 3)
+        lval (array): Shell angular momenta
+        ptr (array): Offsets of the primitives of each shell
+        alpha (array): Primitive exponents
+        coef (array): Primitive (normalized) contraction coefficients
+        spherical (bool): Solid harmonic (else Cartesian) functions
+        fptr (array): Offsets of the functions of each shell (into forder)
+        forder (array): Basis function indices sorted by shell
+        fang (array): ml (spherical) or l, m, n (Cartesian) of each function
+        out (array): Output array of shape (nbas, npts)
+        grad (array): Output gradients of shape (3, nbas, npts) (or (3, 0, 0))
+        chunk (int): Number of points processed at once
+    """
+    npts = len(x)
+    for s in prange(len(lval)):
+        for p0 in range(0, npts, chunk):
+            p1 = min(p0 + chunk, npts)
+            _shell_chunk(x[p0:p1], y[p0:p1], z[p0:p1], s, center, lval, ptr,
+                         alpha, coef, spherical, fptr, forder, fang, out, -1, p0,
+                         grad)
+
+
+@jit(nopython=True, nogil=True)
+def _evaluate_block(b, x, y, z, bptr, sptr, slist, center, lval, ptr, alpha,
+                    coef, spherical, fptr, forder, fang, vptr, vals, gvals):
+    """
+    Evaluate the significant shells of block b (see _evaluate_blocks). If
+    gvals is not empty, the gradients of block b are stored (x, y and z
+    components one after the other) in gvals[3*vptr[b]:3*vptr[b + 1]].
+    """
+    p0 = bptr[b]
+    p1 = bptr[b + 1]
+    n = p1 - p0
+    nf = 0
+    for k in range(sptr[b], sptr[b + 1]):
+        s = slist[k]
+        nf += fptr[s + 1] - fptr[s]
+    block = vals[vptr[b]:vptr[b + 1]].reshape((nf, n))
+    if len(gvals):
+        gblock = gvals[3*vptr[b]:3*vptr[b + 1]].reshape((3, nf, n))
+    else:
+        gblock = gvals[:0].reshape((3, 0, 0))
+    row = 0
+    for k in range(sptr[b], sptr[b + 1]):
+        s = slist[k]
+        _shell_chunk(x[p0:p1], y[p0:p1], z[p0:p1], s, center, lval, ptr,
+                     alpha, coef, spherical, fptr, forder, fang, block, row, 0,
+                     gblock)
+        row += fptr[s + 1] - fptr[s]
+
+
+@jit(nopython=True, nogil=True, parallel=True)
+def _evaluate_blocks(x, y, z, bptr, sptr, slist, center, lval, ptr, alpha,
+                     coef, spherical, fptr, forder, fang, vptr, vals, gvals):
+    """
+    Evaluate the significant shells of each block of points, parallel over
+    blocks. The values of block b are stored (row major, one row per
+    function) in vals[vptr[b]:vptr[b + 1]] and, if gvals is not empty, the
+    gradients in gvals[3*vptr[b]:3*vptr[b + 1]].
+
+    Args:
+        x (array): Points in x (sorted by block)
+        y (array): Points in y (sorted by block)
+        z (array): Points in z (sorted by block)
+        bptr (array): Offsets of the points of each block
+        sptr (array): Offsets of the significant shells of each block
+        slist (array): Significant shells of all blocks
+        vptr (array): Offsets of the values of each block
+        vals (array): Output values
+        gvals (array): Output gradients (or empty)
+    """
+    for b in prange(len(bptr) - 1):
+        _evaluate_block(b, x, y, z, bptr, sptr, slist, center, lval, ptr,
+                        alpha, coef, spherical, fptr, forder, fang, vptr, vals,
+                        gvals)
+
+
+@jit(nopython=True, nogil=True)
+def _evaluate_chunk(b0, b1, x, y, z, bptr, sptr, slist, center, lval, ptr,
+                    alpha, coef, spherical, fptr, forder, fang, vptr, vals,
+                    gvals):
+    """
+    Serial version of _evaluate_blocks for blocks b0 to b1 (exclusive) with
+    offsets vptr relative to vptr[b0]; releases the GIL so that chunks can
+    be evaluated concurrently by threads. Gradients are computed if gvals
+    is not empty (see _evaluate_block).
+    """
+    for b in range(b0, b1):
+        _evaluate_block(b, x, y, z, bptr, sptr, slist, center, lval, ptr,
+                        alpha, coef, spherical, fptr, forder, fang, vptr, vals,
+                        gvals)
+
+
+@jit(nopython=True, nogil=True, parallel=True)
+def _pair_bounds(pairs, center, ptr, alpha, coef, out):
+    """
+    Gaussian product estimate of the magnitude of the integrals of each shell
+    pair, :math:`\\sum_{ij}\\left|c_{i}c_{j}\\right|\\max\\left(\\left(\\pi/p\\right)^{3/2}, 2\\pi/p\\right)e^{-\\mu R_{AB}^{2}}`.
+    """
+    for k in prange(len(pairs)):
+        a = pairs[k, 0]
+        b = pairs[k, 1]
+        ab2 = 0.0
+        for d in range(3):
+            ab2 += (center[a, d] - center[b, d])**2
+        total = 0.0
+        for i in range(ptr[a], ptr[a + 1]):
+            for j in range(ptr[b], ptr[b + 1]):
+                p = alpha[i] + alpha[j]
+                pre = max((np.pi/p)**1.5, 2*np.pi/p)
+                total += abs(coef[i]*coef[j])*pre*np.exp(-alpha[i]*alpha[j]/p*ab2)
+        out[k] = total
+
+
+def point_blocks(x, y, z, npb=256):
+    """
+    Group points into compact spatial blocks (cubic bins sized such that
+    each holds about npb points of a uniform grid).
+
+    Args:
+        x (array): Points in x
+        y (array): Points in y
+        z (array): Points in z
+        npb (int): Target number of points per block
+
+    Returns:
+        perm (array): Permutation sorting points by block
+        bptr (array): Offsets of each block in the sorted points
+        lo (array): Lower corner of each block's bounding box (nblock, 3)
+        hi (array): Upper corner of each block's bounding box (nblock, 3)
+    """
+    xyz = np.stack([x, y, z], axis=1).astype(np.float64)
+    npts = len(xyz)
+    mn = xyz.min(axis=0)
+    extent = np.maximum(xyz.max(axis=0) - mn, 1e-8)
+    # Only dimensions with extent contribute to the volume per point
+    dims = extent > 1e-6
+    width = (npb * np.prod(extent[dims]) / max(npts, 1))**(1/max(dims.sum(), 1))
+    nbin = np.maximum(np.ceil(extent / width).astype(np.int64), 1)
+    ijk = np.minimum(((xyz - mn) / width).astype(np.int64), nbin - 1)
+    binid = (ijk[:, 0]*nbin[1] + ijk[:, 1])*nbin[2] + ijk[:, 2]
+    perm = np.argsort(binid, kind='mergesort')
+    ids, start = np.unique(binid[perm], return_index=True)
+    bptr = np.append(start, npts).astype(np.int64)
+    srt = xyz[perm]
+    lo = np.minimum.reduceat(srt, start, axis=0)
+    hi = np.maximum.reduceat(srt, start, axis=0)
+    return perm, bptr, lo, hi
+
+
+class BlockBasis(object):
+    """
+    Block sparse basis function values. Points are grouped into spatial blocks
+    (see :func:`~exatomic.algorithms.numerical.point_blocks`) and only the
+    functions of shells that are significant within a block are stored.
+
+    Attributes:
+        perm (array): Permutation sorting points by block
+        bptr (array): Offsets of the (sorted) points of each block
+        fptr (array): Offsets of the functions of each block
+        funcs (array): Functions (basis function indices) of each block
+        vptr (array): Offsets of the values of each block
+        vals (array): Values (row major, nfuncs by npoints per block)
+        gvals (array): Gradients (3 by nfuncs by npoints per block) or None
+        files (list): Scratch files backing vals and gvals (if memory mapped)
+    """
+    @property
+    def nblock(self):
+        return len(self.bptr) - 1
+
+    @property
+    def npts(self):
+        return len(self.perm)
+
+    @property
+    def fraction(self):
+        """Fraction of basis function, point pairs actually stored."""
+        return len(self.vals) / max(self.nbas * self.npts, 1)
+
+    @property
+    def nbytes(self):
+        return self.vals.nbytes + (0 if self.gvals is None else self.gvals.nbytes)
+
+    def block(self, b):
+        """
+        Return the point indices, function indices and values (nfuncs by
+        npoints) of a block.
+        """
+        pts = self.perm[self.bptr[b]:self.bptr[b + 1]]
+        funcs = self.funcs[self.fptr[b]:self.fptr[b + 1]]
+        vals = self.vals[self.vptr[b]:self.vptr[b + 1]].reshape(len(funcs), len(pts))
+        return pts, funcs, vals
+
+    def gradient(self, b):
+        """Return the gradients (3 by nfuncs by npoints) of a block."""
+        v0, v1 = 3*self.vptr[b], 3*self.vptr[b + 1]
+        return self.gvals[v0:v1].reshape(3, self.fptr[b + 1] - self.fptr[b],
+                                         self.bptr[b + 1] - self.bptr[b])
+
+    def todense(self):
+        """Return the dense (nbas, npts) array of values."""
+        out = np.zeros((self.nbas, self.npts), dtype=np.float64)
+        for b in range(self.nblock):
+            pts, funcs, vals = self.block(b)
+            out[np.ix_(funcs, pts)] = vals
+        return out
+
+    def contract(self, cmat):
+        """
+        Contract the basis function values with a coefficient matrix (one
+        matrix product per block), e.g. molecular orbitals from the MO
+        coefficient matrix.
+
+        Args:
+            cmat (array): Coefficients of shape (nbas, ncol)
+
+        Returns:
+            out (array): Contracted values of shape (ncol, npts)
+        """
+        cmat = np.asarray(cmat, dtype=np.float64)
+        out = np.zeros((cmat.shape[1], self.npts), dtype=np.float64)
+        for b in range(self.nblock):
+            pts, funcs, vals = self.block(b)
+            if len(funcs):
+                out[:, pts] = np.dot(cmat[funcs].T, vals)
+        return out
+
+    def close(self):
+        """Release the values and remove scratch files (if any)."""
+        self.vals = None
+        self.gvals = None
+        for path in self.files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.files = []
+
+    def __init__(self, nbas, perm, bptr, fptr, funcs, vptr, vals, gvals=None,
+                 files=None):
+        self.nbas = nbas
+        self.perm = perm
+        self.bptr = bptr
+        self.fptr = fptr
+        self.funcs = funcs
+        self.vptr = vptr
+        self.vals = vals
+        self.gvals = gvals
+        self.files = [] if files is None else files
+
+
+class BasisCache(object):
+    """
+    Bounded, least recently used cache of block sparse basis function values
+    (see :class:`~exatomic.algorithms.numerical.BlockBasis`). Entries are
+    keyed by the geometry and basis set (see
+    :meth:`~exatomic.algorithms.numerical.Shells.digest`), the grid points
+    and the screening parameters, so that repeatedly evaluating orbitals,
+    densities or current densities on the same grid (e.g. stepping through
+    MOs or comparing coefficient columns) only evaluates the basis once.
+
+    .. code-block:: Python
+
+        cache = BasisCache(maxbytes=2**31, scratch='/tmp')
+        mos = shells.contract(x, y, z, cmat, cache=cache)
+
+    Args:
+        maxbytes (int): Byte budget of all cached values
+        scratch (str): Directory in which values are memory mapped (default in memory)
+
+    Note:
+        Values that do not fit into the budget are not cached (and are
+        evaluated chunk by chunk instead).
+    """
+    @property
+    def nbytes(self):
+        return sum(blocks.nbytes for blocks in self._data.values())
+
+    def __len__(self):
+        return len(self._data)
+
+    def key(self, shells, x, y, z, tol, npb):
+        """The cache key of a basis set and geometry on a grid."""
+        grid = hashlib.sha1()
+        for arr in (x, y, z):
+            grid.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+        return shells.digest() + (grid.hexdigest(), float(tol), int(npb))
+
+    def blocks(self, shells, x, y, z, tol=1e-10, npb=256, gradient=False,
+               screen=None):
+        """
+        Return the (cached) block sparse basis function values or None if
+        they do not fit into the budget.
+
+        Args:
+            shells (:class:`~exatomic.algorithms.numerical.Shells`): Basis functions
+            x (array): Points in x
+            y (array): Points in y
+            z (array): Points in z
+            tol (float): Screening tolerance
+            npb (int): Target number of points per block
+            gradient (bool): Include the Cartesian gradients
+            screen (tuple): Point blocks and significant functions, if already determined
+        """
+        key = self.key(shells, x, y, z, tol, npb)
+        blocks = self._lookup(key, gradient)
+        if blocks is not None:
+            return blocks
+        screen = shells._screen(x, y, z, tol, npb) if screen is None else screen
+        nbytes = 8 * screen[-1][-1] * (4 if gradient else 1)
+        if nbytes > self.maxbytes:
+            return None
+        self._evict(self.maxbytes - nbytes)
+        blocks = shells.evaluate_blocks(x, y, z, tol=tol, npb=npb, gradient=gradient,
+                                        scratch=self.scratch, screen=screen)
+        self._data[key + (gradient, )] = blocks
+        return blocks
+
+    def get(self, shells, x, y, z, tol=1e-10, npb=256, gradient=False):
+        """Return the cached values (see blocks) or None, without evaluating them."""
+        return self._lookup(self.key(shells, x, y, z, tol, npb), gradient)
+
+    def _lookup(self, key, gradient):
+        """Cached values of a key (with gradients if required) or None."""
+        for grad in ((True, ) if gradient else (False, True)):
+            if key + (grad, ) in self._data:
+                self._data.move_to_end(key + (grad, ))
+                return self._data[key + (grad, )]
+        return None
+
+    def clear(self):
+        """Remove all entries."""
+        self._evict(0)
+
+    def _evict(self, limit):
+        """Remove least recently used entries until at most limit bytes are used."""
+        while self._data and self.nbytes > limit:
+            self._data.popitem(last=False)[1].close()
+
+    def __init__(self, maxbytes=2**29, scratch=None):
+        self.maxbytes = maxbytes
+        self.scratch = scratch
+        self._data = OrderedDict()
+
+
+basis_cache = BasisCache()
+
+
+class Shells(object):
+    """
+    Flat array representation of the contracted shells of a basis set on the
+    atoms of a single frame, suitable for compiled kernels.
+
+    A shell is a unique (atom, L, contraction) combination; each basis
+    function (row of :class:`~exatomic.core.basis.BasisSetOrder`) belongs to
+    exactly one shell and carries its angular part (ml, or l, m, n).
+
+    Attributes:
+        center (array): Shell centers (nshell, 3)
+        atom (array): Atom (position in the frame) of each shell
+        L (array): Angular momentum of each shell
+        ptr (array): Primitive offsets (nshell + 1)
+        alpha (array): Primitive exponents
+        coef (array): Normalized contraction coefficients
+        spherical (bool): Solid harmonic (or Cartesian) basis functions
+        fshell (array): Shell of each basis function
+        fang (array): Angular indices of each basis function (nbas, 3)
+    """
+    @property
+    def nbas(self):
+        return len(self.fshell)
+
+    @property
+    def nshell(self):
+        return len(self.L)
+
+    @property
+    def lmax(self):
+        return self.L.max() if self.nshell else 0
+
+    def function_order(self):
+        """Basis function offsets per shell and functions sorted by shell."""
+        forder = np.argsort(self.fshell, kind='mergesort')
+        fptr = np.zeros((self.nshell + 1, ), dtype=np.int64)
+        fptr[1:] = np.cumsum(np.bincount(self.fshell, minlength=self.nshell))
+        return fptr, forder
+
+    def evaluate(self, x, y, z, gradient=False):
+        """
+        Evaluate all basis functions on the given points.
+
+        Gradients are computed in the same pass from closed form derivatives:
+        for a shell :math:`\\chi = A\\left(\\mathbf{r}\\right)R\\left(r^{2}\\right)`
+        with angular part A (solid harmonic or Cartesian monomial) and
+        contracted radial part :math:`R = \\sum_{i}c_{i}e^{-\\alpha_{i}r^{2}}`,
+        :math:`\\nabla\\chi = R\\nabla A - 2A\\mathbf{r}\\sum_{i}c_{i}\\alpha_{i}e^{-\\alpha_{i}r^{2}}`.
+
+        Args:
+            x (array): Points in x
+            y (array): Points in y
+            z (array): Points in z
+            gradient (bool): Also return the Cartesian gradients
+
+        Returns:
+            bvs (array): Basis function values of shape (nbas, npts)
+            grad (array): Gradients of shape (3, nbas, npts) (only if gradient is True)
+        """
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        y = np.ascontiguousarray(y, dtype=np.float64)
+        z = np.ascontiguousarray(z, dtype=np.float64)
+        out = np.empty((self.nbas, len(x)), dtype=np.float64)
+        if gradient:
+            grad = np.empty((3, self.nbas, len(x)), dtype=np.float64)
+        else:
+            grad = np.empty((3, 0, 0), dtype=np.float64)
+        fptr, forder = self.function_order()
+        _evaluate_shells(x, y, z, self.center, self.L, self.ptr, self.alpha,
+                         self.coef, self.spherical, fptr, forder, self.fang, out,
+                         grad)
+        if gradient:
+            return out, grad
+        return out
+
+    def cutoffs(self, tol=1e-10):
+        """
+        Radius of each shell beyond which all of its functions are smaller
+        (in magnitude) than tol. The bound uses the most diffuse primitive,
+        :math:`\\sum_{i}\\left|c_{i}\\right|r^{L}e^{-\\alpha_{min}r^{2}} < tol`.
+
+        Args:
+            tol (float): Tolerance
+
+        Returns:
+            radii (array): Cutoff radius of each shell
+        """
+        amin = np.minimum.reduceat(self.alpha, self.ptr[:-1])
+        csum = np.add.reduceat(np.abs(self.coef), self.ptr[:-1])
+        lnc = np.log(np.maximum(csum, 1e-300)) - np.log(tol)
+        r = np.sqrt(np.maximum(lnc, 1.0) / amin)
+        for i in range(10):
+            r = np.sqrt(np.maximum(lnc + self.L*np.log(np.maximum(r, 1.0)), 1.0) / amin)
+        return r
+
+    def _screen(self, x, y, z, tol, npb):
+        """Point blocks and the significant shells and functions of each."""
+        perm, bptr, lo, hi = point_blocks(x, y, z, npb)
+        # Distance from each shell center to each block's bounding box
+        d = np.maximum(lo[:, None] - self.center[None], 0) + np.maximum(self.center[None] - hi[:, None], 0)
+        keep = (d**2).sum(axis=2) < self.cutoffs(tol)**2
+        bidx, slist = np.nonzero(keep)
+        sptr = np.zeros((len(bptr), ), dtype=np.int64)
+        sptr[1:] = np.cumsum(keep.sum(axis=1))
+        fptr, forder = self.function_order()
+        nfs = np.diff(fptr)
+        fcount = np.zeros((len(bptr), ), dtype=np.int64)
+        fcount[1:] = np.cumsum(np.bincount(bidx, weights=nfs[slist], minlength=len(bptr) - 1)).astype(np.int64)
+        funcs = np.concatenate([forder[fptr[s]:fptr[s + 1]] for s in slist]) if len(slist) else np.empty((0, ), dtype=np.int64)
+        vptr = np.zeros((len(bptr), ), dtype=np.int64)
+        vptr[1:] = np.cumsum(np.diff(fcount) * np.diff(bptr))
+        return perm, bptr, sptr, slist.astype(np.int64), fcount, funcs.astype(np.int64), vptr
+
+    def evaluate_blocks(self, x, y, z, tol=1e-10, npb=256, gradient=False,
+                        scratch=None, screen=None):
+        """
+        Evaluate the basis functions on spatial blocks of points, skipping
+        shells whose cutoff radius (see
+        :meth:`~exatomic.algorithms.numerical.Shells.cutoffs`) does not
+        reach a block.
+
+        Args:
+            x (array): Points in x
+            y (array): Points in y
+            z (array): Points in z
+            tol (float): Screening tolerance
+            npb (int): Target number of points per block
+            gradient (bool): Also evaluate the Cartesian gradients
+            scratch (str): Directory in which to memory map the values (default in memory)
+            screen (tuple): Point blocks and significant functions, if already determined
+
+        Returns:
+            blocks (:class:`~exatomic.algorithms.numerical.BlockBasis`): Block sparse values
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        z = np.asarray(z, dtype=np.float64)
+        if screen is None:
+            screen = self._screen(x, y, z, tol, npb)
+        perm, bptr, sptr, slist, fcount, funcs, vptr = screen
+        fptr, forder = self.function_order()
+        files = []
+
+        def alloc(n):
+            if scratch is None or not n:
+                return np.empty((n, ), dtype=np.float64)
+            fd, path = tempfile.mkstemp(suffix='.bvs', dir=scratch)
+            os.close(fd)
+            files.append(path)
+            return np.memmap(path, dtype=np.float64, mode='w+', shape=(n, ))
+
+        vals = alloc(vptr[-1])
+        gvals = alloc(3*vptr[-1]) if gradient else None
+        _evaluate_blocks(np.ascontiguousarray(x[perm]), np.ascontiguousarray(y[perm]),
+                         np.ascontiguousarray(z[perm]), bptr, sptr, slist,
+                         self.center, self.L, self.ptr, self.alpha, self.coef,
+                         self.spherical, fptr, forder, self.fang, vptr,
+                         np.asarray(vals), np.empty((0, )) if gvals is None else np.asarray(gvals))
+        return BlockBasis(self.nbas, perm, bptr, fcount, funcs, vptr, vals,
+                          gvals, files)
+
+    def stream(self, x, y, z, work, gradient=False, tol=1e-10, npb=256,
+               chunk=16384, threads=None, cache=None):
+        """
+        Evaluate the basis functions chunk by chunk, passing the values of
+        each block of points to a callable instead of storing them.
+
+        Points are grouped into spatial blocks (see
+        :meth:`~exatomic.algorithms.numerical.Shells.evaluate_blocks`) and
+        consecutive blocks into chunks of about chunk points. Chunks are
+        processed concurrently by a pool of threads, so the peak (temporary)
+        memory is about threads * chunk * nbas * 8 bytes (four times that
+        with gradients). The callable is called as work(pts, funcs, vals, grad)
+        where pts are point indices, funcs the significant basis functions,
+        vals their values (nfuncs, npts) and grad the gradients
+        (3, nfuncs, npts) or None. It must only write to the given points.
+
+        If a cache is given, the values of all blocks are instead taken from
+        (or evaluated once and stored in) the cache, provided that they fit
+        into its budget. Cached values are evaluated in one piece and retained
+        by the cache, i.e. memory is then bounded by the cache budget rather
+        than by chunk.
+
+        Args:
+            x (array): Points in x
+            y (array): Points in y
+            z (array): Points in z
+            work (callable): Called for each block of points
+            gradient (bool): Also evaluate the Cartesian gradients
+            tol (float): Screening tolerance
+            npb (int): Target number of points per block
+            chunk (int): Target number of points per chunk
+            threads (int): Number of threads (default number of CPUs)
+            cache (:class:`~exatomic.algorithms.numerical.BasisCache`): Cache of basis function values
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        z = np.asarray(z, dtype=np.float64)
+        blocks = screen = None
+        if cache is not None:
+            blocks = cache.get(self, x, y, z, tol=tol, npb=npb, gradient=gradient)
+            if blocks is None:
+                screen = self._screen(x, y, z, tol, npb)
+                blocks = cache.blocks(self, x, y, z, tol=tol, npb=npb,
+                                      gradient=gradient, screen=screen)
+        if blocks is not None:
+            bptr = blocks.bptr
+
+            def run(b0, b1):
+                for b in range(b0, b1):
+                    pts, fs, v = blocks.block(b)
+                    if len(fs):
+                        work(pts, fs, v, blocks.gradient(b) if gradient else None)
+
+        else:
+            if screen is None:
+                screen = self._screen(x, y, z, tol, npb)
+            perm, bptr, sptr, slist, fcount, funcs, vptr = screen
+            fptr, forder = self.function_order()
+            xs = np.ascontiguousarray(x[perm])
+            ys = np.ascontiguousarray(y[perm])
+            zs = np.ascontiguousarray(z[perm])
+
+            def run(b0, b1):
+                nv = vptr[b1] - vptr[b0]
+                vals = np.empty((nv, ), dtype=np.float64)
+                gvals = np.empty((3*nv if gradient else 0, ), dtype=np.float64)
+                _evaluate_chunk(b0, b1, xs, ys, zs, bptr, sptr, slist, self.center,
+                                self.L, self.ptr, self.alpha, self.coef,
+                                self.spherical, fptr, forder, self.fang,
+                                vptr - vptr[b0], vals, gvals)
+                for b in range(b0, b1):
+                    pts = perm[bptr[b]:bptr[b + 1]]
+                    fs = funcs[fcount[b]:fcount[b + 1]]
+                    if not len(fs):
+                        continue
+                    v0 = vptr[b] - vptr[b0]
+                    v1 = vptr[b + 1] - vptr[b0]
+                    v = vals[v0:v1].reshape(len(fs), len(pts))
+                    g = gvals[3*v0:3*v1].reshape(3, len(fs), len(pts)) if gradient else None
+                    work(pts, fs, v, g)
+
+        # Group consecutive blocks into chunks
+        cuts = np.searchsorted(bptr, np.arange(0, len(x), max(chunk, 1)))
+        cuts = np.unique(np.append(cuts, len(bptr) - 1))
+        args = list(zip(cuts[:-1], cuts[1:]))
+        if threads == 1 or len(args) < 2:
+            for arg in args:
+                run(*arg)
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(lambda arg: run(*arg), args))
+
+    def digest(self):
+        """
+        Hashes identifying the geometry (shell centers) and the basis set
+        (angular momenta, exponents, normalized coefficients and functions).
+        """
+        geom = hashlib.sha1(self.center.tobytes()).hexdigest()
+        basis = hashlib.sha1()
+        for arr in (self.L, self.ptr, self.alpha, self.coef, self.fshell, self.fang):
+            basis.update(np.ascontiguousarray(arr).tobytes())
+        basis.update(b'spherical' if self.spherical else b'cartesian')
+        return geom, basis.hexdigest()
+
+    def pairs(self, tol=1e-14):
+        """
+        Significant shell pairs of this geometry and basis set (cached, see
+        :class:`~exatomic.algorithms.numerical.ShellPairs`).
+
+        Args:
+            tol (float): Screening tolerance
+        """
+        return ShellPairs.from_shells(self, tol)
+
+    def contract(self, x, y, z, cmat, **kwargs):
+        """
+        Evaluate linear combinations of basis functions (e.g. molecular
+        orbitals) on the given points without storing the basis function
+        values of all points (see
+        :meth:`~exatomic.algorithms.numerical.Shells.stream`); one matrix
+        product per block of points.
+
+        Args:
+            x (array): Points in x
+            y (array): Points in y
+            z (array): Points in z
+            cmat (array): Coefficients of shape (nbas, ncol)
+            kwargs: Screening and chunking arguments passed to stream
+
+        Returns:
+            out (array): Values of shape (ncol, npts)
+        """
+        cmat = np.asarray(cmat, dtype=np.float64)
+        out = np.zeros((cmat.shape[1], len(x)), dtype=np.float64)
+
+        def work(pts, fs, v, g):
+            out[:, pts] = np.dot(cmat[fs].T, v)
+
+        self.stream(x, y, z, work, **kwargs)
+        return out
+
+    def density(self, x, y, z, cmat=None, occupation=None, dmat=None,
+                gradient=False, kinetic=False, **kwargs):
+        """
+        Evaluate the electron density (and optionally its gradient) on the
+        given points, either from the occupied columns of the coefficient
+        matrix,
+
+        .. math::
+
+            \\rho = \\sum_{i}n_{i}\\left(\\sum_{\\mu}C_{\\mu i}\\chi_{\\mu}\\right)^{2}
+
+        or from a (square) density matrix,
+        :math:`\\rho = \\sum_{\\mu\\nu}D_{\\mu\\nu}\\chi_{\\mu}\\chi_{\\nu}`.
+        Either way the work is a few matrix products per block of points (see
+        :meth:`~exatomic.algorithms.numerical.Shells.stream`). The (positive
+        definite) kinetic energy density is
+        :math:`\\tau = \\frac{1}{2}\\sum_{i}n_{i}\\left|\\nabla\\psi_{i}\\right|^{2}
+        = \\frac{1}{2}\\sum_{\\mu\\nu}D_{\\mu\\nu}\\nabla\\chi_{\\mu}\\cdot\\nabla\\chi_{\\nu}`.
+
+        Args:
+            x (array): Points in x
+            y (array): Points in y
+            z (array): Points in z
+            cmat (array): Coefficients of the occupied orbitals (nbas, nocc)
+            occupation (array): Occupations of the orbitals (nocc, )
+            dmat (array): Density matrix (nbas, nbas), instead of cmat and occupation
+            gradient (bool): Also compute the gradient of the density
+            kinetic (bool): Also compute the kinetic energy density
+            kwargs: Screening and chunking arguments passed to stream
+
+        Returns:
+            rho (array): Density of shape (npts, )
+            grad (array): Density gradient of shape (3, npts) (only if gradient is True)
+            tau (array): Kinetic energy density of shape (npts, ) (only if kinetic is True)
+        """
+        if dmat is None:
+            if cmat is None or occupation is None:
+                raise ValueError("Either cmat and occupation or dmat are required")
+            cmat = np.asarray(cmat, dtype=np.float64)
+            occupation = np.asarray(occupation, dtype=np.float64)
+        else:
+            dmat = np.asarray(dmat, dtype=np.float64)
+        rho = np.zeros((len(x), ), dtype=np.float64)
+        grad = np.zeros((3, len(x)), dtype=np.float64) if gradient else None
+        tau = np.zeros((len(x), ), dtype=np.float64) if kinetic else None
+
+        def work(pts, fs, v, g):
+            if dmat is None:
+                c = cmat[fs]
+                psi = np.dot(c.T, v)
+                npsi = occupation[:, None] * psi
+                rho[pts] = (npsi * psi).sum(axis=0)
+                for i in range(3 if gradient or kinetic else 0):
+                    gpsi = np.dot(c.T, g[i])
+                    if gradient:
+                        grad[i, pts] = 2 * (npsi * gpsi).sum(axis=0)
+                    if kinetic:
+                        tau[pts] += 0.5 * np.dot(occupation, gpsi**2)
+            else:
+                d = dmat[np.ix_(fs, fs)]
+                dv = np.dot(d, v)
+                rho[pts] = (dv * v).sum(axis=0)
+                for i in range(3 if gradient or kinetic else 0):
+                    if gradient:
+                        grad[i, pts] = 2 * (dv * g[i]).sum(axis=0)
+                    if kinetic:
+                        tau[pts] += 0.5 * (np.dot(d, g[i]) * g[i]).sum(axis=0)
+
+        self.stream(x, y, z, work, gradient=gradient or kinetic, **kwargs)
+        out = (rho, ) + ((grad, ) if gradient else ()) + ((tau, ) if kinetic else ())
+        return out if len(out) > 1 else rho
+
+    def current_density(self, x, y, z, cmatr, cmati, occupation, **kwargs):
+        """
+        Evaluate the (paramagnetic) current density of complex orbitals with
+        real and imaginary coefficients cmatr and cmati on the given points.
+
+        With the antisymmetric matrix
+        :math:`A = -\\frac{1}{2}\\left(C^{r}nC^{i\\dagger} - C^{i}nC^{r\\dagger}\\right)`
+        (n the diagonal matrix of occupations) the current density is
+        :math:`\\mathbf{j} = \\sum_{\\mu\\nu}A_{\\mu\\nu}\\left(\\chi_{\\mu}\\nabla\\chi_{\\nu}
+        - \\chi_{\\nu}\\nabla\\chi_{\\mu}\\right) = 2\\chi^{\\dagger}A\\nabla\\chi`,
+        i.e. three matrix products per block of points (see
+        :meth:`~exatomic.algorithms.numerical.Shells.stream`).
+
+        Args:
+            x (array): Points in x
+            y (array): Points in y
+            z (array): Points in z
+            cmatr (array): Real part of the coefficients (nbas, norb)
+            cmati (array): Imaginary part of the coefficients (nbas, norb)
+            occupation (array): Orbital occupations (norb, )
+            kwargs: Screening and chunking arguments passed to stream
+
+        Returns:
+            cur (array): Current density of shape (3, npts)
+        """
+        cmatr = np.asarray(cmatr, dtype=np.float64)
+        cmati = np.asarray(cmati, dtype=np.float64)
+        occupation = np.asarray(occupation, dtype=np.float64)
+        amat = np.dot(cmatr * occupation, cmati.T)
+        amat = -0.5 * (amat - amat.T)
+        cur = np.zeros((3, len(x)), dtype=np.float64)
+
+        def work(pts, fs, v, g):
+            av = np.dot(amat[np.ix_(fs, fs)].T, v)
+            for i in range(3):
+                cur[i, pts] = 2 * (av * g[i]).sum(axis=0)
+
+        self.stream(x, y, z, work, gradient=True, **kwargs)
+        return cur
+
+    def __init__(self, center, atom, L, ptr, alpha, coef, spherical, fshell, fang):
+        self.center = np.ascontiguousarray(center, dtype=np.float64)
+        self.atom = np.asarray(atom, dtype=np.int64)
+        self.L = np.asarray(L, dtype=np.int64)
+        self.ptr = np.asarray(ptr, dtype=np.int64)
+        self.alpha = np.asarray(alpha, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.spherical = bool(spherical)
+        self.fshell = np.asarray(fshell, dtype=np.int64)
+        self.fang = np.ascontiguousarray(fang, dtype=np.int64)
+
+    @classmethod
+    def from_universe(cls, uni, frame=None, norm='Nd'):
+        """
+        Build the shells of a universe for a given frame. The basis set and
+        basis set order tables of that frame are used if present, otherwise
+        those of their first frame.
+
+        Args:
+            uni (:class:`~exatomic.core.universe.Universe`): Universe with basis set information
+            frame (int): Frame of atomic positions (default last frame)
+            norm (str): Column of normalized contraction coefficients (default 'Nd')
+        """
+        if not uni.basis_set.gaussian:
+            raise NotImplementedError("Only Gaussian basis sets are supported.")
+        frame = uni.atom.nframes - 1 if frame is None else frame
+        atom = uni.atom[uni.atom['frame'] == frame]
+        bs = _frame_slice(uni.basis_set, frame)
+        bs = bs[bs['d'] != 0]
+        order = _frame_slice(uni.basis_set_order, frame)
+        spherical = uni.basis_set.spherical
+        # Unique contractions (set, L, shell) and their primitives
+        bset = bs['set'].astype(np.int64).values
+        bl = bs['L'].astype(np.int64).values
+        bshell = bs['shell'].astype(np.int64).values
+        srt = np.lexsort((bshell, bl, bset))
+        keys = np.stack([bset[srt], bl[srt], bshell[srt]], axis=1)
+        keys, first, counts = np.unique(keys, axis=0, return_index=True, return_counts=True)
+        alpha = bs['alpha'].values.astype(np.float64)[srt]
+        coef = bs[norm].values.astype(np.float64)[srt]
+        # Key of each basis function
+        center = order['center'].astype(np.int64).values
+        sets = atom['set'].astype(np.int64).values[center]
+        fl = order['L'].astype(np.int64).values
+        fkeys = np.stack([sets, fl, order['shell'].astype(np.int64).values], axis=1)
+        ctype = _match_rows(keys, fkeys)
+        # Shells are unique (center, contraction) pairs in order of appearance
+        pairs = center * len(keys) + ctype
+        uniq, idx, fshell = np.unique(pairs, return_index=True, return_inverse=True)
+        rank = np.argsort(np.argsort(idx, kind='mergesort'), kind='mergesort')
+        fshell = rank[fshell]
+        shcenter = center[np.sort(idx)]
+        shtype = ctype[np.sort(idx)]
+        nprim = counts[shtype]
+        ptr = np.zeros((len(shtype) + 1, ), dtype=np.int64)
+        ptr[1:] = np.cumsum(nprim)
+        pidx = np.concatenate([np.arange(first[t], first[t] + counts[t]) for t in shtype])
+        xyz = atom[['x', 'y', 'z']].values.astype(np.float64)[shcenter]
+        if spherical:
+            fang = np.zeros((len(order), 3), dtype=np.int64)
+            fang[:, 0] = order['ml'].astype(np.int64).values
+        else:
+            fang = order[['l', 'm', 'n']].values.astype(np.int64)
+        return cls(xyz, shcenter, keys[shtype, 1], ptr, alpha[pidx], coef[pidx],
+                   spherical, fshell, fang)
+
+
+class ShellPairs(object):
+    """
+    Significant pairs of shells (a >= b) of a single frame, stored as compact
+    arrays over which compiled kernels (integrals, density matrices, grid
+    evaluation) can iterate without pandas. A pair is significant if its
+    Gaussian product estimate
+
+    .. math::
+
+        B_{ab} = \\sum_{ij}\\left|c_{i}c_{j}\\right|\\max\\left(\\left(\\pi/p\\right)^{3/2}, 2\\pi/p\\right)e^{-\\mu R_{AB}^{2}}
+
+    (:math:`p = \\alpha_{i} + \\alpha_{j}`, :math:`\\mu = \\alpha_{i}\\alpha_{j}/p`)
+    is at least tol. As :math:`B_{ab}` bounds the overlap and the one-electron
+    integrals of the pair, products of basis functions of the remaining pairs
+    are negligible everywhere. Candidates are selected with the (cheaper)
+    bound built from the most diffuse primitive of each shell; pair lists are
+    cached per geometry and basis set (see
+    :meth:`~exatomic.algorithms.numerical.Shells.digest`).
+
+    .. code-block:: Python
+
+        pairs = shells.pairs(tol=1e-12)
+        smat = overlap_matrix(shells, pairs=pairs)
+        rho = shells.density(x, y, z, dmat=pairs.screen(dmat))
+        dens = DensityMatrix.from_universe(uni, 'coef', 'occupation', tol=1e-12)
+
+    Attributes:
+        pairs (array): Shell pairs (npair, 2), sorted by first then second shell
+        bound (array): Estimate of each pair (npair, )
+        ptr (array): Offsets of the pairs of each first shell (nshell + 1)
+        tol (float): Screening tolerance
+    """
+    _cache = OrderedDict()
+    _maxsize = 32
+
+    @property
+    def npair(self):
+        return len(self.pairs)
+
+    @property
+    def nshell(self):
+        return len(self.ptr) - 1
+
+    @property
+    def fraction(self):
+        """Fraction of all unique shell pairs that are significant."""
+        return self.npair / max(self.nshell * (self.nshell + 1) // 2, 1)
+
+    def partners(self, a):
+        """Shells b <= a that form a significant pair with shell a."""
+        return self.pairs[self.ptr[a]:self.ptr[a + 1], 1]
+
+    def by_class(self):
+        """Pairs sorted by the angular momenta of their shells (pairs of similar cost together)."""
+        a, b = self.pairs[:, 0], self.pairs[:, 1]
+        order = np.lexsort((b, a, self._L[b], self._L[a]))
+        return np.ascontiguousarray(self.pairs[order])
+
+    def function_pairs(self):
+        """
+        Basis functions (chi0 >= chi1) of the significant shell pairs, sorted
+        by chi0 then chi1 (the order of the lower triangle).
+
+        Returns:
+            chi0 (array): First basis function of each significant element
+            chi1 (array): Second basis function of each significant element
+        """
+        a, b = self.pairs[:, 0], self.pairs[:, 1]
+        nf = np.diff(self._fptr)
+        na, nb = nf[a], nf[b]
+        counts = na * nb
+        off = np.repeat(np.cumsum(counts) - counts, counts)
+        local = np.arange(counts.sum(), dtype=np.int64) - off
+        nb = np.repeat(nb, counts)
+        mu = self._forder[np.repeat(self._fptr[a], counts) + local // nb]
+        nu = self._forder[np.repeat(self._fptr[b], counts) + local % nb]
+        keep = (np.repeat(a != b, counts)) | (mu >= nu)
+        chi0 = np.maximum(mu, nu)[keep]
+        chi1 = np.minimum(mu, nu)[keep]
+        srt = np.lexsort((chi1, chi0))
+        return chi0[srt], chi1[srt]
+
+    def screen(self, mat):
+        """
+        Zero the elements of a (square, symmetric) matrix that do not belong
+        to significant shell pairs, e.g. of a density matrix before evaluation
+        on a grid.
+        """
+        mat = np.asarray(mat)
+        chi0, chi1 = self.function_pairs()
+        mask = np.zeros(mat.shape[-2:], dtype=bool)
+        mask[chi0, chi1] = True
+        mask[chi1, chi0] = True
+        return np.where(mask, mat, 0)
+
+    def __init__(self, pairs, bound, ptr, tol, L, fptr, forder):
+        self.pairs = np.ascontiguousarray(pairs, dtype=np.int64).reshape(-1, 2)
+        self.bound = np.asarray(bound, dtype=np.float64)
+        self.ptr = np.asarray(ptr, dtype=np.int64)
+        self.tol = float(tol)
+        self._L = np.asarray(L, dtype=np.int64)
+        self._fptr = fptr
+        self._forder = forder
+
+    @classmethod
+    def from_shells(cls, shells, tol=1e-14, chunk=2**22):
+        """
+        Build (or return the cached) significant shell pairs.
+
+        Args:
+            shells (:class:`~exatomic.algorithms.numerical.Shells`): Basis functions
+            tol (float): Screening tolerance
+            chunk (int): Approximate number of candidate pairs estimated at once
+        """
+        key = shells.digest() + (float(tol), )
+        if key in cls._cache:
+            cls._cache.move_to_end(key)
+            return cls._cache[key]
+        n = shells.nshell
+        # Upper bound of B_ab from the most diffuse primitives and the sums of |c|
+        starts = shells.ptr[:-1]
+        amin = np.minimum.reduceat(shells.alpha, starts) if n else shells.alpha
+        csum = np.add.reduceat(np.abs(shells.coef), starts) if n else shells.coef
+        cands = []
+        step = max(1, chunk // max(n, 1))
+        for a0 in range(0, n, step):
+            a, b = np.nonzero(np.tri(min(a0 + step, n) - a0, n, a0, dtype=bool))
+            a += a0
+            p = amin[a] + amin[b]
+            r2 = ((shells.center[a] - shells.center[b])**2).sum(axis=1)
+            est = (csum[a] * csum[b] * np.maximum((np.pi / p)**1.5, 2 * np.pi / p) *
+                   np.exp(-amin[a] * amin[b] / p * r2))
+            keep = est >= tol
+            cands.append(np.stack([a[keep], b[keep]], axis=1))
+        pairs = np.concatenate(cands) if cands else np.empty((0, 2), dtype=np.int64)
+        pairs = np.ascontiguousarray(pairs, dtype=np.int64)
+        bound = np.empty((len(pairs), ), dtype=np.float64)
+        _pair_bounds(pairs, shells.center, shells.ptr, shells.alpha, shells.coef, bound)
+        keep = bound >= tol
+        pairs, bound = pairs[keep], bound[keep]
+        ptr = np.zeros((n + 1, ), dtype=np.int64)
+        ptr[1:] = np.cumsum(np.bincount(pairs[:, 0], minlength=n))
+        fptr, forder = shells.function_order()
+        out = cls(pairs, bound, ptr, tol, shells.L, fptr, forder)
+        cls._cache[key] = out
+        while len(cls._cache) > cls._maxsize:
+            cls._cache.popitem(last=False)
+        return out
+
+
+def _frame_slice(df, frame):
+    """Rows of a (basis) table for a frame, falling back to its first frame."""
+    frames = df['frame'].astype(np.int64)
+    if not (frames == frame).any():
+        frame = frames.min()
+    return df[frames == frame]
+
+
+def _match_rows(keys, rows):
+    """Index of each row in the (unique, lexsorted) 2D array of keys."""
+    view = lambda a: np.ascontiguousarray(a).view([('', a.dtype)] * a.shape[1]).ravel()
+    k = view(keys)
+    r = view(rows)
+    idx = np.searchsorted(k, r)
+    if np.any(idx >= len(k)) or np.any(k[np.minimum(idx, len(k) - 1)] != r):
+        raise KeyError("Basis set order refers to missing basis set shells")
+    return idx
+
+
+def evaluate_basis(uni, x, y, z, frame=None, norm='Nd', gradient=False):
+    """
+    Evaluate all basis functions of a universe on the given points.
+
+    Args:
+        uni (:class:`~exatomic.core.universe.Universe`): Universe with basis set information
+        x (array): Points in x
+        y (array): Points in y
+        z (array): Points in z
+        frame (int): Frame of atomic positions (default last frame)
+        norm (str): Column of normalized contraction coefficients (default 'Nd')
+        gradient (bool): Also return the Cartesian gradients
+
+    Returns:
+        bvs (array): Basis function values of shape (nbas, npts)
+        grad (array): Gradients of shape (3, nbas, npts) (only if gradient is True)
+    """
+    shells = Shells.from_universe(uni, frame=frame, norm=norm)
+    return shells.evaluate(x, y, z, gradient=gradient)
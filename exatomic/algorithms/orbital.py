@@ -8,22 +8,25 @@ Building discrete molecular orbitals (for visualization) requires a complex
 set of operations that are provided by this module and wrapped into a clean API.
 """
 # Established
+import os
+import shutil
+import warnings
+import tempfile
+import multiprocessing
 import numpy as np
-from numba import jit
+from numba import jit, prange
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 
 # Local
 from exatomic.base import sym2z
 from exatomic.core.field import AtomicField
 from .orbital_util import (
-    numerical_grid_from_field_params, gen_bfns, gen_gradients,
-    _determine_fps, _determine_vector, _determine_bfns,
-    _compute_current_density, _compute_orb_ang_mom,
-    _compute_orbitals, _compute_density,
-    _make_field, _evaluate_symbolic,
-    # _compute_current_density_nojit,
-    _compute_current_density_jit,
-    _compute_current_density_numexpr)
+    numerical_grid_from_field_params, gen_bfns, make_fps,
+    _determine_fps, _determine_vector,
+    _compute_orb_ang_mom, _make_field)
+from .numerical import Shells
+from .adaptive import adaptive_field
 
 
 #####################################################################
@@ -66,6 +69,24 @@ def density_from_momatrix(cmat, occvec):
     return chi1, chi2, dens, frame
 
 
+@jit(nopython=True, nogil=True, parallel=True)
+def density_from_pairs(cmat, occvec, chi0, chi1):
+    """
+    Density matrix elements of the given pairs of basis functions only
+    (e.g. of significant shell pairs, see
+    :class:`~exatomic.algorithms.numerical.ShellPairs`).
+    """
+    dens = np.empty(len(chi0), dtype=np.float64)
+    for k in prange(len(chi0)):
+        i = chi0[k]
+        j = chi1[k]
+        total = 0.0
+        for m in range(len(occvec)):
+            total += cmat[i, m] * cmat[j, m] * occvec[m]
+        dens[k] = total
+    return dens
+
+
 @jit(nopython=True, nogil=True, parallel=True)
 def density_as_square(denvec):
     nbas = int((-1 + np.sqrt(1 - 4 * -2 * len(denvec))) / 2)
@@ -134,53 +155,33 @@ def momatrix_as_square(movec):
 #     uni.add_field(_make_field(ang_mom, fps))
 
 
-def add_orb_ang_mom_jit(uni, field_params=None, rcoefs=None, icoefs=None,
-                            frame=None, orbocc=None, maxes=None, inplace=True,
-                            norm='Nd'):
-    """Compute the orbital angular momentum and add it to a universe."""
-    t0 = datetime.now()
-    frame = uni.atom.nframes - 1 if frame is None else frame
-    if (rcoefs not in uni.momatrix.columns) or \
-       (icoefs not in uni.momatrix.columns):
-        print("Either rcoefs {} or icoefs {} are " \
-              "not in uni.momatrix".format(rcoefs, icoefs))
-        return
-    orbocc = rcoefs if orbocc is None else orbocc
-    if orbocc not in uni.orbital.columns:
-        print("orbocc {} is not in uni.orbital".format(orbocc))
-        return
-    if maxes is None:
-        print("If magnetic axes are not an identity matrix, specify maxes.")
-        maxes = np.eye(3)
-
-    _determine_bfns(uni, frame, norm)
-    fps = _determine_fps(uni, field_params, 4)
-    x, y, z = numerical_grid_from_field_params(fps)
-    occvec = uni.orbital[orbocc].values
-
-    bfns = uni.basis_functions[frame]
-    grx, gry, grz = gen_gradients(bfns)
-    t1 = datetime.now()
-    bvs = _evaluate_symbolic(bfns, x, y, z)
-    grx = _evaluate_symbolic(grx, x, y, z)
-    gry = _evaluate_symbolic(gry, x, y, z)
-    grz = _evaluate_symbolic(grz, x, y, z)
-    t2 = datetime.now()
-    print('Timing: grid evaluation     - {:.2f}s'.format((t2-t1).total_seconds()))
-    cmatr = uni.momatrix.square(column=rcoefs).values
-    cmati = uni.momatrix.square(column=icoefs).values
-    curx, cury, curz = _compute_current_density_jit(bvs, grx, gry, grz, cmatr, cmati, occvec)
-    t3 = datetime.now()
-    print('Timing: current density 1D  - {:.2f}s'.format((t3-t2).total_seconds()))
-    ang_mom = _compute_orb_ang_mom(x, y, z, curx, cury, curz, maxes)
-    if not inplace: return _make_field(ang_mom, fps)
-    uni.add_field(_make_field(ang_mom, fps))
-
+def add_orb_ang_mom(uni, field_params=None, rcoefs=None, icoefs=None,
+                    frame=None, orbocc=None, maxes=None, inplace=True,
+                    norm='Nd', tol=1e-10, chunk=16384, threads=None,
+                    cache=None):
+    """
+    Compute the orbital angular momentum and add it to a universe. The
+    current density is obtained from basis function values and analytic
+    gradients with a few matrix products per chunk of grid points (see
+    :meth:`~exatomic.algorithms.numerical.Shells.current_density`).
 
-def add_orb_ang_mom_numexpr(uni, field_params=None, rcoefs=None, icoefs=None,
-                            frame=None, orbocc=None, maxes=None, inplace=True,
-                            norm='Nd'):
-    """Compute the orbital angular momentum and add it to a universe."""
+    Args
+        uni (exatomic.container.Universe): a universe
+        field_params (dict,pd.Series): dict with {'rmin', 'rmax', 'nr', ...}
+        rcoefs (str): column in momatrix of the real coefficients
+        icoefs (str): column in momatrix of the imaginary coefficients
+        orbocc (str): column in orbital (default rcoefs)
+        maxes (np.ndarray): magnetic axes (default identity); component i is
+            sum_k maxes[k, i] * (r x j)_k
+        inplace (bool): if False, return the field obj instead of modifying uni
+        tol (float): screening tolerance for basis function values
+        chunk (int): number of grid points evaluated at once (per thread)
+        threads (int): number of threads (default number of CPUs)
+        cache (BasisCache): cache of basis function values, e.g.
+            exatomic.algorithms.numerical.basis_cache (default None); cached
+            values are retained up to the cache's byte budget (instead of
+            being bounded by chunk)
+    """
     t0 = datetime.now()
     frame = uni.atom.nframes - 1 if frame is None else frame
     if (rcoefs not in uni.momatrix.columns) or \
@@ -196,78 +197,72 @@ def add_orb_ang_mom_numexpr(uni, field_params=None, rcoefs=None, icoefs=None,
         print("If magnetic axes are not an identity matrix, specify maxes.")
         maxes = np.eye(3)
 
-    _determine_bfns(uni, frame, norm)
     fps = _determine_fps(uni, field_params, 4)
     x, y, z = numerical_grid_from_field_params(fps)
     occvec = uni.orbital[orbocc].values
-
-    bfns = uni.basis_functions[frame]
-    grx, gry, grz = gen_gradients(bfns)
-    t1 = datetime.now()
-    bvs = _evaluate_symbolic(bfns, x, y, z)
-    grx = _evaluate_symbolic(grx, x, y, z)
-    gry = _evaluate_symbolic(gry, x, y, z)
-    grz = _evaluate_symbolic(grz, x, y, z)
-    t2 = datetime.now()
-    print('Timing: grid evaluation     - {:.2f}s'.format((t2-t1).total_seconds()))
+    shells = Shells.from_universe(uni, frame=frame, norm=norm)
     cmatr = uni.momatrix.square(column=rcoefs).values
     cmati = uni.momatrix.square(column=icoefs).values
-    curx, cury, curz = _compute_current_density_numexpr(bvs, grx, gry, grz, cmatr, cmati, occvec)
-    t3 = datetime.now()
-    print('Timing: current density 1D  - {:.2f}s'.format((t3-t2).total_seconds()))
+    curx, cury, curz = shells.current_density(x, y, z, cmatr, cmati, occvec,
+                                              tol=tol, chunk=chunk,
+                                              threads=threads, cache=cache)
+    t1 = datetime.now()
+    print('Timing: current density     - {:.2f}s'.format((t1-t0).total_seconds()))
     ang_mom = _compute_orb_ang_mom(x, y, z, curx, cury, curz, maxes)
     if not inplace: return _make_field(ang_mom, fps)
     uni.add_field(_make_field(ang_mom, fps))
 
 
+def add_orb_ang_mom_jit(*args, **kwargs):
+    """Deprecated, use :func:`~exatomic.algorithms.orbital.add_orb_ang_mom`."""
+    warnings.warn("add_orb_ang_mom_jit is deprecated, use add_orb_ang_mom",
+                  DeprecationWarning, stacklevel=2)
+    return add_orb_ang_mom(*args, **kwargs)
 
-def add_orb_ang_mom(uni, field_params=None, rcoefs=None, icoefs=None,
-                    frame=None, orbocc=None, maxes=None, inplace=True,
-                    norm='Nd'):
-    """Compute the orbital angular momentum and add it to a universe."""
-    t0 = datetime.now()
-    frame = uni.atom.nframes - 1 if frame is None else frame
-    if (rcoefs not in uni.momatrix.columns) or \
-       (icoefs not in uni.momatrix.columns):
-        print("Either rcoefs {} or icoefs {} are " \
-              "not in uni.momatrix".format(rcoefs, icoefs))
-        return
-    orbocc = rcoefs if orbocc is None else orbocc
-    if orbocc not in uni.orbital.columns:
-        print("orbocc {} is not in uni.orbital".format(orbocc))
-        return
-    if maxes is None:
-        print("If magnetic axes are not an identity matrix, specify maxes.")
-        maxes = np.eye(3)
-
-    _determine_bfns(uni, frame, norm)
-    fps = _determine_fps(uni, field_params, 4)
-    x, y, z = numerical_grid_from_field_params(fps)
-    occvec = uni.orbital[orbocc].values
 
-    bfns = uni.basis_functions[frame]
-    grx, gry, grz = gen_gradients(bfns)
-    t1 = datetime.now()
-    bvs = _evaluate_symbolic(bfns, x, y, z)
-    grx = _evaluate_symbolic(grx, x, y, z)
-    gry = _evaluate_symbolic(gry, x, y, z)
-    grz = _evaluate_symbolic(grz, x, y, z)
-    t2 = datetime.now()
-    print('Timing: grid evaluation     - {:.2f}s'.format((t2-t1).total_seconds()))
-    cmatr = uni.momatrix.square(column=rcoefs).values
-    cmati = uni.momatrix.square(column=icoefs).values
-    curx, cury, curz = _compute_current_density(bvs, grx, gry, grz, cmatr, cmati, occvec)
-    t3 = datetime.now()
-    print('Timing: current density 1D  - {:.2f}s'.format((t3-t2).total_seconds()))
-    ang_mom = _compute_orb_ang_mom(x, y, z, curx, cury, curz, maxes)
-    if not inplace: return _make_field(ang_mom, fps)
-    uni.add_field(_make_field(ang_mom, fps))
+def add_orb_ang_mom_numexpr(*args, **kwargs):
+    """
+    Deprecated, use :func:`~exatomic.algorithms.orbital.add_orb_ang_mom`.
 
+    Note:
+        The magnetic axes are now applied as in add_orb_ang_mom, i.e.
+        component i is :math:`\\sum_{k}M_{ki}\\left(\\mathbf{r}\\times\\mathbf{j}\\right)_{k}`;
+        the former numexpr kernel used the transpose of maxes.
+    """
+    warnings.warn("add_orb_ang_mom_numexpr is deprecated, use add_orb_ang_mom "
+                  "(which applies the transpose of maxes compared to the former "
+                  "numexpr implementation)", DeprecationWarning, stacklevel=2)
+    return add_orb_ang_mom(*args, **kwargs)
 
 
 def add_density(uni, field_params=None, mocoefs=None, orbocc=None,
-                inplace=True, frame=None, norm='Nd'):
-    """Compute a density and add it to a universe."""
+                inplace=True, frame=None, norm='Nd', tol=1e-10, chunk=16384,
+                threads=None, dmat=False, gradient=False, kinetic=False,
+                cache=None):
+    """
+    Compute a density and add it to a universe. Only the occupied orbitals
+    (or the density matrix) are used and the grid is processed in chunks of
+    points (in parallel threads) so that basis function values are never
+    stored for all points at once (see
+    :meth:`~exatomic.algorithms.numerical.Shells.density`).
+
+    Args
+        uni (exatomic.container.Universe): a universe
+        field_params (dict,pd.Series): dict with {'rmin', 'rmax', 'nr', ...}
+        mocoefs (str): column in momatrix (default 'coef')
+        orbocc (str): column in orbital (default 'occupation')
+        inplace (bool): if False, return the field obj instead of modifying uni
+        tol (float): screening tolerance for basis function values
+        chunk (int): number of grid points evaluated at once (per thread)
+        threads (int): number of threads (default number of CPUs)
+        cache (BasisCache): cache of basis function values, e.g.
+            exatomic.algorithms.numerical.basis_cache (default None); cached
+            values are retained up to the cache's byte budget (instead of
+            being bounded by chunk)
+        dmat (bool): use the density matrix (uni.density) instead of momatrix
+        gradient (bool): also compute the x, y and z components of the density gradient
+        kinetic (bool): also compute the (positive definite) kinetic energy density
+    """
     t1 = datetime.now()
     frame = uni.atom.nframes - 1 if frame is None else frame
     if mocoefs is None:
@@ -277,33 +272,43 @@ def add_density(uni, field_params=None, mocoefs=None, orbocc=None,
     else:
         if orbocc is None:
             orbocc = mocoefs
-    if (mocoefs not in uni.momatrix.columns) or \
-       (orbocc not in uni.orbital.columns):
+    if not dmat and ((mocoefs not in uni.momatrix.columns) or
+                     (orbocc not in uni.orbital.columns)):
         print('Either mocoefs {} is not in uni.momatrix or'.format(mocoefs))
         print('orbocc {} is not in uni.orbital'.format(orbocc))
         return
-    _determine_bfns(uni, frame, norm)
-    orbs = uni.momatrix.groupby('orbital')
-    vector = np.array(range(uni.momatrix.orbital.max() + 1))
-    fps = _determine_fps(uni, field_params, len(vector))
+    nvec = 1 + 3 * gradient + kinetic
+    fps = _determine_fps(uni, field_params, nvec)
 
     x, y, z = numerical_grid_from_field_params(fps)
-    bflds = _evaluate_symbolic(uni.basis_functions[frame], x, y, z)
-    cmat = uni.momatrix.square(column=mocoefs).values
-    oflds = _compute_orbitals(bflds, vector, cmat)
-    # oflds = _compute_orbitals(bflds, vector, orbs, mocoefs)
-    dens = _compute_density(oflds, uni.orbital[orbocc].values)
+    shells = Shells.from_universe(uni, frame=frame, norm=norm)
+    kwargs = {'gradient': gradient, 'kinetic': kinetic, 'tol': tol, 'chunk': chunk,
+              'threads': threads, 'cache': cache}
+    if dmat:
+        dens = shells.density(x, y, z, dmat=uni.density.square().values, **kwargs)
+    else:
+        vector = np.array(range(uni.momatrix.orbital.max() + 1))
+        cmat = uni.momatrix.square(column=mocoefs).values
+        occvec = uni.orbital[orbocc].values[vector]
+        occ = np.nonzero(occvec)[0]
+        dens = shells.density(x, y, z, cmat=cmat[:, vector[occ]],
+                              occupation=occvec[occ], **kwargs)
+    if nvec > 1:
+        field = _make_field(np.vstack([np.atleast_2d(d) for d in dens]), fps)
+    else:
+        field = _make_field(dens, fps.loc[0])
     t2 = datetime.now()
     print('Timing: compute density     - {:.2f}s'.format((t2-t1).total_seconds()))
 
-    if not inplace: return _make_field(dens, fps.loc[0])
-    uni.add_field(_make_field(dens, fps.loc[0]))
+    if not inplace: return field
+    uni.add_field(field)
 
 
 
 def add_molecular_orbitals(uni, field_params=None, mocoefs=None,
                            vector=None, frame=None, inplace=True,
-                           replace=True, norm='Nd'):
+                           replace=True, norm='Nd', tol=1e-10, chunk=16384,
+                           threads=None, cache=None, dtype=None):
     """
     If a universe contains enough information to generate
     molecular orbitals (basis_set, basis_set_order and momatrix),
@@ -317,8 +322,17 @@ def add_molecular_orbitals(uni, field_params=None, mocoefs=None,
         field_params (dict,pd.Series): dict with {'rmin', 'rmax', 'nr', ...}
         mocoefs (str): column in momatrix (default 'coef')
         vector (int, list, range, np.array): the MO vectors to evaluate
+        frame (int): frame of atomic positions (default last frame)
         inplace (bool): if False, return the field obj instead of modifying uni
         replace (bool): if False, do not delete any previous fields
+        tol (float): screening tolerance for basis function values
+        chunk (int): number of grid points evaluated at once (per thread)
+        threads (int): number of threads (default number of CPUs)
+        cache (BasisCache): cache of basis function values, e.g.
+            exatomic.algorithms.numerical.basis_cache (default None); cached
+            values are retained up to the cache's byte budget (instead of
+            being bounded by chunk)
+        dtype (str): store field values compactly ('float32' or 'int16')
 
     Warning:
        If replace is True, removes any fields previously attached to the universe
@@ -326,27 +340,152 @@ def add_molecular_orbitals(uni, field_params=None, mocoefs=None,
     t1 = datetime.now()
     print('Warning: not extensively validated. Consider adding tests.')
     # Preliminary assignment and array dimensions
-    frame = uni.atom.nframes - 1
+    frame = uni.atom.nframes - 1 if frame is None else frame
     vector = _determine_vector(uni, vector)
     if mocoefs is None: mocoefs = 'coef'
     if mocoefs not in uni.momatrix.columns:
         print('mocoefs {} is not in uni.momatrix'.format(mocoefs))
         return
     fps = _determine_fps(uni, field_params, len(vector))
+    fps['frame'] = frame
 
     print('Evaluating {} basis functions once.'.format(
         len(uni.basis_set_order.index)))
-    _determine_bfns(uni, frame, norm)
 
     x, y, z = numerical_grid_from_field_params(fps)
     orbs = uni.momatrix.groupby('orbital')
-    bflds = _evaluate_symbolic(uni.basis_functions[frame], x, y, z)
+    shells = Shells.from_universe(uni, frame=frame, norm=norm)
     print(mocoefs)
-    cmat = uni.momatrix.square(column=mocoefs).values
-    oflds = _compute_orbitals(bflds, vector, cmat)
-    #oflds = _compute_orbitals(bflds, vector, orbs, mocoefs)
-    field = _make_field(oflds, fps)
+    cmat = _frame_cmat(uni, mocoefs, frame)
+    oflds = shells.contract(x, y, z, cmat[:, vector], tol=tol, chunk=chunk,
+                            threads=threads, cache=cache)
+    field = _make_field(oflds, fps, dtype=dtype)
+
+    t2 = datetime.now()
+    print('Timing: compute orbitals    - {:.2f}s'.format((t2-t1).total_seconds()))
+
+    if not inplace: return field
+    if replace:
+        if hasattr(uni, '_field'):
+            del uni.__dict__['_field']
+    uni.add_field(field)
+
+
+def _frame_cmat(uni, mocoefs, frame):
+    """The square C matrix of a frame (or of the first frame if not present)."""
+    frames = uni.momatrix['frame'].astype(np.int64)
+    if not (frames == frame).any():
+        frame = frames.min()
+    return uni.momatrix.square(frame=frame, column=mocoefs).values
+
+
+def _trajectory_orbitals(shells, fps, cpath, cidx, opath, oidx, tol, chunk):
+    """
+    Evaluate orbitals of a single frame (in a worker process). The C
+    matrices are read from (and the result optionally written to) memory
+    mapped .npy files shared by all workers.
+    """
+    cmat = np.load(cpath, mmap_mode='r')[cidx]
+    x, y, z = numerical_grid_from_field_params(fps)
+    oflds = shells.contract(x, y, z, cmat, tol=tol, chunk=chunk, threads=1,
+                            cache=None)
+    if opath is None:
+        return oflds
+    out = np.load(opath, mmap_mode='r+')
+    out[oidx] = oflds
+    out.flush()
+
+
+def add_trajectory_orbitals(uni, frames=None, field_params=None, mocoefs=None,
+                            vector=None, inplace=True, replace=True, norm='Nd',
+                            tol=1e-10, chunk=16384, processes=None, path=None,
+                            dtype=None):
+    """
+    Evaluate molecular orbitals on a numerical grid for many frames of a
+    trajectory (e.g. snapshots of an ab initio molecular dynamics run).
+    Frames are processed in parallel using a process pool. The (per frame)
+    C matrices are written once to a memory mapped file that all workers
+    share, and each worker only receives the (small) shell arrays of its
+    frame (see :class:`~exatomic.algorithms.numerical.Shells`).
+
+    All orbitals of all frames are collected into one
+    :class:`~exatomic.core.field.AtomicField` (the frame column of the field
+    parameters identifies the frame). If path is given, field values are
+    instead streamed to a .npy file of shape (nframes, nvector, npoints)
+    by the workers and the field values are memory mapped views of it.
+
+    .. code-block:: Python
 
+        add_trajectory_orbitals(uni, frames=range(0, 500, 10), vector=[10, 11],
+                                path='orbitals.npy')
+
+    Args
+        uni (exatomic.container.Universe): a universe
+        frames (list): frames to evaluate (default all frames)
+        field_params (dict,pd.Series): dict with {'rmin', 'rmax', 'nr', ...}
+        mocoefs (str): column in momatrix (default 'coef')
+        vector (int, list, range, np.array): the MO vectors to evaluate
+        inplace (bool): if False, return the field obj instead of modifying uni
+        replace (bool): if False, do not delete any previous fields
+        tol (float): screening tolerance for basis function values
+        chunk (int): number of grid points evaluated at once
+        processes (int): number of worker processes (default number of CPUs, 1 for serial)
+        path (str): .npy file to stream field values to (default in memory)
+        dtype (str): store field values compactly ('float32' or 'int16'; copies memory mapped values)
+
+    Note:
+        If the momatrix contains a single frame, its C matrix is used for
+        all frames.
+    """
+    t1 = datetime.now()
+    if frames is None:
+        frames = np.sort(uni.atom['frame'].astype(np.int64).unique())
+    frames = np.asarray(frames, dtype=np.int64)
+    vector = _determine_vector(uni, vector)
+    if mocoefs is None: mocoefs = 'coef'
+    if mocoefs not in uni.momatrix.columns:
+        print('mocoefs {} is not in uni.momatrix'.format(mocoefs))
+        return
+    fps = _determine_fps(uni, field_params, 1)
+    nvec = len(vector)
+    npts = int(fps.loc[0, 'nx'] * fps.loc[0, 'ny'] * fps.loc[0, 'nz'])
+    # Share the C matrices of all (distinct) frames through a memory map
+    mframes = uni.momatrix['frame'].astype(np.int64)
+    cframes = np.where(np.isin(frames, mframes.unique()), frames, mframes.min())
+    cframes, cidx = np.unique(cframes, return_inverse=True)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        cpath = os.path.join(tmpdir, 'cmat.npy')
+        cmats = np.lib.format.open_memmap(cpath, mode='w+', dtype=np.float64,
+                                          shape=(len(cframes), len(uni.basis_set_order.index), nvec))
+        for i, frame in enumerate(cframes):
+            cmats[i] = _frame_cmat(uni, mocoefs, frame)[:, vector]
+        cmats.flush()
+        del cmats
+        if path is not None:
+            np.lib.format.open_memmap(path, mode='w+', dtype=np.float64,
+                                      shape=(len(frames), nvec, npts)).flush()
+        args = [(Shells.from_universe(uni, frame=frame, norm=norm), fps,
+                 cpath, cidx[i], path, i, tol, chunk) for i, frame in enumerate(frames)]
+        if processes == 1:
+            results = [_trajectory_orbitals(*arg) for arg in args]
+        else:
+            # Workers are spawned, forking after numba's threading layer started may hang
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as executor:
+                results = list(executor.map(_trajectory_orbitals, *zip(*args)))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    if path is not None:
+        results = np.load(path, mmap_mode='r')
+    else:
+        results = np.stack(results)
+    fps = make_fps(nrfps=len(frames) * nvec, fps=fps)
+    fps['frame'] = np.repeat(frames, nvec)
+    fps.reset_index(drop=True, inplace=True)
+    # Memory mapped results stay on disk (the field values are views)
+    field = AtomicField(fps, field_values=results.reshape(len(frames) * nvec, npts),
+                        dtype=dtype)
     t2 = datetime.now()
     print('Timing: compute orbitals    - {:.2f}s'.format((t2-t1).total_seconds()))
 
@@ -355,3 +494,41 @@ def add_molecular_orbitals(uni, field_params=None, mocoefs=None,
         if hasattr(uni, '_field'):
             del uni.__dict__['_field']
     uni.add_field(field)
+
+
+def adaptive_molecular_orbitals(uni, field_params=None, mocoefs=None,
+                                vector=None, frame=None, isovalue=0.03,
+                                size=8, dilate=1, norm='Nd', tol=1e-10):
+    """
+    Evaluate molecular orbitals adaptively for isosurfaces at +/- isovalue
+    (see :func:`~exatomic.algorithms.adaptive.adaptive_field`): only blocks
+    of the grid near the isosurfaces are evaluated at full resolution.
+
+    Args
+        uni (exatomic.container.Universe): a universe
+        field_params (dict,pd.Series): dict with {'rmin', 'rmax', 'nr', ...}
+        mocoefs (str): column in momatrix (default 'coef')
+        vector (int, list, range, np.array): the MO vectors to evaluate
+        frame (int): frame of atomic positions (default last frame)
+        isovalue (float): isovalue of interest (both signs are used)
+        size (int): block edge length in grid points
+        dilate (int): layers of neighboring blocks to refine as well
+        tol (float): screening tolerance for basis function values
+
+    Returns
+        fields (list): :class:`~exatomic.algorithms.adaptive.BlockField` per vector
+    """
+    frame = uni.atom.nframes - 1 if frame is None else frame
+    vector = _determine_vector(uni, vector)
+    if mocoefs is None: mocoefs = 'coef'
+    fps = _determine_fps(uni, field_params, 1)
+    fps['frame'] = frame
+    shells = Shells.from_universe(uni, frame=frame, norm=norm)
+    cmat = _frame_cmat(uni, mocoefs, frame)
+    fields = []
+    for vec in vector:
+        func = lambda x, y, z: shells.contract(x, y, z, cmat[:, [vec]], tol=tol,
+                                               cache=None)[0]
+        fields.append(adaptive_field(func, fps, [isovalue, -isovalue],
+                                     size=size, dilate=dilate))
+    return fields
@@ -8,8 +8,6 @@ Molecular orbitals are constructed symbolically
 then evaluated on a numerical grid.
 These are their stories.
 '''
-from ipywidgets import FloatProgress, HBox
-from IPython.display import display
 import numpy as np
 import pandas as pd
 from numba import jit
@@ -22,30 +20,45 @@ from .basis import (CartesianBasisFunction,
 from exatomic.core.field import AtomicField
 
 
+def _close_fractions(a, b, kws, signed):
+    """Fractions of (field) values of a close to b and of b close to a."""
+    n = np.isclose(a, b, **kws).sum(axis=-1)
+    on = np.isclose(b, a, **kws).sum(axis=-1)
+    if not signed:
+        n = np.maximum(n, np.isclose(a, -b, **kws).sum(axis=-1))
+        on = np.maximum(on, np.isclose(-b, a, **kws).sum(axis=-1))
+    return n / a.shape[-1], on / a.shape[-1]
+
+
 def compare_fields(rtol=5e-5, atol=1e-12, mtol=None, signed=True, verbose=True, *unis):
     """Compare field values of multiple universe.
-    It is expected that fields are in the same order."""
-    flds = (uni.field.field_values for uni in unis)
+    It is expected that fields are in the same order.
+    Equally sized fields are compared all at once (see also
+    :meth:`~exatomic.core.field.AtomicField.overlap`)."""
     kws = {'rtol': rtol, 'atol': atol}
+    compare = unis[0].field
+    nfield = min(uni.field.nfields for uni in unis)
+    pairs = []
+    for uni in unis[1:]:
+        a, b = compare.field_array, uni.field.field_array
+        if a is not None and b is not None and a.shape[1] == b.shape[1]:
+            pairs.append(_close_fractions(compare._dense()[:nfield],
+                                          uni.field._dense()[:nfield], kws, signed))
+        else:
+            fracs = [_close_fractions(np.asarray(f0), np.asarray(f1), kws, signed)
+                     for f0, f1 in zip(compare.field_values, uni.field.field_values)]
+            pairs.append(tuple(np.array(f) for f in zip(*fracs)))
     fracs = []
     if verbose:
         fmt = '{:<12}:{:>18}{:>18}'
-    for i, fls in enumerate(zip(*flds)):
-        compare = fls[0]
-        if not i and verbose: print(fmt.format(len(compare), "Np.isclose(0, 1)", "Np.isclose(1, 0)"))
+        print(fmt.format(len(compare.field_values[0]), "Np.isclose(0, 1)", "Np.isclose(1, 0)"))
+    for i in range(nfield):
         percents = []
-        for fl in fls[1:]:
-            n = np.isclose(compare, fl, **kws).sum()
-            on = np.isclose(fl, compare, **kws).sum()
-            if not signed:
-                m = np.isclose(compare, -fl, **kws).sum()
-                om = np.isclose(-fl, compare, **kws).sum()
-                n = max(n, m)
-                on = max(on, om)
-            percents.append((n / len(compare)) * 100)
-            percents.append((on / len(compare)) * 100)
-            fracs.append(n / len(compare))
-            fracs.append(on / len(compare))
+        for n, on in pairs:
+            percents.append(n[i] * 100)
+            percents.append(on[i] * 100)
+            fracs.append(n[i])
+            fracs.append(on[i])
         form = '{:<12}:' + '{:>18.12f}' * len(percents)
         if verbose:
             print(form.format(i, *percents))
@@ -102,7 +115,11 @@ def _gen_spher_basfns(atom, funcs, sets, norm='Nd'):
 
 
 def gen_gradients(bfns):
-    """Evaluate symbolic gradients."""
+    """
+    Evaluate symbolic gradients (see also
+    :func:`~exatomic.algorithms.numerical.evaluate_basis` with gradient=True
+    for a compiled, closed form evaluation).
+    """
     grx = [bas.gradient(cart='x') for bas in bfns]
     gry = [bas.gradient(cart='y') for bas in bfns]
     grz = [bas.gradient(cart='z') for bas in bfns]
@@ -137,134 +154,6 @@ def _compute_density(ovs, occvec):
     return dens
 
 
-def _compute_current_density_numexpr(bvs, gvx, gvy, gvz, cmatr, cmati, occvec):
-    nbas, npts = bvs.shape
-    # chigradx = np.empty(npts, dtype=np.float64)
-    # chigrady = np.empty(npts, dtype=np.float64)
-    # chigradz = np.empty(npts, dtype=np.float64)
-    curx = np.zeros(npts, dtype=np.float64)
-    cury = np.zeros(npts, dtype=np.float64)
-    curz = np.zeros(npts, dtype=np.float64)
-    fp = FloatProgress(description='Total:')
-    # ifp = FloatProgress(description='Inner:')
-    # box = HBox([fp, ifp])
-    display(fp)
-    for mu in range(nbas):
-        fp.value = mu / nbas * 100
-        crmu = cmatr[mu]
-        cimu = cmati[mu]
-        bvmu = bvs[mu]
-        gvxmu = gvx[mu]
-        gvymu = gvy[mu]
-        gvzmu = gvz[mu]
-        for nu in range(nbas):
-            # ifp.value = nu / nbas * 100
-            crnu = cmatr[nu]
-            cinu = cmati[nu]
-            bvnu = bvs[nu]
-            gvxnu = gvx[nu]
-            gvynu = gvy[nu]
-            gvznu = gvz[nu]
-            cval = evaluate('-0.5 * (occvec * (crmu * cinu - cimu * crnu))').sum()
-            # chigradx = evaluate('bvmu * gvxnu - gvxmu * bvnu')
-            # chigrady = evaluate('bvmu * gvynu - gvymu * bvnu')
-            # chigradz = evaluate('bvmu * gvznu - gvzmu * bvnu')
-            curx = evaluate('curx + cval * (bvmu * gvxnu - gvxmu * bvnu)')
-            cury = evaluate('cury + cval * (bvmu * gvynu - gvymu * bvnu)')
-            curz = evaluate('curz + cval * (bvmu * gvznu - gvzmu * bvnu)')
-    # box.close()
-    fp.close()
-    # ifp.close()
-    return curx, cury, curz
-
-
-@jit(nopython=True, nogil=True, parallel=True)
-def _compute_current_density_inner_jit(bvmu, gvxmu, gvymu, gvzmu, nbas,
-                                       cmatr, cmati, occvec, mu,
-                                       curx, cury, curz):
-    for nu in range(nbas):
-        cval = (-0.5 * (occvec * (cmatr[mu] * cmati[nu]
-                                - cmati[mu] * cmatr[nu]))).sum()
-        chigradx = bvs[mu] * gvx[nu] - gvx[mu] * bvs[nu]
-        chigrady = bvs[mu] * gvy[nu] - gvy[mu] * bvs[nu]
-        chigradz = bvs[mu] * gvz[nu] - gvz[mu] * bvs[nu]
-        curx += cval * chigradx
-        cury += cval * chigrady
-        curz += cval * chigradz
-
-@jit(nopython=True, nogil=True, parallel=True)
-def _compute_current_density_innerest_jit(bvmu, gvxmu, gvymu, gvzmu, nbas,
-                                          cmatr, cmati, occvec, mu,
-                                          curx, cury, curz):
-    for nu in range(nbas):
-        cval = (-0.5 * (occvec * (cmatr[mu] * cmati[nu]
-                                - cmati[mu] * cmatr[nu]))).sum()
-        chigradx = bvs[mu] * gvx[nu] - gvx[mu] * bvs[nu]
-        chigrady = bvs[mu] * gvy[nu] - gvy[mu] * bvs[nu]
-        chigradz = bvs[mu] * gvz[nu] - gvz[mu] * bvs[nu]
-        curx += cval * chigradx
-        cury += cval * chigrady
-        curz += cval * chigradz
-
-
-
-
-@jit(nopython=True, nogil=True, parallel=True)
-def _compute_current_density_jit(bvs, gvx, gvy, gvz, cmatr, cmati, occvec):
-    """Compute the current density in each cartesian direction."""
-    nbas, npts = bvs.shape
-    chigradx = np.empty(npts, dtype=np.float64)
-    chigrady = np.empty(npts, dtype=np.float64)
-    chigradz = np.empty(npts, dtype=np.float64)
-    curx = np.zeros(npts, dtype=np.float64)
-    cury = np.zeros(npts, dtype=np.float64)
-    curz = np.zeros(npts, dtype=np.float64)
-    for mu in range(nbas):
-        _compute_current_density_inner_jit(bvs[mu], gvx[mu], gvy[mu], gvz[mu], nbas,
-                                           cmatr, cmati, occvec,
-                                           mu, curx, cury, curz)
-    return curx, cury, curz
-
-
-@jit(nopython=True, nogil=True, parallel=True)
-def _compute_current_density(bvs, gvx, gvy, gvz, cmatr, cmati, occvec):
-    """Compute the current density in each cartesian direction."""
-    nbas, npts = bvs.shape
-    chigradx = np.empty(npts, dtype=np.float64)
-    chigrady = np.empty(npts, dtype=np.float64)
-    chigradz = np.empty(npts, dtype=np.float64)
-    curx = np.zeros(npts, dtype=np.float64)
-    cury = np.zeros(npts, dtype=np.float64)
-    curz = np.zeros(npts, dtype=np.float64)
-    for mu in range(nbas):
-        for nu in range(nbas):
-            cval = (-0.5 * (occvec * (cmatr[mu] * cmati[nu]
-                                    - cmati[mu] * cmatr[nu]))).sum()
-            chigradx = bvs[mu] * gvx[nu] - gvx[mu] * bvs[nu]
-            chigrady = bvs[mu] * gvy[nu] - gvy[mu] * bvs[nu]
-            chigradz = bvs[mu] * gvz[nu] - gvz[mu] * bvs[nu]
-            curx += cval * chigradx
-            cury += cval * chigrady
-            curz += cval * chigradz
-    return curx, cury, curz
-
-
-def _compute_orb_ang_mom_numexpr(rx, ry, rz, jx, jy, jz, maxes):
-    """Compute the orbital angular momentum in each direction and the sum."""
-    ang_mom = np.empty((4, rx.shape[0]), dtype=np.float64)
-    mxx, mxy, mxz = maxes[0]
-    myx, myy, myz = maxes[1]
-    mzx, mzy, mzz = maxes[2]
-    a0 = evaluate('ry * jz - rz * jy')
-    a1 = evaluate('rz * jx - rx * jz')
-    a2 = evaluate('rx * jy - ry * jx')
-    ang_mom[0] = evaluate('mxx * a0 + mxy * a1 + mxz * a2')
-    ang_mom[1] = evaluate('myx * a0 + myy * a1 + myz * a2')
-    ang_mom[2] = evaluate('mzx * a0 + mzy * a1 + mzz * a2')
-    ang_mom[3] = ang_mom[0] + ang_mom[1] + ang_mom[2]
-    return ang_mom
-
-
 @jit(nopython=True, nogil=True, parallel=True)
 def _compute_orb_ang_mom(rx, ry, rz, jx, jy, jz, mxs):
     """Compute the orbital angular momentum in each direction and the sum."""
@@ -312,21 +201,19 @@ def _compute_orb_ang_mom(rx, ry, rz, jx, jy, jz, mxs):
 #                 dens += occvec[p] * cmat[mu, p] * cmat[nu, p] * basvals[:,mu] * basvals[:,nu]
 #     return dens
 
-def _make_field(flds, fps):
+def _make_field(flds, fps, dtype=None):
     """Return an AtomicField from field arrays and parameters."""
     try:
         nvec = flds.shape[0]
         if len(fps.index) == nvec:
             fps.reset_index(drop=True, inplace=True)
-            return AtomicField(
-                fps, field_values=[flds[i] for i in range(nvec)])
-        return AtomicField(
-            make_fps(nrfps=nvec, fps=fps),
-            field_values=[flds[i] for i in range(nvec)])
+            return AtomicField(fps, field_values=flds, dtype=dtype)
+        return AtomicField(make_fps(nrfps=nvec, fps=fps), field_values=flds,
+                           dtype=dtype)
     except:
         return AtomicField(
             make_fps(nrfps=1, **fps),
-            field_values=[flds])
+            field_values=[flds], dtype=dtype)
 
 
 @jit(nopython=True, nogil=True, parallel=True)
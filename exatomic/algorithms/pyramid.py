@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Multi-resolution Fields
+#########################
+Pyramids of block averaged (2x, 4x, 8x, ...) copies of fields on uniform
+grids, used to display large fields (e.g. from cube files) quickly and
+refine them on demand. Every level halves the number of points along each
+direction; the last block along a direction may be incomplete, in which case
+it is averaged over the points it contains.
+
+.. code-block:: Python
+
+    levels = pyramid(values, (nx, ny, nz), 3)   # values.shape == (nfields, nx*ny*nz)
+    coarse, shape = levels[-1]                  # 8x block averages
+"""
+import numpy as np
+from numba import jit, prange
+
+
+@jit(nopython=True, nogil=True, parallel=True, cache=True)
+def _halve(v, wx, wy, wz):
+    """
+    Weighted 2x2x2 block averages of fields v (nfields, nx, ny, nz) where the
+    weights (numbers of fine grid points per point) are separable.
+    """
+    nf, nx, ny, nz = v.shape
+    mx = (nx + 1) // 2
+    my = (ny + 1) // 2
+    mz = (nz + 1) // 2
+    out = np.empty((nf, mx, my, mz), dtype=np.float64)
+    for n in prange(nf * mx):
+        f = n // mx
+        i = n % mx
+        for j in range(my):
+            for k in range(mz):
+                s = 0.0
+                w = 0.0
+                for a in range(2 * i, min(2 * i + 2, nx)):
+                    for b in range(2 * j, min(2 * j + 2, ny)):
+                        for c in range(2 * k, min(2 * k + 2, nz)):
+                            wt = wx[a] * wy[b] * wz[c]
+                            s += wt * v[f, a, b, c]
+                            w += wt
+                out[f, i, j, k] = s / w
+    return out
+
+
+def _halve_weights(w):
+    """Numbers of fine grid points per point of the next level (one direction)."""
+    out = w[::2].copy()
+    out[:len(w) // 2] += w[1::2]
+    return out
+
+
+def pyramid(values, shape, levels=3):
+    """
+    Block averages of fields on a uniform grid for levels 1 (2x) to levels
+    (2**levels x); every level is computed (in parallel over fields and grid
+    planes) from the previous one.
+
+    Args:
+        values (array): Field values of shape (nfields, nx * ny * nz)
+        shape (tuple): Grid shape (nx, ny, nz)
+        levels (int): Number of levels
+
+    Returns:
+        pyramid (list): Tuples of values (nfields, npts) and grid shape per level
+    """
+    values = np.asarray(values)
+    nf = values.shape[0]
+    v = values.reshape((nf, ) + tuple(shape))
+    ws = [np.ones((n, ), dtype=np.float64) for n in shape]
+    out = []
+    for _ in range(levels):
+        v = _halve(v, *ws)
+        ws = [_halve_weights(w) for w in ws]
+        out.append((v.reshape(nf, -1), v.shape[1:]))
+    return out
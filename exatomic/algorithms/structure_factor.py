@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Static Structure Factor
+#########################
+The static structure factor S(q) is computed either directly from atomic
+positions using a sum over reciprocal lattice vectors of the periodic cell
+(given in the :class:`~exatomic.core.frame.Frame` table),
+
+.. math::
+
+    S_{AB}\\left(\\mathbf{k}\\right) = \\frac{1}{\\sqrt{N_{A}N_{B}}}
+        \\left<\\rho_{A}\\left(\\mathbf{k}\\right)\\rho_{B}^{*}\\left(\\mathbf{k}\\right)\\right>,
+    \\quad \\rho_{A}\\left(\\mathbf{k}\\right) = \\sum_{j\\in A}e^{i\\mathbf{k}\\cdot\\mathbf{r}_{j}}
+
+and spherically averaged over shells of :math:`\\left|\\mathbf{k}\\right|`, or
+by Fourier transformation of a radial distribution function (see
+:func:`~exatomic.algorithms.pcf.radial_pair_correlation`).
+
+.. code-block:: Python
+
+    sq = structure_factor(uni, qmax=10.0, length='A')       # Total S(q)
+    sq = structure_factor(uni, a='O', b='O', qmax=10.0)     # Partial S(q)
+"""
+import numpy as np
+import pandas as pd
+import numba as nb
+from exa.util.units import Length
+from exatomic.core.error import PeriodicUniverseError
+from exatomic.algorithms.distance import _trajectory_arrays, _cell_arrays
+
+
+@nb.jit(nopython=True, nogil=True, parallel=True)
+def _reciprocal_sum(frac, inv, wa, wb, hmax, dq, nbins, qmax):
+    """
+    Frame parallel binned sum over the (half space of) reciprocal lattice
+    vectors; returns the sums and number of vectors per bin, per frame.
+    """
+    nf, nat = frac.shape[:2]
+    sums = np.zeros((nf, nbins), dtype=np.float64)
+    counts = np.zeros((nf, nbins), dtype=np.float64)
+    twopi = 2*np.pi
+    for f in nb.prange(nf):
+        # Phase factors exp(2 pi i h f) for each axis, indexed by h + hmax
+        phase = np.empty((3, nat, 2*hmax.max() + 1), dtype=np.complex128)
+        for ax in range(3):
+            for j in range(nat):
+                for h in range(-hmax[ax], hmax[ax] + 1):
+                    phase[ax, j, h + hmax[ax]] = np.exp(1j*twopi*h*frac[f, j, ax])
+        pab = np.empty((nat, ), dtype=np.complex128)
+        for h in range(0, hmax[0] + 1):
+            for k in range(-hmax[1], hmax[1] + 1):
+                if h == 0 and k < 0:
+                    continue
+                for j in range(nat):
+                    pab[j] = phase[0, j, h + hmax[0]]*phase[1, j, k + hmax[1]]
+                for l in range(-hmax[2], hmax[2] + 1):
+                    if h == 0 and k == 0 and l <= 0:
+                        continue
+                    kx = twopi*(h*inv[f, 0, 0] + k*inv[f, 0, 1] + l*inv[f, 0, 2])
+                    ky = twopi*(h*inv[f, 1, 0] + k*inv[f, 1, 1] + l*inv[f, 1, 2])
+                    kz = twopi*(h*inv[f, 2, 0] + k*inv[f, 2, 1] + l*inv[f, 2, 2])
+                    q = np.sqrt(kx**2 + ky**2 + kz**2)
+                    if q >= qmax:
+                        continue
+                    rhoa = 0j
+                    rhob = 0j
+                    for j in range(nat):
+                        p = pab[j]*phase[2, j, l + hmax[2]]
+                        rhoa += wa[j]*p
+                        rhob += wb[j]*p
+                    i = min(int(q / dq), nbins - 1)
+                    sums[f, i] += (rhoa*np.conj(rhob)).real
+                    counts[f, i] += 1.0
+    return sums, counts
+
+
+def structure_factor(universe, qmax=5.0, dq=0.05, a=None, b=None, length='au'):
+    """
+    Compute the (partial) static structure factor of a periodic universe
+    from a reciprocal lattice sum over all frames.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Periodic universe
+        qmax (float): Largest wavevector magnitude (in inverse length units)
+        dq (float): Bin width of wavevector magnitudes
+        a (str or list): First species symbol(s) (default all atoms)
+        b (str or list): Second species symbol(s) (default a)
+        length (str): Length unit (q is given in inverse units of length)
+
+    Returns:
+        sq (:class:`~pandas.Series`): Structure factor indexed by q (bin centers)
+
+    Note:
+        Atoms must appear in the same order in each frame (see
+        :meth:`~exatomic.core.atom.Atom.trajectory_array`). Only wavevectors
+        commensurate with the cell are sampled, so the resolution in q is
+        limited by the cell size.
+    """
+    if not universe.frame.is_periodic():
+        raise PeriodicUniverseError()
+    conv = Length['au', length]
+    qmax_au = qmax * conv
+    dq_au = dq * conv
+    xyz, frames, order, symbols = _trajectory_arrays(universe)
+    nat = xyz.shape[1]
+    a = [a] if isinstance(a, str) else a
+    b = a if b is None else [b] if isinstance(b, str) else b
+    wa = np.ones((nat, )) if a is None else np.in1d(symbols, a).astype(np.float64)
+    wb = np.ones((nat, )) if b is None else np.in1d(symbols, b).astype(np.float64)
+    cell, inv, origin, periodic = _cell_arrays(universe, xyz, 0.0)
+    frac = np.einsum('fai,fij->faj', xyz, inv)
+    # |m_i| <= |k||a_i|/(2 pi) bounds the Miller indices needed
+    hmax = np.floor(qmax_au*np.linalg.norm(cell, axis=2).max(axis=0)/(2*np.pi)).astype(np.int64)
+    nbins = int(np.ceil(qmax_au / dq_au))
+    sums, counts = _reciprocal_sum(np.ascontiguousarray(frac), inv, wa, wb, hmax,
+                                   dq_au, nbins, qmax_au)
+    counts = counts.sum(axis=0)
+    keep = counts > 0
+    s = sums.sum(axis=0)[keep] / counts[keep] / np.sqrt(wa.sum()*wb.sum())
+    q = (np.arange(nbins) + 0.5)[keep] * dq
+    sq = pd.Series(s, index=q, name='S')
+    sq.index.name = 'q'
+    return sq
+
+
+def rdf_structure_factor(r, g, density, q):
+    """
+    Compute the structure factor from a radial distribution function,
+
+    .. math::
+
+        S\\left(q\\right) = 1 + 4\\pi\\rho\\int_{0}^{\\infty}r^{2}\\left(g\\left(r\\right) - 1\\right)
+            \\frac{\\sin\\left(qr\\right)}{qr}dr
+
+    evaluated for all q at once.
+
+    .. code-block:: Python
+
+        pcf = radial_pair_correlation(uni, 'O', 'O', length='au')
+        rho = n_oxygen / uni.frame['cell_volume'].mean()
+        sq = rdf_structure_factor(pcf.index.values, pcf.iloc[:, 0].values, rho, q)
+
+    Args:
+        r (array): Radial grid
+        g (array): Radial distribution function on the grid
+        density (float): Number density (in units consistent with r)
+        q (array): Wavevector magnitudes
+
+    Returns:
+        sq (:class:`~pandas.Series`): Structure factor indexed by q
+    """
+    r = np.asarray(r, dtype=np.float64)
+    g = np.asarray(g, dtype=np.float64)
+    q = np.asarray(q, dtype=np.float64)
+    qr = np.outer(q, r)
+    integrand = r**2 * (g - 1) * np.sinc(qr/np.pi)
+    s = 1 + 4*np.pi*density*np.trapz(integrand, r, axis=1)
+    sq = pd.Series(s, index=q, name='S')
+    sq.index.name = 'q'
+    return sq
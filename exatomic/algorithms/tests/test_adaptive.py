@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Adaptive Grids
+##########################
+"""
+import bz2
+import numpy as np
+from os.path import abspath, join
+from unittest import TestCase
+import exatomic
+from exatomic.gaussian import Output
+from exatomic.algorithms.adaptive import adaptive_field
+from exatomic.algorithms.orbital import add_molecular_orbitals, adaptive_molecular_orbitals
+from exatomic.algorithms.orbital_util import make_fps, numerical_grid_from_field_params
+
+
+class TestAdaptiveField(TestCase):
+    """Adaptive evaluation of analytic and orbital fields."""
+    def test_gaussian(self):
+        fps = make_fps(rmin=-5, rmax=5, nr=41)
+        func = lambda x, y, z: np.exp(-(x**2 + y**2 + z**2))
+        fld = adaptive_field(func, fps, [0.5], size=4)
+        ref = func(*numerical_grid_from_field_params(fps))
+        self.assertLess(fld.fraction, 0.2)
+        dense = fld.todense()
+        self.assertTrue(np.all(np.sign(dense - 0.5) == np.sign(ref - 0.5)))
+        for i in range(fld.nblock):
+            sl, vals = fld.block(i)
+            self.assertTrue(np.allclose(vals, ref.reshape(41, 41, 41)[sl]))
+        # Only points near the isosurface are evaluated at full resolution
+        self.assertEqual(adaptive_field(func, fps, [2.0]).nblock, 0)
+
+    def test_orbitals(self):
+        path = abspath(join(abspath(exatomic.__file__), "../static/gaussian/"))
+        with bz2.open(join(path, 'g09-ch3nh2-631g.out.bz2')) as f:
+            uni = Output(f.read().decode('utf-8')).to_universe()
+        fps = {'rmin': -8, 'rmax': 8, 'nr': 65}
+        flds = adaptive_molecular_orbitals(uni, field_params=fps, vector=[8, 9],
+                                           isovalue=0.05)
+        ref = add_molecular_orbitals(uni, field_params=fps, vector=[8, 9], inplace=False)
+        for fld, vals in zip(flds, ref.field_values):
+            self.assertLess(fld.fraction, 0.5)
+            dense = fld.todense()
+            for iso in [0.05, -0.05]:
+                self.assertTrue(np.all(np.sign(dense - iso) == np.sign(vals - iso)))
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Structural Alignment
+################################
+"""
+import numpy as np
+import pandas as pd
+from unittest import TestCase
+from exatomic import Universe
+from exatomic.algorithms.alignment import (superpose, pairwise_rmsd,
+                                           trajectory_rmsd, trajectory_rmsd_matrix)
+
+
+def _rotation(axis, angle):
+    """Rotation matrix about an axis."""
+    axis = axis / np.linalg.norm(axis)
+    k = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]],
+                  [-axis[1], axis[0], 0]])
+    return np.eye(3) + np.sin(angle)*k + (1 - np.cos(angle))*np.dot(k, k)
+
+
+class TestAlignment(TestCase):
+    """Rigidly rotated and translated copies of a random structure."""
+    def setUp(self):
+        np.random.seed(1)
+        self.ref = np.random.rand(12, 3) * 5
+        frames = []
+        for i in range(6):
+            rot = _rotation(np.random.rand(3), np.random.rand() * np.pi)
+            frames.append(np.dot(self.ref, rot) + np.random.rand(3) * 10)
+        self.xyz = np.array(frames)
+        self.noisy = self.xyz + np.random.normal(0, 0.05, self.xyz.shape)
+        atom = pd.DataFrame(self.noisy.reshape(-1, 3), columns=['x', 'y', 'z'])
+        atom['symbol'] = np.tile(['C'] * 6 + ['H'] * 6, 6)
+        atom['frame'] = np.repeat(range(6), 12)
+        self.uni = Universe(atom=atom)
+
+    def test_superpose(self):
+        rmsd, fit = superpose(self.xyz, self.ref, aligned=True)
+        self.assertTrue(np.allclose(rmsd, 0, atol=1e-8))
+        self.assertTrue(np.allclose(fit, self.ref))
+        mirror = self.xyz * np.array([1, 1, -1])
+        self.assertTrue(np.all(superpose(mirror, self.ref) > 0.1))
+
+    def test_pairwise(self):
+        mat = pairwise_rmsd(self.noisy)
+        self.assertTrue(np.allclose(mat, mat.T))
+        for i in range(1, 6):
+            ref = superpose(self.noisy, self.noisy[i])
+            self.assertTrue(np.allclose(mat[i], ref))
+
+    def test_universe(self):
+        rmsd, atom = trajectory_rmsd(self.uni, ref_frame=2, aligned=True)
+        self.assertAlmostEqual(rmsd[2], 0)
+        self.assertTrue(np.all(rmsd < 0.2))
+        xyz = atom.trajectory_array()
+        self.assertTrue(np.allclose(xyz[2], self.noisy[2]))
+        self.assertTrue(np.allclose(np.sqrt(((xyz - xyz[2])**2).sum(axis=2).mean(axis=1)), rmsd))
+        mat = trajectory_rmsd_matrix(self.uni, symbols=['C'], mass=True)
+        self.assertEqual(mat.shape, (6, 6))
+        self.assertTrue(np.allclose(mat.loc[2], trajectory_rmsd(self.uni, 2, ['C'], True)))
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Coordination Numbers
+################################
+"""
+import numpy as np
+import pandas as pd
+from itertools import product
+from unittest import TestCase
+from exatomic import Universe
+from exatomic.algorithms.coordination import coordination_numbers
+
+
+class TestCoordinationNumbers(TestCase):
+    """Compare to a brute force minimum image computation."""
+    def setUp(self):
+        np.random.seed(3)
+        self.cell = np.array([[20.0, 0.0, 0.0], [0.0, 22.0, 0.0], [1.5, 0.0, 21.0]])
+        nat, nframes = 80, 4
+        self.xyz = np.random.rand(nframes, nat, 3).dot(self.cell)
+        atom = pd.DataFrame(self.xyz.reshape(-1, 3), columns=['x', 'y', 'z'])
+        atom['symbol'] = np.tile(['Na'] * 10 + ['O'] * (nat - 10), nframes)
+        atom['frame'] = np.repeat(range(nframes), nat)
+        frame = pd.DataFrame(np.tile(self.cell.ravel(), (nframes, 1)),
+                             columns=['xi', 'yi', 'zi', 'xj', 'yj', 'zj', 'xk', 'yk', 'zk'])
+        frame['atom_count'] = nat
+        frame['periodic'] = True
+        self.uni = Universe(atom=atom, frame=frame)
+
+    def test_periodic(self):
+        r0, rcut = 4.5, 9.0
+        cn = coordination_numbers(self.uni, 'Na', 'O', r0, rcut=rcut)
+        self.assertEqual(cn.shape, (4, 10))
+        shifts = np.array(list(product([-1, 0, 1], repeat=3))).dot(self.cell)
+        for f in range(4):
+            for i in range(10):
+                d = self.xyz[f, 10:, None] - self.xyz[f, i] + shifts
+                r = np.sqrt((d**2).sum(axis=2)).min(axis=1)
+                x = r[r < rcut] / r0
+                ref = ((1 - x**6) / (1 - x**12)).sum()
+                self.assertTrue(np.isclose(cn.iloc[f, i], ref))
+
+    def test_free(self):
+        self.uni.frame['periodic'] = False
+        cn = coordination_numbers(self.uni, 'Na', ['Na', 'O'], 4.5, rcut=9.0)
+        xyz = self.xyz[0]
+        r = np.sqrt(((xyz[:10, None] - xyz)**2).sum(axis=2))
+        r[range(10), range(10)] = np.inf
+        x = r / 4.5
+        s = np.where(r < 9.0, (1 - x**6) / (1 - x**12), 0.0)
+        self.assertTrue(np.allclose(cn.iloc[0].values, s.sum(axis=1)))
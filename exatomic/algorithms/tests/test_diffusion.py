@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Diffusion Coefficients
+##################################
+"""
+import numpy as np
+import pandas as pd
+from unittest import TestCase
+from exa.util.units import Length, Time
+from exatomic import Universe
+from exatomic.algorithms.diffusion import block_averaged_diffusion
+
+
+class TestBlockAveragedDiffusion(TestCase):
+    """Random walks with a known diffusion coefficient."""
+    def setUp(self):
+        np.random.seed(0)
+        nframes, nat, self.sigma, self.dt = 400, 60, 0.1, 10.0
+        steps = np.random.normal(0, self.sigma, size=(nframes, nat, 3))
+        steps[:, nat//2:] *= 2
+        xyz = steps.cumsum(axis=0).reshape(nframes*nat, 3)
+        atom = pd.DataFrame(xyz, columns=['x', 'y', 'z'])
+        atom['symbol'] = np.tile(['O'] * (nat//2) + ['H'] * (nat//2), nframes)
+        atom['frame'] = np.repeat(range(nframes), nat)
+        frame = pd.DataFrame.from_dict({'atom_count': [nat] * nframes,
+                                        'time': np.arange(nframes) * self.dt})
+        self.uni = Universe(atom=atom, frame=frame)
+
+    def test_trajectory_array(self):
+        xyz = self.uni.atom.trajectory_array()
+        self.assertEqual(xyz.shape, (400, 60, 3))
+        self.assertTrue(np.allclose(xyz[1, 0], self.uni.atom.loc[60, ['x', 'y', 'z']].values.astype(float)))
+
+    def test_diffusion(self):
+        df = block_averaged_diffusion(self.uni, nblocks=4, length='au', time='au',
+                                      processes=1)
+        d = self.sigma**2 / (2 * self.dt)
+        self.assertTrue(np.isclose(df.loc['O', 'D'], d, rtol=0.2))
+        self.assertTrue(np.isclose(df.loc['H', 'D'], 4 * d, rtol=0.2))
+        self.assertTrue(np.all(df['stderr'] > 0))
+        self.assertRaises(ValueError, block_averaged_diffusion, self.uni, nblocks=1)
+
+    def test_parallel(self):
+        serial = block_averaged_diffusion(self.uni, nblocks=4, processes=1)
+        parallel = block_averaged_diffusion(self.uni, nblocks=4, processes=2)
+        self.assertTrue(np.allclose(serial.values, parallel.values))
+        scale = Length['au', 'cm']**2 / Time['au', 's']
+        au = block_averaged_diffusion(self.uni, nblocks=4, length='au', time='au',
+                                      processes=1)
+        self.assertTrue(np.allclose(au['D'] * scale, serial['D']))
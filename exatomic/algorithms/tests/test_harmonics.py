@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Solid Harmonics
+###########################
+"""
+import numpy as np
+from unittest import TestCase
+from symengine import var, lambdify
+from exatomic.algorithms.basis import (solid_harmonics, sh_keys, sh_coefficients,
+                                       car2sph_matrix, car2sph, enum_cartesian,
+                                       gaussian_cartesian)
+from exatomic.algorithms.harmonics import evaluate_solid_harmonics
+
+
+class TestSolidHarmonics(TestCase):
+    """Compare the numerical recursions to the symbolic solid harmonics."""
+    def setUp(self):
+        rnd = np.random.RandomState(7)
+        self.x, self.y, self.z = rnd.uniform(-2, 2, (3, 50))
+        self.lmax = 5
+        self.sym = solid_harmonics(self.lmax)
+
+    def test_keys(self):
+        self.assertListEqual(sh_keys(self.lmax), list(self.sym.keys()))
+
+    def test_evaluate(self):
+        x, y, z = var('x y z')
+        sh, grad = evaluate_solid_harmonics(self.x, self.y, self.z, self.lmax,
+                                            gradient=True)
+        self.assertTrue(np.allclose(sh, evaluate_solid_harmonics(
+            self.x, self.y, self.z, self.lmax)))
+        for i, key in enumerate(sh_keys(self.lmax)):
+            expr = self.sym[key] + 0 * x
+            f = lambdify([x, y, z], [expr, expr.diff(x), expr.diff(y), expr.diff(z)])
+            ref = np.array([f(*p) for p in zip(self.x, self.y, self.z)]).T
+            self.assertTrue(np.allclose(sh[i], ref[0]))
+            self.assertTrue(np.allclose(grad[:, i], ref[1:]))
+
+    def test_coefficients(self):
+        coefs = sh_coefficients(self.lmax)
+        sh = evaluate_solid_harmonics(self.x, self.y, self.z, self.lmax)
+        n = self.lmax + 1
+        pows = [np.power.outer(c, np.arange(n)).T for c in (self.x, self.y, self.z)]
+        vals = np.einsum('iabc,ap,bp,cp->ip', coefs, *pows)
+        self.assertTrue(np.allclose(vals, sh))
+
+    def test_car2sph(self):
+        x, y, z = var('x y z')
+        for cart in (enum_cartesian, gaussian_cartesian):
+            for L in range(self.lmax + 1):
+                c2s = car2sph_matrix(L, cart)
+                self.assertIs(c2s, car2sph_matrix(L, cart))
+                for j, ml in enumerate(range(-L, L + 1)):
+                    coefs = (self.sym[(L, ml)] + 0 * x).expand().as_coefficients_dict()
+                    for i, (l, m, n) in enumerate(cart[L]):
+                        self.assertAlmostEqual(c2s[i, j], float(coefs[x**l * y**m * z**n]))
+            conv = car2sph(self.sym, cart)
+            self.assertTrue(np.allclose(conv[1], np.array(cart[1])))
+            self.assertTrue(np.allclose(conv[2], car2sph_matrix(2, cart)))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Hydrogen Bonds
+##########################
+"""
+import numpy as np
+import pandas as pd
+from itertools import product
+from unittest import TestCase
+from exatomic import Universe
+from exatomic.algorithms.hbond import hydrogen_bonds, hbond_correlation
+
+
+def _brute_force(xyz, cell, rda, rdh, angle):
+    """Reference search over all 27 periodic images."""
+    shifts = np.array(list(product([-1, 0, 1], repeat=3))).dot(cell)
+    def mic(v):
+        d = v + shifts
+        return d[np.argmin((d**2).sum(axis=1))]
+    oxygens = np.arange(0, len(xyz), 3)
+    found = set()
+    for d in oxygens:
+        for h in range(len(xyz)):
+            if h in oxygens:
+                continue
+            dh = mic(xyz[h] - xyz[d])
+            if np.linalg.norm(dh) >= rdh:
+                continue
+            for a in oxygens:
+                if a == d:
+                    continue
+                da = mic(xyz[a] - xyz[d])
+                if np.linalg.norm(da) >= rda:
+                    continue
+                ha = da - dh
+                cos = np.dot(-dh, ha) / np.linalg.norm(dh) / np.linalg.norm(ha)
+                if cos <= np.cos(np.radians(angle)):
+                    found.add((d, h, a))
+    return found
+
+
+class TestHydrogenBonds(TestCase):
+    """Random 'water' in a triclinic cell compared to a brute force search."""
+    def setUp(self):
+        np.random.seed(2)
+        self.cell = np.array([[26.0, 0.0, 0.0], [3.0, 25.0, 0.0], [2.0, -2.5, 24.0]])
+        nmol, nframes = 60, 3
+        frames = []
+        for f in range(nframes):
+            o = np.random.rand(nmol, 3).dot(self.cell)
+            u = np.random.normal(size=(nmol, 2, 3))
+            u /= np.linalg.norm(u, axis=2)[:, :, None]
+            h = o[:, None] + 1.8*u
+            frames.append(np.concatenate([o[:, None], h], axis=1).reshape(-1, 3))
+        self.xyz = np.array(frames)
+        atom = pd.DataFrame(self.xyz.reshape(-1, 3), columns=['x', 'y', 'z'])
+        atom['symbol'] = np.tile(['O', 'H', 'H'], nmol*nframes)
+        atom['frame'] = np.repeat(range(nframes), nmol*3)
+        frame = pd.DataFrame(np.tile(self.cell.ravel(), (nframes, 1)),
+                             columns=['xi', 'yi', 'zi', 'xj', 'yj', 'zj', 'xk', 'yk', 'zk'])
+        frame['atom_count'] = nmol*3
+        frame['periodic'] = True
+        self.uni = Universe(atom=atom, frame=frame)
+
+    def test_periodic(self):
+        hb, counts = hydrogen_bonds(self.uni, angle=120.0)
+        self.assertGreater(len(hb), 0)
+        for f in range(3):
+            ref = _brute_force(self.xyz[f], self.cell, 6.6, 2.3, 120.0)
+            grp = hb[hb['frame'] == f]
+            off = f*len(self.xyz[f])
+            found = set(zip(grp['donor'] - off, grp['hydrogen'] - off, grp['acceptor'] - off))
+            self.assertEqual(found, ref)
+        self.assertTrue(np.all(hb['distance'] < 6.6))
+        self.assertTrue(np.all(hb['angle'] >= 120.0))
+        self.assertTrue((counts.values == hb.groupby('frame').size().values).all())
+
+    def test_narrow_cell(self):
+        """Cutoffs beyond half the cell width are rejected."""
+        self.assertRaises(ValueError, hydrogen_bonds, self.uni, rda=13.0)
+
+    def test_free(self):
+        self.uni.frame['periodic'] = False
+        hb, counts = hydrogen_bonds(self.uni, angle=120.0)
+        ref = _brute_force(self.xyz[0], np.zeros((3, 3)), 6.6, 2.3, 120.0)
+        grp = hb[hb['frame'] == 0]
+        self.assertEqual(set(zip(grp['donor'], grp['hydrogen'], grp['acceptor'])), ref)
+
+    def test_counts(self):
+        """Frames without hydrogen bonds are counted as zero."""
+        self.uni.frame['periodic'] = False
+        self.uni.atom.loc[self.uni.atom['frame'] == 1, ['x', 'y', 'z']] *= 100.0
+        hb, counts = hydrogen_bonds(self.uni, angle=120.0)
+        self.assertEqual(counts.index.tolist(), [0, 1, 2])
+        self.assertEqual(counts[1], 0)
+        self.assertGreater(counts[0], 0)
+        self.assertEqual(counts.sum(), len(hb))
+        self.assertFalse((hb['frame'] == 1).any())
+        corr = hbond_correlation(hb, frames=counts.index.values, maxlag=1)
+        self.assertEqual(corr[0], 1.0)
+
+    def test_correlation(self):
+        hb, counts = hydrogen_bonds(self.uni, angle=120.0)
+        corr = hbond_correlation(hb, maxlag=2)
+        self.assertEqual(corr[0], 1.0)
+        self.assertEqual(len(corr), 3)
+        static = pd.concat([hb[hb['frame'] == 0].assign(frame=f) for f in range(4)])
+        self.assertTrue(np.allclose(hbond_correlation(static), 1.0))
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Molecular Integrals
+###############################
+"""
+import bz2
+import numpy as np
+from math import erf
+from os.path import abspath, join
+from unittest import TestCase
+import exatomic
+from exatomic.gaussian import Output
+from exatomic.core.basis import Overlap
+from exatomic.algorithms.basis import _vec_normalize
+from exatomic.algorithms.numerical import Shells, ShellPairs
+from exatomic.algorithms.orbital import density_from_pairs
+from exatomic.algorithms.integrals import (overlap_matrix, kinetic_matrix, multipole_matrix,
+                                           nuclear_matrix, shell_pairs, _boys)
+
+
+def make_shells(spherical=True, lmax=3):
+    """Two centers with one (two primitive) shell per L up to lmax."""
+    xyz = np.array([[0.0, 0.0, 0.0], [0.3, -0.5, 1.1]])
+    L, atom, ptr, alpha, coef, fshell, fang = [], [], [0], [], [], [], []
+    for a in range(2):
+        for l in range(lmax + 1):
+            als = np.array([2.5, 0.7]) * (1 + 0.3 * a)
+            alpha.extend(als)
+            coef.extend(np.array([0.6, 0.5]) * _vec_normalize(als, np.full(2, l)))
+            ptr.append(ptr[-1] + 2)
+            if spherical:
+                angs = [[ml, 0, 0] for ml in range(-l, l + 1)]
+            else:
+                angs = [[l - i, i - j, j] for i in range(l + 1) for j in range(i + 1)]
+            fshell.extend([len(L)] * len(angs))
+            fang.extend(angs)
+            L.append(l)
+            atom.append(a)
+    # Functions need not be sorted by shell
+    perm = np.random.RandomState(0).permutation(len(fshell))
+    return Shells(xyz[atom], atom, L, ptr, alpha, coef, spherical,
+                  np.array(fshell)[perm], np.array(fang)[perm])
+
+
+class TestOneElectron(TestCase):
+    def setUp(self):
+        r = np.linspace(-5.5, 6.5, 80)
+        x, y, z = np.meshgrid(r, r, r, indexing='ij')
+        self.x, self.y, self.z = x.ravel(), y.ravel(), z.ravel()
+        self.dv = (r[1] - r[0])**3
+
+    def test_quadrature(self):
+        for spherical in [True, False]:
+            shells = make_shells(spherical)
+            bvs = shells.evaluate(self.x, self.y, self.z)
+            smat = overlap_matrix(shells)
+            self.assertTrue(np.allclose(smat, np.dot(bvs, bvs.T) * self.dv, atol=1e-10))
+
+    def test_pairs(self):
+        shells = make_shells()
+        pairs = shell_pairs(shells)
+        self.assertEqual(len(pairs), shells.nshell * (shells.nshell + 1) // 2)
+        self.assertTrue((pairs[:, 0] >= pairs[:, 1]).all())
+        smat = overlap_matrix(shells, pairs=pairs[:1])
+        self.assertEqual((smat != 0).sum(), 1)
+
+    def test_kinetic(self):
+        for spherical in [True, False]:
+            shells = make_shells(spherical)
+            bvs, grad = shells.evaluate(self.x, self.y, self.z, gradient=True)
+            ref = 0.5 * sum(np.dot(g, g.T) for g in grad) * self.dv
+            self.assertTrue(np.allclose(kinetic_matrix(shells), ref, atol=1e-10))
+
+    def test_multipole(self):
+        shells = make_shells()
+        bvs = shells.evaluate(self.x, self.y, self.z)
+        origin = np.array([0.2, -0.3, 0.4])
+        r = [self.x - origin[0], self.y - origin[1], self.z - origin[2]]
+        dip = multipole_matrix(shells, order=1, origin=origin)
+        quad = multipole_matrix(shells, order=2, origin=origin)
+        for i in range(3):
+            self.assertTrue(np.allclose(dip[i], np.dot(bvs * r[i], bvs.T) * self.dv, atol=1e-10))
+        for k, (i, j) in enumerate([(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2)]):
+            ref = np.dot(bvs * r[i] * r[j], bvs.T) * self.dv
+            self.assertTrue(np.allclose(quad[k], ref, atol=1e-10))
+        self.assertRaises(NotImplementedError, multipole_matrix, shells, 3)
+
+    def test_nuclear(self):
+        out = np.empty((9, ))
+        for t in [0.0, 0.3, 12.0, 45.0]:
+            _boys(8, t, out)
+            ref = 0.5 * np.sqrt(np.pi / t) * erf(np.sqrt(t)) if t else 1.0
+            self.assertAlmostEqual(out[0], ref, places=14)
+            # Downward recursion F_n = (2T F_n+1 + exp(-T)) / (2n + 1)
+            self.assertTrue(np.allclose(out[:-1], (2 * t * out[1:] + np.exp(-t)) /
+                                        (2 * np.arange(8) + 1)))
+        # Closed form for s functions, one nucleus on a shell center
+        shells = make_shells(lmax=0)
+        xyz = np.array([[0.1, 0.7, -0.4], shells.center[1]])
+        charges = np.array([2.0, 1.0])
+        vmat = nuclear_matrix(shells, xyz, charges)
+        fptr, forder = shells.function_order()
+        for a in range(2):
+            for b in range(2):
+                ref = 0.0
+                for i in range(shells.ptr[a], shells.ptr[a + 1]):
+                    for j in range(shells.ptr[b], shells.ptr[b + 1]):
+                        ai, aj = shells.alpha[i], shells.alpha[j]
+                        p = ai + aj
+                        pc = (ai * shells.center[a] + aj * shells.center[b]) / p
+                        r2 = ((shells.center[a] - shells.center[b])**2).sum()
+                        for c, z in zip(xyz, charges):
+                            t = p * ((pc - c)**2).sum()
+                            f0 = 0.5 * np.sqrt(np.pi / t) * erf(np.sqrt(t)) if t else 1.0
+                            ref -= (z * shells.coef[i] * shells.coef[j] * 2 * np.pi / p *
+                                    np.exp(-ai * aj / p * r2) * f0)
+                self.assertAlmostEqual(vmat[forder[a], forder[b]], ref, places=12)
+
+    def test_screening(self):
+        shells = make_shells()
+        far = Shells(shells.center + np.array([[0.0, 0.0, 0.0]] * 4 + [[0.0, 0.0, 40.0]] * 4),
+                     shells.atom, shells.L, shells.ptr, shells.alpha, shells.coef,
+                     shells.spherical, shells.fshell, shells.fang)
+        pairs = shell_pairs(far, tol=1e-14)
+        self.assertEqual(len(pairs), 2 * 10)
+        self.assertTrue((far.atom[pairs[:, 0]] == far.atom[pairs[:, 1]]).all())
+        self.assertTrue(np.allclose(overlap_matrix(far), overlap_matrix(far, tol=None)))
+
+    def test_universe(self):
+        path = abspath(join(abspath(exatomic.__file__), "../static/gaussian/"))
+        with bz2.open(join(path, 'g09-ch3nh2-631g.out.bz2')) as f:
+            uni = Output(f.read().decode('utf-8')).to_universe()
+        nbas = len(uni.basis_set_order)
+        ovl = Overlap.from_universe(uni)
+        self.assertEqual(len(ovl), nbas * (nbas + 1) // 2)
+        self.assertTrue((ovl['chi0'] >= ovl['chi1']).all())
+        # Closed form overlaps of s functions
+        shells = Shells.from_universe(uni)
+        smat = overlap_matrix(shells)
+        fptr, forder = shells.function_order()
+        s = np.nonzero(shells.L == 0)[0]
+        ref = np.empty((len(s), len(s)))
+        for i, a in enumerate(s):
+            for j, b in enumerate(s):
+                ai = shells.alpha[shells.ptr[a]:shells.ptr[a + 1]][:, None]
+                aj = shells.alpha[shells.ptr[b]:shells.ptr[b + 1]][None, :]
+                ci = shells.coef[shells.ptr[a]:shells.ptr[a + 1]][:, None]
+                cj = shells.coef[shells.ptr[b]:shells.ptr[b + 1]][None, :]
+                r2 = ((shells.center[a] - shells.center[b])**2).sum()
+                p = ai + aj
+                ref[i, j] = (ci * cj * (np.pi / p)**1.5 * np.exp(-ai * aj / p * r2)).sum()
+        funcs = forder[fptr[s]]
+        self.assertTrue(np.allclose(smat[np.ix_(funcs, funcs)], ref))
+        # Dipole integrals for excitations
+        uni.compute_multipole()
+        self.assertEqual(len(uni.multipole), nbas * (nbas + 1) // 2)
+        dip = multipole_matrix(shells)
+        self.assertTrue(np.allclose(uni.multipole['ix3'].values,
+                                    dip[2][uni.multipole['chi0'], uni.multipole['chi1']]))
+
+
+class TestShellPairs(TestCase):
+    def setUp(self):
+        shells = make_shells()
+        self.far = Shells(shells.center + np.array([[0.0, 0.0, 0.0]] * 4 + [[0.0, 0.0, 40.0]] * 4),
+                          shells.atom, shells.L, shells.ptr, shells.alpha, shells.coef,
+                          shells.spherical, shells.fshell, shells.fang)
+
+    def test_pairs(self):
+        pairs = self.far.pairs(1e-14)
+        self.assertIs(pairs, ShellPairs.from_shells(self.far, 1e-14))
+        self.assertEqual(pairs.npair, 2 * 10)
+        self.assertAlmostEqual(pairs.fraction, 20 / 36)
+        self.assertTrue((pairs.bound >= 1e-14).all())
+        self.assertTrue((np.diff(pairs.ptr) == [1, 2, 3, 4, 1, 2, 3, 4]).all())
+        self.assertTrue((pairs.partners(6) == [4, 5, 6]).all())
+        # Without screening all pairs are kept
+        full = self.far.pairs(0.0)
+        self.assertEqual(full.npair, 36)
+        self.assertTrue(np.allclose(overlap_matrix(self.far, pairs=pairs),
+                                    overlap_matrix(self.far, pairs=full)))
+
+    def test_function_pairs(self):
+        pairs = self.far.pairs(1e-14)
+        chi0, chi1 = pairs.function_pairs()
+        self.assertTrue((chi0 >= chi1).all())
+        self.assertEqual(len(set(zip(chi0, chi1))), len(chi0))
+        # Every element of the full triangle on the same center
+        nb = np.bincount(self.far.atom[self.far.fshell])
+        self.assertEqual(len(chi0), (nb * (nb + 1) // 2).sum())
+        chi0, chi1 = self.far.pairs(0.0).function_pairs()
+        ref0, ref1 = np.tril_indices(self.far.nbas)
+        self.assertTrue((chi0 == ref0).all() and (chi1 == ref1).all())
+
+    def test_density(self):
+        pairs = self.far.pairs(1e-14)
+        cmat = np.random.RandomState(1).rand(self.far.nbas, self.far.nbas)
+        occ = np.zeros(self.far.nbas)
+        occ[:5] = 2.0
+        dmat = np.dot(cmat * occ, cmat.T)
+        chi0, chi1 = pairs.function_pairs()
+        self.assertTrue(np.allclose(density_from_pairs(cmat, occ, chi0, chi1), dmat[chi0, chi1]))
+        screened = pairs.screen(dmat)
+        self.assertTrue(np.allclose(screened, screened.T))
+        self.assertEqual((screened != 0).sum(), 2 * len(chi0) - (chi0 == chi1).sum())
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Isosurfaces and Contours
+####################################
+"""
+import numpy as np
+from unittest import TestCase
+from exatomic.core.field import AtomicField
+from exatomic.algorithms.isosurface import (marching_cubes, marching_squares,
+                                            contour_levels)
+from exatomic.algorithms.orbital_util import make_fps, numerical_grid_from_field_params
+
+
+class TestMarchingCubes(TestCase):
+    """Isosurfaces of a spherical field."""
+    def setUp(self):
+        self.fps = make_fps(rmin=-3, rmax=3, nr=41)
+        x, y, z = numerical_grid_from_field_params(self.fps)
+        self.r = np.sqrt(x**2 + y**2 + z**2)
+        self.values = np.exp(-self.r)
+        self.iso = np.exp(-1.5)
+
+    def test_sphere(self):
+        d = self.fps.loc[0, 'dxi']
+        verts, faces = marching_cubes(self.values.reshape(41, 41, 41), self.iso,
+                                      origin=(-3, -3, -3), basis=np.eye(3) * d)
+        self.assertTrue(np.allclose(np.linalg.norm(verts, axis=1), 1.5, atol=0.02))
+        # Closed and consistently oriented: every edge is shared by two faces
+        # which traverse it in opposite directions
+        edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+        uniq, cnt = np.unique(edges, axis=0, return_counts=True)
+        self.assertTrue((cnt == 1).all())
+        self.assertEqual(len(uniq), len(np.unique(np.sort(edges, axis=1), axis=0)) * 2)
+        a, b, c = verts[faces[:, 0]], verts[faces[:, 1]], verts[faces[:, 2]]
+        area = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1).sum()
+        self.assertAlmostEqual(area / (4 * np.pi * 1.5**2), 1, delta=0.01)
+
+    def test_empty(self):
+        verts, faces = marching_cubes(self.values.reshape(41, 41, 41), 10.)
+        self.assertEqual(verts.shape, (0, 3))
+        self.assertEqual(faces.shape, (0, 3))
+
+    def test_field(self):
+        fps = make_fps(rmin=-3, rmax=3, nr=41, nrfps=2)
+        field = AtomicField(fps, field_values=[self.values, -self.values])
+        (v0, f0), (v1, f1) = field.isosurfaces(0, [self.iso, -self.iso])
+        self.assertGreater(len(f0), 0)
+        self.assertEqual(len(f1), 0)
+        v2, f2 = field.isosurfaces(1, -self.iso)[0]
+        self.assertTrue(np.allclose(v0, v2))
+        quant = field.compact('int16')
+        v3, f3 = quant.isosurfaces(0, self.iso)[0]
+        self.assertTrue(np.allclose(np.linalg.norm(v3, axis=1), 1.5, atol=0.02))
+
+
+class TestMarchingSquares(TestCase):
+    """Contour lines of a radial field."""
+    def setUp(self):
+        self.ax = np.linspace(-3, 3, 61)
+        x, y = np.meshgrid(self.ax, self.ax, indexing='ij')
+        self.values = np.exp(-np.sqrt(x**2 + y**2))
+
+    def test_levels(self):
+        levels = contour_levels(3, (-2, 0))
+        self.assertTrue(np.allclose(levels, [-1, -0.1, -0.01, 0.01, 0.1, 1]))
+
+    def test_circles(self):
+        radii = np.array([2.03, 1.03, 0.53])
+        segs, ptr = marching_squares(self.values, np.exp(-radii))
+        self.assertEqual(segs.shape, (ptr[-1], 2, 2))
+        for i, r in enumerate(radii):
+            pts = segs[ptr[i]:ptr[i + 1]] * 0.1 - 3
+            self.assertGreater(len(pts), 0)
+            self.assertTrue(np.allclose(np.linalg.norm(pts, axis=2), r, atol=0.02))
+            # Closed: every end point is shared by two segments
+            uniq, cnt = np.unique(pts.reshape(-1, 2), axis=0, return_counts=True)
+            self.assertTrue((cnt == 2).all())
+        segs, ptr = marching_squares(self.values, [-1.0, 10.0])
+        self.assertEqual(len(segs), 0)
+        self.assertTrue((ptr == 0).all())
+
+    def test_field(self):
+        fps = make_fps(rmin=-3, rmax=3, nr=41)
+        x, y, z = numerical_grid_from_field_params(fps)
+        vals = np.exp(-np.sqrt(x**2 + y**2 + (z - 1)**2))
+        field = AtomicField(fps, field_values=[vals])
+        levels = np.exp(-np.array([1.5]))
+        segs, ptr = field.contours(0, levels, axis='z', value=1.0)
+        self.assertEqual(segs.shape[1:], (2, 3))
+        shape, origin, basis = field.grid(0)
+        plane = np.argmin(np.abs(origin[2] + np.arange(shape[2]) * basis[2, 2] - 1.0))
+        self.assertTrue(np.allclose(segs[..., 2], origin[2] + plane * basis[2, 2]))
+        r = np.sqrt(1.5**2 - (segs[..., 2] - 1)**2)
+        self.assertTrue(np.allclose(np.linalg.norm(segs[..., :2], axis=2), r, atol=0.02))
+        segs, ptr = field.contours(0, levels, axis='x', value=0.0)
+        x = segs[..., 0]
+        self.assertTrue(np.allclose(x, x[0, 0]))
+        r = np.linalg.norm(segs[..., 1:] - [0, 1], axis=2)
+        self.assertTrue(np.allclose(r, np.sqrt(1.5**2 - x**2), atol=0.02))
+        quant = field.compact('int16')
+        qsegs, qptr = quant.contours(0, levels, axis='x')
+        self.assertTrue(np.array_equal(ptr, qptr))
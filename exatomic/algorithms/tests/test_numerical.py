@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Numerical Basis Functions
+#####################################
+"""
+import os
+import bz2
+import tempfile
+import numpy as np
+import pandas as pd
+from os.path import abspath, join
+from unittest import TestCase
+import exatomic
+from exatomic.gaussian import Output
+from exatomic.core.basis import BasisSetOrder
+from exatomic.algorithms.basis import enum_cartesian, CartesianBasisFunction
+from exatomic.algorithms.numerical import Shells, BasisCache, evaluate_basis, point_blocks
+from exatomic.algorithms.orbital_util import (gen_bfns, _evaluate_symbolic, make_fps,
+                                              numerical_grid_from_field_params)
+
+
+class TestNumericalBasis(TestCase):
+    """Compare numerical evaluation to the symbolic basis functions."""
+    def setUp(self):
+        path = abspath(join(abspath(exatomic.__file__), "../static/gaussian/"))
+        with bz2.open(join(path, 'g09-ch3nh2-augccpvdz.out.bz2')) as f:
+            self.uni = Output(f.read().decode('utf-8')).to_universe()
+        fps = make_fps(rmin=-4, rmax=4, nr=9)
+        self.x, self.y, self.z = numerical_grid_from_field_params(fps)
+
+    def test_shells(self):
+        shells = Shells.from_universe(self.uni)
+        self.assertEqual(shells.nbas, len(self.uni.basis_set_order))
+        self.assertEqual(shells.lmax, 2)
+        self.assertEqual(shells.ptr[-1], len(shells.alpha))
+
+    def test_gradient(self):
+        for cartesian in [False, True]:
+            bfns = self._cartesian() if cartesian else gen_bfns(self.uni)
+            bvs, grad = evaluate_basis(self.uni, self.x, self.y, self.z, gradient=True)
+            self.assertTrue(np.allclose(bvs, evaluate_basis(self.uni, self.x, self.y, self.z)))
+            for i, cart in enumerate(['x', 'y', 'z']):
+                ref = _evaluate_symbolic([bas.gradient(cart=cart) for bas in bfns],
+                                         self.x, self.y, self.z)
+                self.assertTrue(np.allclose(grad[i], ref, rtol=1e-10, atol=1e-12))
+
+    def test_spherical(self):
+        ref = _evaluate_symbolic(gen_bfns(self.uni), self.x, self.y, self.z)
+        bvs = evaluate_basis(self.uni, self.x, self.y, self.z)
+        self.assertTrue(np.allclose(bvs, ref, rtol=1e-10, atol=1e-12))
+
+    def _cartesian(self):
+        """Replace the basis set order by Cartesian functions."""
+        order = self.uni.basis_set_order.drop_duplicates(['center', 'L', 'shell'])
+        atom = self.uni.atom
+        bs = self.uni.basis_set
+        rows, bfns = [], []
+        for center, L, shell in zip(order['center'], order['L'].astype(int), order['shell']):
+            prims = bs[(bs['set'] == atom['set'][center]) & (bs['L'] == L) & (bs['shell'] == shell)]
+            for l, m, n in enum_cartesian[L]:
+                rows.append((center, L, shell, l, m, n, 0))
+                bfns.append(CartesianBasisFunction(atom['x'][center], atom['y'][center],
+                                                   atom['z'][center], prims['Nd'],
+                                                   prims['alpha'], l, m, n))
+        cols = ['center', 'L', 'shell', 'l', 'm', 'n', 'frame']
+        self.uni.basis_set_order = BasisSetOrder(pd.DataFrame(rows, columns=cols))
+        self.uni.basis_set.spherical = False
+        return bfns
+
+    def test_cartesian(self):
+        bfns = self._cartesian()
+        ref = _evaluate_symbolic(bfns, self.x, self.y, self.z)
+        bvs = evaluate_basis(self.uni, self.x, self.y, self.z)
+        self.assertEqual(bvs.shape[0], len(bfns))
+        self.assertTrue(np.allclose(bvs, ref, rtol=1e-10, atol=1e-12))
+
+    def test_blocks(self):
+        fps = make_fps(rmin=-15, rmax=15, nr=24)
+        x, y, z = numerical_grid_from_field_params(fps)
+        perm, bptr, lo, hi = point_blocks(x, y, z, npb=64)
+        self.assertTrue(np.array_equal(np.sort(perm), np.arange(len(x))))
+        self.assertTrue(np.all(x[perm][bptr[0]:bptr[1]] <= hi[0, 0]))
+        shells = Shells.from_universe(self.uni)
+        dense = shells.evaluate(x, y, z)
+        blocks = shells.evaluate_blocks(x, y, z, tol=1e-8, npb=64)
+        self.assertLess(blocks.fraction, 0.8)
+        self.assertTrue(np.allclose(blocks.todense(), dense, rtol=0, atol=1e-8))
+        cmat = np.random.rand(shells.nbas, 3)
+        self.assertTrue(np.allclose(blocks.contract(cmat), np.dot(cmat.T, dense), rtol=0, atol=1e-6))
+
+    def test_contract(self):
+        fps = make_fps(rmin=-10, rmax=10, nr=20)
+        x, y, z = numerical_grid_from_field_params(fps)
+        shells = Shells.from_universe(self.uni)
+        dense = shells.evaluate(x, y, z)
+        cmat = np.random.rand(shells.nbas, 4)
+        ref = np.dot(cmat.T, dense)
+        for threads in [1, 2]:
+            mos = shells.contract(x, y, z, cmat, tol=1e-12, chunk=1000, threads=threads)
+            self.assertTrue(np.allclose(mos, ref, rtol=0, atol=1e-8))
+
+    def test_density(self):
+        occ = np.array([2.0, 2.0, 1.0, 0.5])
+        h = 1e-5
+        for cartesian in [False, True]:
+            if cartesian:
+                self._cartesian()
+            shells = Shells.from_universe(self.uni)
+            cmat = np.random.rand(shells.nbas, 4) - 0.5
+            ref = np.dot(occ, np.dot(cmat.T, shells.evaluate(self.x, self.y, self.z))**2)
+            rho, grad = shells.density(self.x, self.y, self.z, cmat=cmat, occupation=occ,
+                                       gradient=True, tol=1e-14, chunk=200)
+            self.assertTrue(np.allclose(rho, ref, rtol=0, atol=1e-10))
+            for i, d in enumerate(np.eye(3) * h):
+                fwd = shells.density(self.x + d[0], self.y + d[1], self.z + d[2],
+                                     cmat=cmat, occupation=occ, tol=1e-14)
+                bwd = shells.density(self.x - d[0], self.y - d[1], self.z - d[2],
+                                     cmat=cmat, occupation=occ, tol=1e-14)
+                self.assertTrue(np.allclose(grad[i], (fwd - bwd) / (2 * h), rtol=0, atol=1e-6))
+            dmat = np.dot(cmat * occ, cmat.T)
+            rho2, grad2 = shells.density(self.x, self.y, self.z, dmat=dmat,
+                                         gradient=True, tol=1e-14, chunk=200)
+            self.assertTrue(np.allclose(rho2, rho, rtol=0, atol=1e-10))
+            self.assertTrue(np.allclose(grad2, grad, rtol=0, atol=1e-10))
+            bvs, gvs = shells.evaluate(self.x, self.y, self.z, gradient=True)
+            ref = 0.5 * sum(np.dot(occ, np.dot(cmat.T, gvs[i])**2) for i in range(3))
+            tau = shells.density(self.x, self.y, self.z, cmat=cmat, occupation=occ,
+                                 kinetic=True, tol=1e-14)[1]
+            tau2 = shells.density(self.x, self.y, self.z, dmat=dmat, kinetic=True, tol=1e-14)[1]
+            self.assertTrue(np.allclose(tau, ref, rtol=0, atol=1e-10))
+            self.assertTrue(np.allclose(tau2, ref, rtol=0, atol=1e-10))
+
+    def test_current_density(self):
+        shells = Shells.from_universe(self.uni)
+        cmatr = np.random.rand(shells.nbas, 5) - 0.5
+        cmati = np.random.rand(shells.nbas, 5) - 0.5
+        occ = np.array([2.0, 2.0, 1.0, 1.0, 0.0])
+        h = 1e-5
+        bvs = shells.evaluate(self.x, self.y, self.z)
+        cur = shells.current_density(self.x, self.y, self.z, cmatr, cmati, occ,
+                                     tol=1e-14, chunk=200)
+        # j = -sum_i n_i (Re(psi_i) grad Im(psi_i) - Im(psi_i) grad Re(psi_i)) with psi = C^T chi
+        re = np.dot(cmatr.T, bvs)
+        im = np.dot(cmati.T, bvs)
+        for i, d in enumerate(np.eye(3) * h):
+            gvs = (shells.evaluate(self.x + d[0], self.y + d[1], self.z + d[2]) -
+                   shells.evaluate(self.x - d[0], self.y - d[1], self.z - d[2])) / (2 * h)
+            ref = -np.dot(occ, re * np.dot(cmati.T, gvs) - im * np.dot(cmatr.T, gvs))
+            self.assertTrue(np.allclose(cur[i], ref, rtol=0, atol=1e-7))
+
+    def test_cache(self):
+        shells = Shells.from_universe(self.uni)
+        cmat = np.random.rand(shells.nbas, 3)
+        ref = shells.contract(self.x, self.y, self.z, cmat, cache=None)
+        scratch = tempfile.mkdtemp()
+        for cache in [BasisCache(), BasisCache(scratch=scratch)]:
+            mos = shells.contract(self.x, self.y, self.z, cmat, cache=cache)
+            self.assertTrue(np.allclose(mos, ref))
+            self.assertEqual(len(cache), 1)
+            blocks = cache.blocks(shells, self.x, self.y, self.z)
+            self.assertIs(blocks, cache.blocks(shells, self.x, self.y, self.z))
+            # Gradient entries also serve plain values
+            rho, grad = shells.density(self.x, self.y, self.z, cmat=cmat, occupation=np.ones(3),
+                                       gradient=True, cache=cache)
+            self.assertEqual(len(cache), 2)
+            rho2, grad2 = shells.density(self.x, self.y, self.z, cmat=cmat, occupation=np.ones(3),
+                                         gradient=True, cache=None)
+            self.assertTrue(np.allclose(grad, grad2))
+            # Least recently used entries are evicted to stay within budget
+            cache.maxbytes = cache.nbytes - 1
+            shells.contract(self.x + 1, self.y, self.z, cmat, cache=cache)
+            self.assertLessEqual(cache.nbytes, cache.maxbytes)
+            cache.clear()
+            self.assertEqual(len(cache), 0)
+            self.assertIsNone(cache.get(shells, self.x, self.y, self.z))
+        self.assertEqual(os.listdir(scratch), [])
+        # Values that do not fit are evaluated chunk by chunk
+        small = BasisCache(maxbytes=0)
+        mos = shells.contract(self.x, self.y, self.z, cmat, cache=small)
+        self.assertTrue(np.allclose(mos, ref))
+        self.assertEqual(len(small), 0)
+        os.rmdir(scratch)
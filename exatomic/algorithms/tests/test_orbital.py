@@ -4,10 +4,19 @@
 """
 Tests for building molecular orbitals
 """
+import os
+import bz2
+import tempfile
 import numpy as np
 import pandas as pd
+from os.path import abspath, join
 from unittest import TestCase
+import exatomic
+from exatomic.gaussian import Output
 from exatomic.algorithms.basis import clean_sh, solid_harmonics
+from exatomic.algorithms.orbital import (add_molecular_orbitals, add_trajectory_orbitals,
+                                         add_orb_ang_mom_jit, add_orb_ang_mom_numexpr)
+from exatomic.algorithms.orbital_util import _compute_orb_ang_mom
 # from exatomic.algorithms.orbital import (_make_fps #, _atompos, _sphr_prefac,
 #                                          )#_cart_prefac, gen_basfn)
 #
@@ -151,3 +160,59 @@ from exatomic.algorithms.basis import clean_sh, solid_harmonics
 #         self.assertEqual(gen_basfn([''], self.contdf, self.atom['r2'], precision=2),
 #                          '(1.00*exp(-1.00*(x**2+y**2+z**2))+'
 #                           '4.00*exp(-2.00*(x**2+y**2+z**2)))')
+
+
+class TestTrajectoryOrbitals(TestCase):
+    """Orbitals of several frames of a (fake) trajectory."""
+    def setUp(self):
+        path = abspath(join(abspath(exatomic.__file__), "../static/gaussian/"))
+        with bz2.open(join(path, 'g09-ch3nh2-631g.out.bz2')) as f:
+            self.uni = Output(f.read().decode('utf-8')).to_universe()
+        atom = self.uni.atom.copy()
+        atom['frame'] = atom['frame'].astype(np.int64)
+        atoms = []
+        for frame in range(3):
+            atom = atom.copy()
+            atom['x'] += 0.2
+            atom['frame'] = frame
+            atoms.append(atom)
+        self.uni.atom = pd.concat(atoms, ignore_index=True)
+        self.uni.frame = pd.DataFrame.from_dict({'atom_count': [len(atom)] * 3})
+        self.fps = {'rmin': -4, 'rmax': 4, 'nr': 11}
+
+    def test_trajectory(self):
+        field = add_trajectory_orbitals(self.uni, field_params=self.fps, vector=[7, 8],
+                                        inplace=False, processes=1)
+        self.assertEqual(len(field), 6)
+        self.assertEqual(list(field['frame'].astype(np.int64)), [0, 0, 1, 1, 2, 2])
+        path = join(tempfile.mkdtemp(), 'orbs.npy')
+        streamed = add_trajectory_orbitals(self.uni, field_params=self.fps, vector=[7, 8],
+                                           inplace=False, processes=2, path=path)
+        self.assertEqual(np.load(path).shape, (3, 2, 11**3))
+        for frame in range(3):
+            ref = add_molecular_orbitals(self.uni, field_params=self.fps, vector=[7, 8],
+                                         frame=frame, inplace=False)
+            self.assertEqual(list(ref['frame'].astype(np.int64)), [frame, frame])
+            for i in range(2):
+                self.assertTrue(np.allclose(field.field_values[2*frame + i], ref.field_values[i]))
+                self.assertTrue(np.allclose(streamed.field_values[2*frame + i], ref.field_values[i]))
+        self.assertFalse(np.allclose(field.field_values[0], field.field_values[2]))
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+class TestOrbAngMom(TestCase):
+    def test_maxes(self):
+        """Component i is sum_k maxes[k, i] (r x j)_k."""
+        r = np.random.rand(3, 20) - 0.5
+        j = np.random.rand(3, 20) - 0.5
+        maxes = np.array([[0.0, 1.0, 0.0], [0.6, 0.0, 0.8], [0.8, 0.0, -0.6]])
+        ang = _compute_orb_ang_mom(r[0], r[1], r[2], j[0], j[1], j[2], maxes)
+        ref = np.dot(maxes.T, np.cross(r.T, j.T).T)
+        self.assertTrue(np.allclose(ang[:3], ref))
+        self.assertTrue(np.allclose(ang[3], ref.sum(axis=0)))
+
+    def test_deprecated(self):
+        for func in [add_orb_ang_mom_jit, add_orb_ang_mom_numexpr]:
+            with self.assertWarns(DeprecationWarning):
+                self.assertRaises(AttributeError, func, None)
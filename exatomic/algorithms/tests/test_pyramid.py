@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Multi-resolution Fields
+###################################
+"""
+import numpy as np
+from unittest import TestCase
+from exatomic.algorithms.pyramid import pyramid
+
+
+class TestPyramid(TestCase):
+    """Levels are block averages of the fine grid values."""
+    def setUp(self):
+        self.shape = (9, 8, 5)
+        self.values = np.random.RandomState(5).normal(size=(2, 360))
+
+    def test_levels(self):
+        levels = pyramid(self.values, self.shape, 3)
+        self.assertListEqual([shape for vals, shape in levels],
+                             [(5, 4, 3), (3, 2, 2), (2, 1, 1)])
+        fine = self.values.reshape((2, ) + self.shape)
+        for n, (vals, shape) in enumerate(levels, 1):
+            f = 2**n
+            self.assertEqual(vals.shape, (2, np.prod(shape)))
+            vals = vals.reshape((2, ) + shape)
+            for i, j, k in [(0, 0, 0), (shape[0] - 1, shape[1] - 1, shape[2] - 1)]:
+                block = fine[:, f * i:f * (i + 1), f * j:f * (j + 1), f * k:f * (k + 1)]
+                self.assertTrue(np.allclose(vals[:, i, j, k], block.mean(axis=(1, 2, 3))))
+
+    def test_dtype(self):
+        vals, shape = pyramid(self.values.astype(np.float32), self.shape, 1)[0]
+        ref, shape = pyramid(self.values, self.shape, 1)[0]
+        self.assertTrue(np.allclose(vals, ref, atol=1e-6))
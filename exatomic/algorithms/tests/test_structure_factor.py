@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Tests for Static Structure Factor
+###################################
+"""
+import numpy as np
+import pandas as pd
+from itertools import product
+from unittest import TestCase
+from exatomic import Universe
+from exatomic.core.error import PeriodicUniverseError
+from exatomic.algorithms.structure_factor import structure_factor, rdf_structure_factor
+
+
+class TestStructureFactor(TestCase):
+    """Random periodic system compared to a direct sum."""
+    def setUp(self):
+        np.random.seed(4)
+        self.cell = np.array([[10.0, 0.0, 0.0], [1.0, 11.0, 0.0], [0.0, 0.0, 9.0]])
+        nat, nframes = 20, 2
+        self.xyz = np.random.rand(nframes, nat, 3).dot(self.cell)
+        atom = pd.DataFrame(self.xyz.reshape(-1, 3), columns=['x', 'y', 'z'])
+        atom['symbol'] = np.tile(['Ar'] * 10 + ['Kr'] * 10, nframes)
+        atom['frame'] = np.repeat(range(nframes), nat)
+        frame = pd.DataFrame(np.tile(self.cell.ravel(), (nframes, 1)),
+                             columns=['xi', 'yi', 'zi', 'xj', 'yj', 'zj', 'xk', 'yk', 'zk'])
+        frame['atom_count'] = nat
+        frame['periodic'] = True
+        self.uni = Universe(atom=atom, frame=frame)
+
+    def _direct(self, qmax, dq, sel):
+        """Average of |rho(k)|^2/N over all k in each bin (both half spaces)."""
+        recip = 2*np.pi*np.linalg.inv(self.cell).T
+        ms = np.array(list(product(range(-4, 5), repeat=3)))
+        ks = ms.dot(recip)
+        qs = np.linalg.norm(ks, axis=1)
+        ks, qs = ks[(qs > 0) & (qs < qmax)], qs[(qs > 0) & (qs < qmax)]
+        bins = (qs / dq).astype(int)
+        out = {}
+        for i in np.unique(bins):
+            vals = []
+            for f in range(2):
+                rho = np.exp(1j*self.xyz[f, sel].dot(ks[bins == i].T)).sum(axis=0)
+                vals.append(np.abs(rho)**2 / sel.sum())
+            out[(i + 0.5)*dq] = np.concatenate(vals).mean()
+        return pd.Series(out)
+
+    def test_reciprocal_sum(self):
+        sq = structure_factor(self.uni, qmax=2.0, dq=0.1)
+        ref = self._direct(2.0, 0.1, np.ones(20, dtype=bool))
+        self.assertTrue(np.allclose(sq.index, ref.index))
+        self.assertTrue(np.allclose(sq.values, ref.values))
+        partial = structure_factor(self.uni, qmax=2.0, dq=0.1, a='Kr')
+        ref = self._direct(2.0, 0.1, np.arange(20) >= 10)
+        self.assertTrue(np.allclose(partial.values, ref.values))
+
+    def test_free(self):
+        self.uni.frame['periodic'] = False
+        with self.assertRaises(PeriodicUniverseError):
+            structure_factor(self.uni)
+
+    def test_rdf(self):
+        r = np.linspace(0.0, 20.0, 20001)
+        q = np.linspace(0.5, 5.0, 10)
+        self.assertTrue(np.allclose(rdf_structure_factor(r, np.ones_like(r), 0.1, q), 1.0))
+        # Hard core of radius 1: S(q) = 1 - 4 pi rho (sin(q) - q cos(q))/q^3
+        g = (r > 1.0).astype(float)
+        ref = 1 - 4*np.pi*0.01*(np.sin(q) - q*np.cos(q))/q**3
+        self.assertTrue(np.allclose(rdf_structure_factor(r, g, 0.01, q), ref, atol=1e-4))
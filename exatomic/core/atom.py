@@ -125,6 +125,29 @@ class Atom(DataFrame):
             t += 1
         return ret
 
+    def trajectory_array(self, columns=('x', 'y', 'z')):
+        """
+        Return per frame atomic data as a single (nframes, natoms, ncolumns)
+        array.
+
+        Atoms are assumed to appear in the same order in every frame (as
+        is typical for molecular dynamics trajectories).
+
+        Args:
+            columns (iter): Columns to pack (default positions)
+
+        Returns:
+            arr (:class:`~numpy.ndarray`): Array of shape (nframes, natoms, ncolumns)
+        """
+        frame = self['frame'].astype(np.int64).values
+        order = np.argsort(frame, kind='mergesort')
+        counts = np.bincount(frame[order] - frame[order][0])
+        counts = counts[counts > 0]
+        if not np.all(counts == counts[0]):
+            raise ValueError("Number of atoms varies between frames")
+        values = self[list(columns)].values.astype(np.float64)[order]
+        return values.reshape(len(counts), counts[0], len(columns))
+
     def get_element_masses(self):
         """Compute and return element masses from symbols."""
         return self['symbol'].astype('O').map(sym2mass)
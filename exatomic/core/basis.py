@@ -15,12 +15,15 @@ See Also:
 """
 import pandas as pd
 import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
 from exa import DataFrame
 from exatomic.algorithms.basis import (enum_cartesian, gaussian_cartesian,
                                        cart_lml_count, spher_lml_count,
                                        _vec_normalize, _wrap_overlap, lorder,
                                        _vec_sto_normalize, _ovl_indices,
-                                       solid_harmonics, car2sph)
+                                       car2sph)
+from exatomic.algorithms.numerical import Shells
+from exatomic.algorithms.integrals import overlap_matrix, lower_triangle
 
 
 # Abbreviations
@@ -237,21 +240,24 @@ class Overlap(DataFrame):
                                            'frame': 0}))
 
     @classmethod
-    def from_square(cls, df):
-        ndim = df.shape[0]
+    def from_square(cls, df, frame=0):
         try: arr = df.values
         except: arr = df
-        arlen = ndim * (ndim + 1) // 2
-        ret = np.empty((arlen,), dtype=[('chi0', 'i8'),
-                                        ('chi1', 'i8'),
-                                        ('coef', 'f8'),
-                                        ('frame', 'i8')])
-        cnt = 0
-        for i in range(ndim):
-            for j in range(i + 1):
-                ret[cnt] = (i, j, arr[i, j], 0)
-                cnt += 1
-        return cls(ret)
+        return cls(lower_triangle(np.asarray(arr)[None], ['coef'], frame))
+
+    @classmethod
+    def from_universe(cls, uni, frame=None):
+        """
+        Compute the overlap matrix of the contracted basis functions of a
+        universe (see :func:`~exatomic.algorithms.integrals.overlap_matrix`).
+
+        Args:
+            uni (:class:`~exatomic.core.universe.Universe`): Universe with basis set information
+            frame (int): Frame of atomic positions (default last frame)
+        """
+        frame = uni.atom.nframes - 1 if frame is None else frame
+        shells = Shells.from_universe(uni, frame=frame)
+        return cls.from_square(overlap_matrix(shells), frame=frame)
 
 
 # NPrim dimensions
@@ -303,76 +309,143 @@ class Primitive(DataFrame):
                                   'coef': ovl, 'frame': 0})
 
     @classmethod
-    def from_universe(cls, uni, grpby='L', frame=None, debug=True):
+    def from_universe(cls, uni, grpby='L', frame=None, debug=True, sparse=False):
         """
         Generate the DF and associated contraction matrices. Currently
         spits out the Primitive dataframe along with cartesian to spherical
         and contraction matrices, as this class will disappear in an appropriate
         implementation.
 
+        Both matrices are block diagonal; offsets of the blocks are computed
+        from the number of primitives and contractions per (atom, shell group)
+        with cumulative sums and the matrices are assembled as CSR matrices.
+
         Args
             uni (exatomic.container.Universe): a universe with basis set
             grpby (str): one of 'L' or 'shell' for different basis sets
             frame (int): always blue?
+            sparse (bool): return scipy.sparse CSR matrices instead of dataframes
+
+        Raises
+            ValueError: If the basis set contains functions beyond h (L > 5)
         """
         frame = uni.atom.nframes - 1 if frame is None else frame
         uni.basis_set._set_categories()
-        sh = solid_harmonics(uni.basis_set.lmax)
+        lmax = uni.basis_set.lmax
         uni.basis_set._revert_categories()
-        sets = uni.basis_set.cardinal_groupby().get_group(frame).groupby('set')
-        funcs = uni.basis_set_order.cardinal_groupby().get_group(frame).groupby('center')
+        bs = uni.basis_set.cardinal_groupby().get_group(frame)
+        order = uni.basis_set_order.cardinal_groupby().get_group(frame)
         atom = uni.atom.cardinal_groupby().get_group(frame)
         cart = gaussian_cartesian if uni.meta['program'] == 'gaussian' else enum_cartesian
-        conv = car2sph(sh, cart)
-
-        cprim = uni.atom.set.map(uni.basis_set.primitives(cart_lml_count)).sum()
-        sprim = uni.atom.set.map(uni.basis_set.primitives(spher_lml_count)).sum()
-        ncont = len(uni.basis_set_order.index)
-        if uni.basis_set.spherical:
-            contdim = sprim
-            lml_count = spher_lml_count
-        else:
-            contdim = cprim
-            lml_count = cart_lml_count
-
-        cols = ['xa', 'ya', 'za', 'alpha', 'N', 'l', 'm', 'n', 'L', 'set']
-        typs = ['f8', 'f8', 'f8', 'f8', 'f8', 'i8', 'i8', 'i8', 'i8', 'i8']
-        primdf = np.empty((cprim,), dtype=[(i, j) for i, j in zip(cols, typs)])
-        sphrdf = np.zeros((cprim, sprim), dtype=np.float64)
-        contdf = np.zeros((contdim, ncont), dtype=np.float64)
-
+        conv = car2sph(lmax, cart)
+        if lmax not in conv:
+            raise ValueError("Basis functions with L > {} are not supported".format(max(conv)))
+        lml_count = spher_lml_count if uni.basis_set.spherical else cart_lml_count
+        # Unique contractions (one per set and group) and their primitives
+        grps = _contraction_groups(bs, grpby, cart)
+        gL, pdim = grps['L'], grps['pdim']
+        # (atom, group) entries in order of atoms and group keys
+        ent = np.unique(np.stack([order['center'].astype(np.int64).values,
+                                  order[grpby].astype(np.int64).values], axis=1), axis=0)
+        sets = atom['set'].astype(np.int64).values[ent[:, 0]]
+        code = sets * grps['nkey'] + ent[:, 1]
+        pos = np.minimum(np.searchsorted(grps['code'], code), len(grps['code']) - 1)
+        found = grps['code'][pos] == code
+        ent, sets, eg = ent[found], sets[found], pos[found]
+        eL = gL[eg]
+        ncart = np.array([cart_lml_count[L] for L in range(lmax + 1)])[eL]
+        nsph = np.array([spher_lml_count[L] for L in range(lmax + 1)])[eL]
+        nlml = np.array([lml_count[L] for L in range(lmax + 1)])[eL]
+        # Primitive table: group templates repeated for each atom
+        nprim = ncart * pdim[eg]
+        idx = _ranges(grps['tptr'][eg], nprim)
+        xyz = atom[['x', 'y', 'z']].values.astype(np.float64)[np.repeat(ent[:, 0], nprim)]
+        primdf = pd.DataFrame.from_dict({'xa': xyz[:, 0], 'ya': xyz[:, 1], 'za': xyz[:, 2],
+                                         'alpha': grps['alpha'][idx], 'N': grps['N'][idx],
+                                         'l': grps['l'][idx], 'm': grps['m'][idx],
+                                         'n': grps['n'][idx], 'L': np.repeat(eL, nprim),
+                                         'set': np.repeat(sets, nprim)})
+        cprim = nprim.sum()
+        sprim = (nsph * pdim[eg]).sum()
+        contdim = sprim if uni.basis_set.spherical else cprim
+        ncont = len(order.index)
+        # Cartesian to spherical: one block per primitive of each entry
+        ls = sorted(conv)
+        mats = [coo_matrix(conv[L]) for L in ls]
+        lidx = np.full((lmax + 1, ), -1, dtype=np.int64)
+        lidx[ls] = np.arange(len(ls))
+        sphrdf = _block_diagonal(lidx[np.repeat(eL, pdim[eg])], mats, (cprim, sprim))
+        # Contraction: one block per angular function of each entry
+        mats = [coo_matrix(chnk) for chnk in grps['chnk']]
+        contdf = _block_diagonal(np.repeat(eg, nlml), mats, (contdim, ncont))
         if debug:
             print('Overlap grouping by', grpby)
             print('{} cprims, {} sprims, {} ncont'.format(cprim, sprim, ncont))
+        primdf = cls(primdf[cls._columns])
+        if sparse:
+            return primdf, sphrdf, contdf
+        return primdf, pd.DataFrame(sphrdf.toarray()), pd.DataFrame(contdf.toarray())
+
+
+def _ranges(starts, counts):
+    """Concatenation of the ranges start, start + 1, ..., start + count - 1."""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+
 
-        pcnt, ridx, cidx, pidx, sidx = 0, 0, 0, 0, 0
-        for i, (seht, x, y, z) in enumerate(zip(atom['set'], atom['x'],
-                                                atom['y'], atom['z'])):
-            setdf = sets.get_group(seht).groupby(grpby)
-            aobas = funcs.get_group(i).groupby(grpby)
-            for idx, contsh in aobas:
-                if not len(contsh.index): continue
-                try: sh = setdf.get_group(idx)
-                except: continue
-                L = idx if grpby == 'L' else sh['L'].values[0]
-                chnk = sh.pivot('alpha', 'shell', 'd').loc[sh.alpha.unique()].fillna(0.0)
-                sh = sh.drop_duplicates('alpha')
-                pdim, cdim = chnk.shape
-                # Minimum primitive information
-                for l, m, n in cart[L]:
-                    for alpha, N in zip(sh.alpha, sh.N):
-                        primdf[pcnt] = (x, y, z, alpha, N, l, m, n, L, seht)
-                        pcnt += 1
-                # Cartesian to spherical prim
-                c2s = conv[L]
-                cplus, splus = c2s.shape
-                for j in range(pdim):
-                    sphrdf[pidx:pidx + cplus,sidx:sidx + splus] = c2s
-                    pidx += cplus
-                    sidx += splus
-                # Spherical primitive to contracted
-                for k in range(lml_count[L]):
-                    contdf[ridx:ridx + pdim,cidx:cidx + cdim] = chnk.values
-                    cidx += cdim
-                    ridx += pdim
-        return cls(primdf, columns=cols), pd.DataFrame(sphrdf), pd.DataFrame(contdf)
+def _block_diagonal(btype, mats, shape):
+    """
+    CSR matrix of blocks placed one after the other along the diagonal; block
+    i is the (COO) matrix mats[btype[i]].
+    """
+    rdim = np.array([m.shape[0] for m in mats], dtype=np.int64)[btype]
+    cdim = np.array([m.shape[1] for m in mats], dtype=np.int64)[btype]
+    nnz = np.array([m.nnz for m in mats], dtype=np.int64)
+    tptr = np.append(0, np.cumsum(nnz))
+    rows = np.concatenate([m.row for m in mats] + [[]]).astype(np.int64)
+    cols = np.concatenate([m.col for m in mats] + [[]]).astype(np.int64)
+    vals = np.concatenate([m.data for m in mats] + [[]]).astype(np.float64)
+    idx = _ranges(tptr[btype], nnz[btype])
+    roff = np.repeat(np.cumsum(rdim) - rdim, nnz[btype])
+    coff = np.repeat(np.cumsum(cdim) - cdim, nnz[btype])
+    return csr_matrix((vals[idx], (rows[idx] + roff, cols[idx] + coff)),
+                      shape=shape)
+
+
+def _contraction_groups(bs, grpby, cart):
+    """
+    Unique contractions of a basis set, grouped by set and grpby ('L' or
+    'shell'): the unique exponents (in order of appearance), contraction
+    coefficients (exponents by shells) and the template rows of the primitive
+    table (Cartesian components by exponents).
+    """
+    bset = bs['set'].astype(np.int64).values
+    bkey = bs[grpby].astype(np.int64).values
+    nkey = bkey.max() + 1
+    codes, inv = np.unique(bset * nkey + bkey, return_inverse=True)
+    L, pdim, cdim, chnks = [], [], [], []
+    alpha, N, l, m, n = [], [], [], [], []
+    for g in range(len(codes)):
+        sh = bs[inv == g]
+        ai, alphas = pd.factorize(sh['alpha'])
+        si, shells = pd.factorize(sh['shell'], sort=True)
+        chnk = np.zeros((len(alphas), len(shells)), dtype=np.float64)
+        chnk[ai, si] = sh['d'].values
+        norms = sh['N'].values[np.unique(ai, return_index=True)[1]]
+        lval = int(sh['L'].values[0])
+        lmn = np.array(cart[lval], dtype=np.int64)
+        L.append(lval)
+        pdim.append(len(alphas))
+        cdim.append(len(shells))
+        chnks.append(chnk)
+        alpha.append(np.tile(np.asarray(alphas, dtype=np.float64), len(lmn)))
+        N.append(np.tile(norms, len(lmn)))
+        l.append(np.repeat(lmn[:, 0], len(alphas)))
+        m.append(np.repeat(lmn[:, 1], len(alphas)))
+        n.append(np.repeat(lmn[:, 2], len(alphas)))
+    tptr = np.append(0, np.cumsum([len(a) for a in alpha]))
+    return {'code': codes, 'nkey': nkey, 'L': np.array(L, dtype=np.int64),
+            'pdim': np.array(pdim, dtype=np.int64),
+            'cdim': np.array(cdim, dtype=np.int64), 'chnk': chnks,
+            'tptr': tptr, 'alpha': np.concatenate(alpha), 'N': np.concatenate(N),
+            'l': np.concatenate(l), 'm': np.concatenate(m), 'n': np.concatenate(n)}
@@ -8,10 +8,130 @@ Essentially a :class:`~exa.numerical.Field3D` used for storing cube file data
 (see :mod:`~exatomic.filetypes.cube`). Cube files values are written in a
 csv-like structure with the outer loop going over the x dimension, the middle
 loop going over the y dimension, and the inner loop going over the z dimension.
+
+Field values of equally sized fields are stored in a single contiguous
+(nfields, npts) array (which may be a memory map); ``field_values[i]`` is a
+:class:`~exa.core.numerical.Series` view of row i (no copy).
+
+.. code-block:: Python
+
+    field.field_array                       # (nfields, npts) array
+    field.field_values[0]                   # Series view of the first field
+    field.field_array[0].reshape(nx, ny, nz)
+
+Large fields can be stored compactly, either as float32 or quantized to int16
+(with a per-field scale), and written to compressed (chunked) HDF5 files.
+
+.. code-block:: Python
+
+    small = field.compact('int16')          # or AtomicField(..., dtype='int16')
+    small.integrate()                       # Works on the compact values
+    small.to_hdf('orbitals.hdf5')
+    field = AtomicField.from_hdf('orbitals.hdf5')
+
+Field algebra works on all fields at once: overlaps of all pairs of fields
+and linear combinations are (BLAS) matrix products of the stacked values and
+element-wise operations are evaluated with (multithreaded) numexpr.
+
+.. code-block:: Python
+
+    S = field.overlap(other)                # (nfields, other.nfields) overlap matrix
+    diff = field.subtract(other)            # Element-wise, field by field
+    mixed = field.combine(np.array([[1, 1], [1, -1]]) / np.sqrt(2))
 """
 import numpy as np
 import pandas as pd
+from numexpr import evaluate
 from exa import DataFrame, Field, Series
+from exa.core.numerical import check_key
+from exatomic.algorithms.isosurface import marching_cubes, marching_squares
+from exatomic.algorithms.pyramid import pyramid
+
+
+_int16_max = np.iinfo(np.int16).max
+
+
+def _quantize(arr):
+    """Quantize (nfields, npts) values to int16 with a per-field scale."""
+    scale = np.ones((len(arr), ), dtype=np.float64)
+    if arr.size:
+        scale = np.abs(arr).max(axis=1).astype(np.float64) / _int16_max
+        scale[scale == 0] = 1.0
+    quant = np.empty(arr.shape, dtype=np.int16)
+    for i in range(len(arr)):
+        np.rint(arr[i] / scale[i], out=quant[i], casting='unsafe')
+    return quant, scale
+
+
+def _field_array(values):
+    """
+    Contiguous (nfields, npts) array of field values; returns None if the
+    fields have different sizes (which cannot be stacked).
+    """
+    if isinstance(values, FieldValues):
+        values = values.array if values.array is not None else list(values)
+    if isinstance(values, np.ndarray):
+        if values.ndim == 1:
+            return values.reshape(1, -1)
+        if values.ndim > 2:
+            return values.reshape(len(values), -1)
+        return values
+    if isinstance(values, pd.Series):
+        return values.values.reshape(1, -1)
+    values = [np.asarray(v) for v in values]
+    if not values:
+        return np.empty((0, 0), dtype=np.float64)
+    if len(set(len(v) for v in values)) > 1:
+        return None
+    return np.stack(values)
+
+
+class FieldValues(object):
+    """
+    List-like access to the field values of an
+    :class:`~exatomic.core.field.AtomicField`. Items are
+    :class:`~exa.core.numerical.Series` views of the rows of the underlying
+    contiguous array (or the series themselves for fields of different sizes).
+    """
+    def __len__(self):
+        if self.array is None:
+            return len(self.series)
+        return len(self.array)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if self.array is None:
+                return self.series[key]
+            key = int(key) % len(self)
+            if self.scale is None:
+                return Series(self.array[key], name=key)
+            return Series(self.array[key].astype(np.float32) * self.scale[key], name=key)
+        return [self[i] for i in np.arange(len(self))[key]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    @property
+    def dtype(self):
+        """Storage type of the field values (None for fields of different sizes)."""
+        return None if self.array is None else self.array.dtype
+
+    def __repr__(self):
+        return 'FieldValues(nfields={})'.format(len(self))
+
+    def __init__(self, values, scale=None):
+        self.array = _field_array(values)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.series = None
+        if self.array is None:
+            self.series = [Series(v, name=i) for i, v in enumerate(values)]
 
 class AField(DataFrame):
     _columns = ['nx', 'ny', 'nz', 'ox', 'oy', 'oz', 'dxi', 'dxj', 'dxk',
@@ -55,11 +175,160 @@ class AtomicField(Field):
     _categories = {'label': str, 'field_type': str}
     _columns = ['nx', 'ny', 'nz', 'ox', 'oy', 'oz', 'dxi', 'dxj', 'dxk',
                 'dyi', 'dyj', 'dyk', 'dzi', 'dzj', 'dzk', 'frame']
+    _field_values = None
+    _pyramid = None
 
     @property
     def nfields(self):
         return len(self.field_values)
 
+    @property
+    def field_values(self):
+        return self._field_values
+
+    @field_values.setter
+    def field_values(self, values):
+        self._pyramid = None
+        if isinstance(values, FieldValues):
+            self._field_values = values
+            return
+        if values is None:
+            values = []
+        elif not isinstance(values, (list, tuple, np.ndarray, pd.Series, FieldValues)):
+            raise TypeError("Wrong type for field_values with type {}".format(type(values)))
+        self._field_values = FieldValues(values)
+
+    @property
+    def field_array(self):
+        """
+        Field values as a contiguous (nfields, npts) array (None if the
+        fields have different sizes).
+        """
+        return self.field_values.array
+
+    @property
+    def field_scale(self):
+        """Per-field scale of int16 (quantized) field values (None otherwise)."""
+        return self.field_values.scale
+
+    def compact(self, dtype='float32'):
+        """
+        Return a copy of the field with compactly stored field values.
+
+        Args:
+            dtype (str): 'float32' or 'int16' (lossy, quantized with a per-field scale)
+
+        Returns:
+            field (:class:`~exatomic.core.field.AtomicField`): Compact field
+        """
+        if self.field_array is None:
+            raise ValueError("Fields of different sizes cannot be stored compactly")
+        return self.__class__(pd.DataFrame(self).copy(), field_values=self._dense(),
+                              dtype=dtype)
+
+    def _dense(self, dtype=np.float64):
+        """Field values as a (dequantized) floating point array."""
+        arr = self.field_array
+        if self.field_scale is not None:
+            return arr.astype(dtype) * self.field_scale[:, None].astype(dtype)
+        return arr
+
+    def to_hdf(self, path, key='field', complib='blosc:zstd', complevel=5, dtype=None):
+        """
+        Write the field to a compressed HDF5 file. Field values are stored in
+        a chunked array (one field per chunk row) so that single fields can
+        be read back without decompressing the rest.
+
+        Args:
+            path (str): HDF5 file path
+            key (str): Group in the file
+            complib (str): Compression library (see pytables' filters)
+            complevel (int): Compression level (0 - 9)
+            dtype (str): Store compactly as 'float32' or 'int16' (default as is)
+
+        Note:
+            Levels of the :meth:`~exatomic.core.field.AtomicField.pyramid`
+            that have been computed are written as well (as key/level1, ...).
+        """
+        import tables
+        field = self if dtype is None else self.compact(dtype)
+        if field.field_array is None:
+            raise ValueError("Fields of different sizes cannot be written to HDF5")
+        params = pd.DataFrame(field).copy()
+        for col in params.columns:
+            if isinstance(params[col].dtype, pd.api.types.CategoricalDtype):
+                params[col] = params[col].astype(object)
+        with pd.HDFStore(path, 'a') as store:
+            store.put(key + '/params', params)
+        arr = np.ascontiguousarray(field.field_array)
+        filters = tables.Filters(complevel=complevel, complib=complib, shuffle=True)
+        with tables.open_file(path, 'a') as h5:
+            group = h5.get_node('/' + key)
+            for name in ('values', 'scale'):
+                if name in group:
+                    h5.remove_node(group, name)
+            for name in list(group._v_groups):
+                if name.startswith('level'):
+                    h5.remove_node(group, name, recursive=True)
+            chunkshape = (1, max(1, min(arr.shape[1], 2**16)))
+            h5.create_carray(group, 'values', obj=arr, filters=filters,
+                             chunkshape=chunkshape)
+            if field.field_scale is not None:
+                h5.create_array(group, 'scale', obj=field.field_scale)
+        for n, level in enumerate(self._pyramid or [], 1):
+            level.to_hdf(path, key='{}/level{}'.format(key, n), complib=complib,
+                         complevel=complevel, dtype=dtype)
+
+    @classmethod
+    def from_hdf(cls, path, key='field'):
+        """
+        Read a field written by :meth:`~exatomic.core.field.AtomicField.to_hdf`
+        (values keep the storage type they were written with, pyramid levels
+        are restored).
+        """
+        import tables
+        params = pd.read_hdf(path, key + '/params')
+        with tables.open_file(path, 'r') as h5:
+            group = h5.get_node('/' + key)
+            values = group.values.read()
+            scale = group.scale.read() if 'scale' in group else None
+            nlevel = sum(name.startswith('level') for name in group._v_groups)
+        field = cls(params, field_values=values, field_scale=scale)
+        if nlevel:
+            field._pyramid = [cls.from_hdf(path, key='{}/level{}'.format(key, n))
+                              for n in range(1, nlevel + 1)]
+        return field
+
+    def copy(self, *args, **kwargs):
+        """Make a copy of the field data and field values."""
+        cls = self.__class__
+        data = pd.DataFrame(self).copy(*args, **kwargs)
+        if self.field_array is None:
+            return cls(data, field_values=[fv.copy() for fv in self.field_values])
+        scale = None if self.field_scale is None else self.field_scale.copy()
+        return cls(data, field_values=np.array(self.field_array), field_scale=scale)
+
+    def memory_usage(self):
+        """Get the combined memory usage of the field data and field values."""
+        data = super(Field, self).memory_usage()
+        if self.field_array is None:
+            data['field_values'] = sum(fv.memory_usage() for fv in self.field_values)
+        else:
+            data['field_values'] = self.field_array.nbytes
+        return data
+
+    def slice_naive(self, key):
+        """Naively (on index) slice the field data and values."""
+        cls = self.__class__
+        key = check_key(self, key)
+        enum = pd.Series(range(len(self)))
+        enum.index = self.index
+        idx = enum[key].values
+        if self.field_array is None:
+            return cls(self.loc[key], field_values=[self.field_values[i] for i in idx])
+        scale = None if self.field_scale is None else self.field_scale[idx]
+        return cls(self.loc[key], field_values=self.field_array[idx], field_scale=scale)
+
     def compute_dv(self):
         """
         Compute the volume element for each field.
@@ -71,15 +340,10 @@ class AtomicField(Field):
 
             v = \\left|\\mathbf{a}\\cdot\\left(\\mathbf{b}\\times\\mathbf{c}\\right)\\right|
         """
-        def _dv(row):
-            """
-            Helper function that performs the operation above.
-            """
-            a = row[['dxi', 'dxj', 'dxk']].values.astype(np.float64)
-            b = row[['dyi', 'dyj', 'dyk']].values.astype(np.float64)
-            c = row[['dzi', 'dzj', 'dzk']].values.astype(np.float64)
-            return np.dot(a, np.cross(b, c))
-        self['dv'] = self.apply(_dv, axis=1)
+        a = self[['dxi', 'dxj', 'dxk']].values.astype(np.float64)
+        b = self[['dyi', 'dyj', 'dyk']].values.astype(np.float64)
+        c = self[['dzi', 'dzj', 'dzk']].values.astype(np.float64)
+        self['dv'] = np.einsum('ij,ij->i', a, np.cross(b, c))
 
     def integrate(self):
         """
@@ -94,10 +358,251 @@ class AtomicField(Field):
         """
         if 'dv' not in self:
             self.compute_dv()
-        self['sums'] = [np.sum(fv**2) for fv in self.field_values]
-        norm = self['dv'] * self['sums']
-        del self['sums']
-        return norm
+        arr = self.field_array
+        if arr is None:
+            sums = [np.sum(fv**2) for fv in self.field_values]
+        else:
+            # Accumulate in double precision directly on (compact) values
+            sums = np.einsum('ij,ij->i', arr, arr, dtype=np.float64)
+            if self.field_scale is not None:
+                sums = sums * self.field_scale**2
+        return self['dv'] * sums
+
+    def norm(self):
+        """Norms (square root of the integral of the square) of all fields."""
+        return np.sqrt(self.integrate().values)
+
+    def overlap(self, other=None, chunk=2**16):
+        """
+        Overlap integrals of all pairs of fields,
+
+        .. math::
+
+            S_{ij} = \\int\\phi_{i}\\phi_{j}dV
+
+        computed as one matrix product of the stacked field values (blocks of
+        grid points for compact values, accumulated in double precision).
+
+        .. code-block:: Python
+
+            S = uni0.field.overlap(uni1.field)  # Compare orbitals of two calculations
+            np.abs(S).argmax(axis=1)            # Matching orbitals
+
+        Args:
+            other (:class:`~exatomic.core.field.AtomicField`): Fields on the same grid (default self)
+            chunk (int): Grid points per block for compact (float32/int16) values
+
+        Returns:
+            overlap (array): Overlap matrix (nfields, other.nfields)
+        """
+        a = self._stacked()
+        b = a if other is None else other._stacked()
+        if a.shape[1] != b.shape[1]:
+            raise ValueError("Fields must be on the same grid ({} and {} points)".format(
+                             a.shape[1], b.shape[1]))
+        if a.dtype == np.float64 and b.dtype == np.float64:
+            s = np.dot(a, b.T)
+        else:
+            s = np.zeros((len(a), len(b)), dtype=np.float64)
+            for i in range(0, a.shape[1], chunk):
+                ca = a[:, i:i + chunk].astype(np.float64)
+                cb = ca if other is None else b[:, i:i + chunk].astype(np.float64)
+                s += np.dot(ca, cb.T)
+        other = self if other is None else other
+        if self.field_scale is not None:
+            s *= self.field_scale[:, None]
+        if other.field_scale is not None:
+            s *= other.field_scale[None, :]
+        if 'dv' not in self:
+            self.compute_dv()
+        return s * self['dv'].values[:, None]
+
+    def combine(self, coefs):
+        """
+        Linear combinations of the fields (one matrix product).
+
+        Args:
+            coefs (array): Coefficients (ncombinations, nfields)
+
+        Returns:
+            combined (:class:`~exatomic.core.field.AtomicField`): Fields on the grid of the first field
+        """
+        coefs = np.atleast_2d(np.asarray(coefs, dtype=np.float64))
+        values = np.dot(coefs, self._dense())
+        params = pd.DataFrame(self.iloc[[0] * len(values)]).reset_index(drop=True)
+        return self.__class__(params, field_values=values)
+
+    def add(self, other):
+        """Element-wise sum with another field (or array/number), field by field."""
+        return self._evaluate('a + b', other)
+
+    def subtract(self, other):
+        """Element-wise difference with another field (or array/number), field by field."""
+        return self._evaluate('a - b', other)
+
+    def multiply(self, other):
+        """Element-wise product with another field (or array/number), field by field."""
+        return self._evaluate('a * b', other)
+
+    def _evaluate(self, expr, other):
+        """Evaluate expr of the field values (a) and other (b) with numexpr."""
+        if isinstance(other, AtomicField):
+            other = other._stacked(dense=True)
+        values = evaluate(expr, local_dict={'a': self._stacked(dense=True), 'b': other})
+        return self.__class__(pd.DataFrame(self).copy(), field_values=values)
+
+    def _stacked(self, dense=False):
+        """Field values as (nfields, npts) array (dequantized if dense)."""
+        if self.field_array is None:
+            raise ValueError("Fields of different sizes cannot be stacked")
+        return self._dense() if dense else self.field_array
+
+    def grid(self, idx):
+        """
+        Shape, origin and step vectors (rows) of the grid of field idx
+        (positional).
+        """
+        row = self.iloc[idx]
+        shape = tuple(int(row['n' + c]) for c in 'xyz')
+        origin = row[['ox', 'oy', 'oz']].values.astype(np.float64)
+        basis = np.array([row[['d' + c + 'i', 'd' + c + 'j', 'd' + c + 'k']].values
+                          for c in 'xyz'], dtype=np.float64)
+        return shape, origin, basis
+
+    def isosurfaces(self, idx, isovalues):
+        """
+        Extract triangle meshes of field idx (positional) at the given
+        isovalues using marching cubes (see
+        :func:`~exatomic.algorithms.isosurface.marching_cubes`). Compact
+        (float32 or int16) field values are used as is.
+
+        .. code-block:: Python
+
+            meshes = field.isosurfaces(0, [0.03, -0.03])
+            verts, faces = meshes[0]
+
+        Args:
+            idx (int): Field index
+            isovalues (float or list): Isovalue(s)
+
+        Returns:
+            meshes (list): Tuples of vertices (nverts, 3) and faces (nfaces, 3)
+        """
+        values, scale, origin, basis = self._grid_values(idx)
+        return [marching_cubes(values, iso / scale, origin, basis)
+                for iso in np.atleast_1d(isovalues)]
+
+    def contours(self, idx, levels, axis='z', value=0.0):
+        """
+        Contour lines of field idx (positional) in the grid plane normal to
+        axis that is closest to value, for all levels at once (see
+        :func:`~exatomic.algorithms.isosurface.marching_squares`).
+
+        .. code-block:: Python
+
+            levels = contour_levels(10, (-7, -1))
+            segs, ptr = field.contours(0, levels, axis='x', value=0.5)
+            segs[ptr[3]:ptr[4]]         # Segments (nseg, 2, 3) of levels[3]
+
+        Args:
+            idx (int): Field index
+            levels (array): Contour levels (sorted)
+            axis (str): Grid direction ('x', 'y' or 'z') normal to the plane
+            value (float): Coordinate along axis of the plane
+
+        Returns:
+            segs (array): Line segments (nseg, 2, 3) in Cartesian coordinates
+            ptr (array): Segments of level i are segs[ptr[i]:ptr[i + 1]]
+        """
+        values, scale, origin, basis = self._grid_values(idx)
+        ax = 'xyz'.index(axis)
+        n = values.shape[ax]
+        step = basis[ax, ax]
+        plane = 0 if not step else int(np.clip(np.rint((value - origin[ax]) / step), 0, n - 1))
+        levels = np.asarray(levels, dtype=np.float64)
+        segs, ptr = marching_squares(np.take(values, plane, axis=ax), levels / scale)
+        a, b = [i for i in range(3) if i != ax]
+        segs = (origin + plane * basis[ax] + segs[..., 0, None] * basis[a]
+                + segs[..., 1, None] * basis[b])
+        return segs, ptr
+
+    def pyramid(self, levels=3):
+        """
+        Block averaged (2x, 4x, 8x, ...) copies of the fields, computed (in
+        parallel) once and cached; see :func:`~exatomic.algorithms.pyramid.pyramid`.
+        Levels are stored like the field (float32, or int16 re-quantized,
+        values stay as is) and written by
+        :meth:`~exatomic.core.field.AtomicField.to_hdf`.
+
+        .. code-block:: Python
+
+            half, quarter, eighth = field.pyramid()
+            field.coarsen(64**3)        # Finest level with at most 64**3 points per field
+
+        Args:
+            levels (int): Number of levels
+
+        Returns:
+            pyramid (list): Fields (:class:`~exatomic.core.field.AtomicField`) of levels 1 to levels
+        """
+        if self._pyramid is not None and len(self._pyramid) >= levels:
+            return self._pyramid[:levels]
+        if self.field_array is None:
+            raise ValueError("Fields of different sizes have no pyramid")
+        shapes = self[['nx', 'ny', 'nz']].drop_duplicates()
+        if len(shapes) > 1:
+            raise ValueError("Fields on grids of different shapes have no pyramid")
+        shape = tuple(shapes.values[0].astype(np.int64))
+        dtype = self.field_array.dtype
+        base = pd.DataFrame(self).drop('dv', axis=1, errors='ignore')
+        dcols = ['d' + c + a for c in 'xyz' for a in 'ijk']
+        steps = sum(base[['d' + c + a for a in 'ijk']].values.astype(np.float64)
+                    for c in 'xyz')
+        out = []
+        for n, (values, lshape) in enumerate(pyramid(self.field_array, shape, levels), 1):
+            f = 2**n
+            params = base.copy()
+            params[['nx', 'ny', 'nz']] = np.array(lshape, dtype=np.int64)
+            params[['ox', 'oy', 'oz']] = (base[['ox', 'oy', 'oz']].values.astype(np.float64)
+                                          + (f - 1) / 2 * steps)
+            params[dcols] = base[dcols].values.astype(np.float64) * f
+            if self.field_scale is not None:
+                out.append(self.__class__(params, field_values=values
+                                          * self.field_scale[:, None], dtype=dtype))
+            else:
+                out.append(self.__class__(params, field_values=values.astype(dtype, copy=False)))
+        self._pyramid = out
+        return out
+
+    def coarsen(self, max_voxels, levels=3):
+        """
+        The finest of the field and its pyramid levels with at most max_voxels
+        points per field (the coarsest level if none is small enough).
+
+        Args:
+            max_voxels (int): Voxel budget per field
+            levels (int): Number of pyramid levels
+
+        Returns:
+            field (:class:`~exatomic.core.field.AtomicField`): Field or pyramid level
+        """
+        npts = lambda fld: fld[['nx', 'ny', 'nz']].astype(np.int64).prod(axis=1).max()
+        if npts(self) <= max_voxels:
+            return self
+        for field in self.pyramid(levels):
+            if npts(field) <= max_voxels:
+                return field
+        return field
+
+    def _grid_values(self, idx):
+        """Values (3D, as stored), scale, origin and step vectors of field idx."""
+        shape, origin, basis = self.grid(idx)
+        if self.field_array is None:
+            values = np.asarray(self.field_values[idx])
+        else:
+            values = self.field_array[idx]
+        scale = 1.0 if self.field_scale is None else self.field_scale[idx]
+        return values.reshape(shape), scale, origin, basis
 
     def rotate(self, a, b, angle):
         """
@@ -115,21 +620,36 @@ class AtomicField(Field):
         Return:
             rotated (:class:`~exatomic.field.AtomicField`): positive then negative linear combinations
         """
-        field_params = self.ix[[a]]
-        f0 = self.field_values[a]
-        f1 = self.field_values[b]
-        posvals, negvals = [], []
-        try:
-            angle = float(angle)
-            angle = [angle]
-        except TypeError:
-            pass
-        for ang in angle:
-            t1 = np.cos(ang) * f0
-            t2 = np.sin(ang) * f1
-            posvals.append(Series(t1 + t2))
-            negvals.append(Series(t1 - t2))
-        num = len(posvals) + len(negvals)
-        field_params = pd.concat([field_params] * num)
+        field_params = self.iloc[[a]]
+        f0 = np.asarray(self.field_values[a])
+        f1 = np.asarray(self.field_values[b])
+        angle = np.atleast_1d(np.asarray(angle, dtype=np.float64))
+        t1 = np.outer(np.cos(angle), f0)
+        t2 = np.outer(np.sin(angle), f1)
+        values = np.concatenate([t1 + t2, t1 - t2])
+        field_params = pd.concat([field_params] * len(values))
         field_params.reset_index(drop=True, inplace=True)
-        return AtomicField(field_params, field_values=posvals + negvals)
+        return AtomicField(field_params, field_values=values)
+
+    def __init__(self, *args, **kwargs):
+        field_values = kwargs.pop("field_values", None)
+        field_scale = kwargs.pop("field_scale", None)
+        dtype = kwargs.pop("dtype", None)
+        if args and isinstance(args[0], pd.Series):
+            args = (args[0].to_frame().T, )
+        super(Field, self).__init__(*args, **kwargs)
+        self._metadata = ['field_values']
+        if dtype is not None and field_scale is None:
+            dtype = np.dtype(dtype)
+            arr = _field_array(field_values if field_values is not None else [])
+            if arr is None:
+                raise ValueError("Fields of different sizes cannot be stored compactly")
+            if dtype == np.int16:
+                field_values, field_scale = _quantize(arr)
+            elif dtype.kind == 'f':
+                field_values = arr.astype(dtype, copy=False)
+            else:
+                raise ValueError("dtype must be a float type or int16, not {}".format(dtype))
+        if field_scale is not None:
+            field_values = FieldValues(field_values, field_scale)
+        self.field_values = field_values
@@ -22,8 +22,9 @@ import pandas as pd
 from exa import DataFrame
 from exa.util.units import Energy
 from exatomic.algorithms.orbital import (density_from_momatrix,
-                                         density_as_square,
+                                         density_from_pairs,
                                          momatrix_as_square)
+from exatomic.algorithms.numerical import Shells
 from exatomic.core.field import AtomicField
 
 
@@ -321,7 +322,8 @@ class DensityMatrix(DataFrame):
     """
     The density matrix in a contracted basis set. As it is
     square symmetric, only n_basis_functions * (n_basis_functions + 1) / 2
-    rows are stored.
+    rows are stored (fewer if elements of insignificant shell pairs are
+    screened, see :class:`~exatomic.algorithms.numerical.ShellPairs`).
 
     +-------------------+----------+-------------------------------------------+
     | Column            | Type     | Description                               |
@@ -340,15 +342,21 @@ class DensityMatrix(DataFrame):
     _index = 'index'
 
     def square(self, frame=0):
-        """Returns a square dataframe of the density matrix."""
-        denvec = self[self['frame'] == frame]['coef'].values
-        square = pd.DataFrame(density_as_square(denvec))
+        """Returns a square dataframe of the density matrix (screened elements are zero)."""
+        df = self[self['frame'] == frame]
+        chi0 = df['chi0'].values.astype(np.int64)
+        chi1 = df['chi1'].values.astype(np.int64)
+        nbas = max(chi0.max(), chi1.max()) + 1 if len(df) else 0
+        dens = np.zeros((nbas, nbas), dtype=np.float64)
+        dens[chi0, chi1] = df['coef'].values
+        dens[chi1, chi0] = df['coef'].values
+        square = pd.DataFrame(dens)
         square.index.name = 'chi0'
         square.columns.name = 'chi1'
         return square
 
     @classmethod
-    def from_momatrix(cls, momatrix, occvec, mocoefs='coef'):
+    def from_momatrix(cls, momatrix, occvec, mocoefs='coef', pairs=None):
         """
         A density matrix can be constructed from an MOMatrix by:
         .. math::
@@ -359,17 +367,30 @@ class DensityMatrix(DataFrame):
             momatrix (:class:`~exatomic.orbital.MOMatrix`): a C matrix
             occvec (:class:`~np.array` or similar): vector of len(C.shape[0])
                 containing the occupations of each molecular orbital.
+            pairs (:class:`~exatomic.algorithms.numerical.ShellPairs`): only
+                compute the elements of significant shell pairs
 
         Returns:
             ret (:class:`~exatomic.orbital.DensityMatrix`): The density matrix
         """
         cmat = momatrix.square(column=mocoefs).values
-        chi0, chi1, dens, frame = density_from_momatrix(cmat, occvec)
+        return cls._from_square(cmat, occvec, pairs)
+
+    @classmethod
+    def _from_square(cls, cmat, occvec, pairs):
+        """Density matrix of a square C matrix (optionally screened)."""
+        if pairs is None:
+            chi0, chi1, dens, frame = density_from_momatrix(cmat, occvec)
+        else:
+            chi0, chi1 = pairs.function_pairs()
+            dens = density_from_pairs(np.ascontiguousarray(cmat, dtype=np.float64),
+                                      np.asarray(occvec, dtype=np.float64), chi0, chi1)
+            frame = np.zeros(len(chi0), dtype=np.int64)
         return cls.from_dict({'chi0': chi0, 'chi1': chi1,
                               'coef': dens, 'frame': frame})
 
     @classmethod
-    def from_universe(cls, uni, mocoefs, orbocc):
+    def from_universe(cls, uni, mocoefs, orbocc, tol=None, frame=None):
         """
         The density matrix is defined as:
         .. math::
@@ -380,12 +401,16 @@ class DensityMatrix(DataFrame):
             uni (:class:`~exatomic.core.universe.Universe`): a universe containing momatrix and orbital
             mocoefs (str): column name of C matrix in uni.momatrix
             orbocc (str): column name of occupation vector in uni.orbital
+            tol (float): if given, only compute the elements of shell pairs
+                significant at this tolerance (requires basis set information)
+            frame (int): frame of the geometry used for screening (default last frame)
 
         Returns:
             ret (:class:`~exatomic.orbital.DensityMatrix`): The density matrix
         """
         cmat = uni.momatrix.square(mocoefs=mocoefs).values
         occvec = uni.orbital[orbocc].values
-        chi0, chi1, dens, frame = density_from_momatrix(cmat, occvec)
-        return cls.from_dict({'chi0': chi0, 'chi1': chi1,
-                              'coef': dens, 'frame': frame})
+        pairs = None
+        if tol is not None:
+            pairs = Shells.from_universe(uni, frame=frame).pairs(tol)
+        return cls._from_square(cmat, occvec, pairs)
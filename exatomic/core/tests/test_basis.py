@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2015-2017, Exa Analytics Development Team
 # Distributed under the terms of the Apache License 2.0
+import bz2
+import numpy as np
 import pandas as pd
+from os.path import abspath, join
 from unittest import TestCase
+from scipy.sparse import coo_matrix
+import exatomic
+from exatomic.gaussian import Output
+from exatomic.core.universe import Universe
 from exatomic.core.basis import (BasisSet, BasisSetOrder, Overlap, Primitive,
-                            spher_lml_count, cart_lml_count)
+                            spher_lml_count, cart_lml_count, _ranges, _block_diagonal)
 
 class TestBasisSet(TestCase):
 
@@ -80,3 +87,79 @@ class TestBasisSet(TestCase):
         self.assertTrue(
             (self.lbs.primitives(spher_lml_count) == pd.Series({
             0: 14, 1: 5})).all())
+
+
+class TestPrimitive(TestCase):
+
+    def setUp(self):
+        path = abspath(join(abspath(exatomic.__file__), "../static/gaussian/"))
+        with bz2.open(join(path, 'g09-ch3nh2-631g.out.bz2')) as f:
+            self.uni = Output(f.read().decode('utf-8')).to_universe()
+
+    def test_block_diagonal(self):
+        self.assertTrue((_ranges(np.array([3, 0]), np.array([2, 3])) == [3, 4, 0, 1, 2]).all())
+        a, b = np.array([[1., 2.]]), np.array([[0., 3.], [4., 0.]])
+        mat = _block_diagonal(np.array([1, 0, 1]), [coo_matrix(a), coo_matrix(b)], (5, 6))
+        ref = np.zeros((5, 6))
+        ref[:2, :2] = b
+        ref[2:3, 2:4] = a
+        ref[3:, 4:] = b
+        self.assertTrue(np.allclose(mat.toarray(), ref))
+
+    def test_from_universe(self):
+        prim, sphr, cont = Primitive.from_universe(self.uni, debug=False)
+        sprim, ssphr, scont = Primitive.from_universe(self.uni, debug=False, sparse=True)
+        self.assertTrue(np.allclose(sphr.values, ssphr.toarray()))
+        self.assertTrue(np.allclose(cont.values, scont.toarray()))
+        self.assertEqual(len(prim), sphr.shape[0])
+        self.assertEqual(cont.shape[1], len(self.uni.basis_set_order))
+        self.assertTrue(np.allclose(prim[['l', 'm', 'n']].sum(axis=1), prim['L']))
+
+    def test_reference(self):
+        """Cartesian (Gaussian ordered) shells grouped by shell, as computed by the former loops."""
+        bs = BasisSet({'alpha': [3.0, 0.5, 0.8, 1.1, 1.2], 'd': [0.4, 0.7, 1.0, 1.0, 1.0],
+                       'shell': [0, 0, 1, 2, 0], 'L': [0, 0, 1, 2, 0], 'set': [0, 0, 0, 0, 1],
+                       'frame': 0}, spherical=False)
+        order = BasisSetOrder({'center': [0] * 10 + [1], 'L': [0, 1, 1, 1] + [2] * 6 + [0],
+                               'shell': [0, 1, 1, 1] + [2] * 6 + [0], 'frame': 0})
+        atom = pd.DataFrame({'x': [0.0, 0.0], 'y': [0.0, 0.0], 'z': [0.0, 1.4],
+                             'symbol': ['C', 'H'], 'set': [0, 1], 'frame': 0})
+        uni = Universe(atom=atom, basis_set=bs, basis_set_order=order)
+        uni.meta = {'program': 'gaussian'}
+        prim, sphr, cont = Primitive.from_universe(uni, grpby='shell', debug=False)
+        n = [1.624617149204474, 0.42377720812375763, 1.07845634924623,
+             1.9446733168524857, 0.8171391655383581]
+        ref = pd.DataFrame({'za': [0.0] * 11 + [1.4],
+                            'alpha': [3.0, 0.5] + [0.8] * 3 + [1.1] * 6 + [1.2],
+                            'N': n[:2] + [n[2]] * 3 + [n[3]] * 6 + [n[4]],
+                            'l': [0, 0, 1, 0, 0, 2, 0, 0, 1, 1, 0, 0],
+                            'm': [0, 0, 0, 1, 0, 0, 2, 0, 1, 0, 1, 0],
+                            'n': [0, 0, 0, 0, 1, 0, 0, 2, 0, 1, 1, 0],
+                            'L': [0, 0, 1, 1, 1, 2, 2, 2, 2, 2, 2, 0],
+                            'set': [0] * 11 + [1]})
+        for col in ref.columns:
+            self.assertTrue(np.allclose(prim[col].astype(np.float64), ref[col]))
+        self.assertTrue(np.allclose(prim[['xa', 'ya']].astype(np.float64), 0.0))
+        r3 = np.sqrt(3.0)
+        sref = np.zeros((12, 11))
+        for i, j, v in [(0, 0, 1.0), (1, 1, 1.0), (2, 2, 1.0), (3, 3, 1.0), (4, 4, 1.0),
+                        (5, 7, -0.5), (5, 9, r3 / 2), (6, 7, -0.5), (6, 9, -r3 / 2),
+                        (7, 7, 1.0), (8, 5, r3), (9, 8, r3), (10, 6, r3), (11, 10, 1.0)]:
+            sref[i, j] = v
+        self.assertTrue(np.allclose(sphr.values, sref))
+        cref = np.zeros((12, 11))
+        cref[0, 0], cref[1, 0] = 0.4, 0.7
+        cref[np.arange(2, 12), np.arange(1, 11)] = 1.0
+        self.assertTrue(np.allclose(cont.values, cref))
+
+    def test_high_l(self):
+        """Functions beyond h have no Cartesian to spherical conversion."""
+        bs = BasisSet({'alpha': [1.0, 0.5], 'd': [1.0, 1.0], 'shell': [0, 1], 'L': [0, 6],
+                       'set': [0, 0], 'frame': 0}, spherical=True)
+        order = BasisSetOrder({'center': [0] * 14, 'L': [0] + [6] * 13,
+                               'shell': [0] + [1] * 13, 'frame': 0})
+        atom = pd.DataFrame({'x': [0.0], 'y': [0.0], 'z': [0.0], 'symbol': ['C'],
+                             'set': [0], 'frame': 0})
+        uni = Universe(atom=atom, basis_set=bs, basis_set_order=order)
+        uni.meta = {'program': 'gaussian'}
+        self.assertRaises(ValueError, Primitive.from_universe, uni, grpby='shell')
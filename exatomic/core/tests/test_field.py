@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2017, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Field Tests
+###############
+Testing for the contiguous storage, algebra and pyramids of atomic field values.
+"""
+import os
+import tempfile
+import numpy as np
+from unittest import TestCase
+from exatomic.core.field import AtomicField
+from exatomic.core.universe import Universe
+from exatomic.algorithms.orbital_util import make_fps
+
+
+class TestAtomicField(TestCase):
+    """Field values are views of a single contiguous array."""
+    def setUp(self):
+        self.fps = make_fps(rmin=-2, rmax=2, nr=5, nrfps=3)
+        self.vals = np.random.RandomState(3).normal(size=(3, 125))
+        self.field = AtomicField(self.fps, field_values=self.vals)
+
+    def test_views(self):
+        self.assertEqual(self.field.nfields, 3)
+        self.assertIs(self.field.field_array, self.vals)
+        fv = self.field.field_values[1]
+        self.assertEqual(fv.name, 1)
+        self.assertTrue(np.shares_memory(fv.values, self.vals))
+        self.assertTrue(np.allclose(self.field.field_values[-1], self.vals[2]))
+        self.assertEqual(len(list(self.field.field_values)), 3)
+
+    def test_list(self):
+        field = AtomicField(self.fps, field_values=list(self.vals))
+        self.assertEqual(field.field_array.shape, (3, 125))
+        self.assertTrue(np.allclose(field.field_array, self.vals))
+        ragged = AtomicField(self.fps, field_values=[self.vals[0], self.vals[1, :8],
+                                                     self.vals[2]])
+        self.assertIsNone(ragged.field_array)
+        self.assertEqual(len(ragged.field_values[1]), 8)
+        self.assertEqual(len(ragged.integrate()), 3)
+
+    def test_integrate(self):
+        norm = self.field.integrate()
+        ref = self.field['dv'] * (self.vals**2).sum(axis=1)
+        self.assertTrue(np.allclose(norm, ref))
+        self.assertTrue(np.allclose(self.field['dv'], 0.8**3))
+
+    def test_rotate(self):
+        rot = self.field.rotate(0, 1, [0, np.pi / 4])
+        self.assertEqual(rot.nfields, 4)
+        c, s = np.cos(np.pi / 4), np.sin(np.pi / 4)
+        self.assertTrue(np.allclose(rot.field_values[0], self.vals[0]))
+        self.assertTrue(np.allclose(rot.field_values[1], c * self.vals[0] + s * self.vals[1]))
+        self.assertTrue(np.allclose(rot.field_values[3], c * self.vals[0] - s * self.vals[1]))
+
+    def test_overlap(self):
+        dv = 0.8**3
+        ref = np.dot(self.vals, self.vals.T) * dv
+        self.assertTrue(np.allclose(self.field.overlap(), ref))
+        self.assertTrue(np.allclose(self.field.norm(), np.sqrt(np.diag(ref))))
+        other = AtomicField(self.fps.iloc[:2], field_values=self.vals[:2] * 2)
+        self.assertTrue(np.allclose(self.field.overlap(other), ref[:, :2] * 2))
+        quant = self.field.compact('int16')
+        self.assertTrue(np.allclose(quant.overlap(other.compact(), chunk=7),
+                                    ref[:, :2] * 2, rtol=1e-3))
+        small = AtomicField(make_fps(rmin=-2, rmax=2, nr=3), field_values=[np.ones(27)])
+        self.assertRaises(ValueError, self.field.overlap, small)
+
+    def test_algebra(self):
+        comb = self.field.combine([[1, 1, 0], [1, -1, 0]])
+        self.assertEqual(comb.nfields, 2)
+        self.assertTrue(np.allclose(comb.field_values[1], self.vals[0] - self.vals[1]))
+        self.assertTrue(np.allclose(self.field.add(self.field).field_array, 2 * self.vals))
+        self.assertTrue(np.allclose(self.field.subtract(self.vals[0]).field_array,
+                                    self.vals - self.vals[0]))
+        prod = self.field.compact('int16').multiply(self.field)
+        self.assertTrue(np.allclose(prod.field_array, self.vals**2, atol=1e-3))
+        self.assertEqual(len(prod), 3)
+
+    def test_copy_slice(self):
+        cp = self.field.copy()
+        self.assertFalse(np.shares_memory(cp.field_array, self.vals))
+        self.assertTrue(np.allclose(cp.field_array, self.vals))
+        sl = self.field.slice_naive([0, 2])
+        self.assertTrue(np.allclose(sl.field_array, self.vals[[0, 2]]))
+
+    def test_add_field(self):
+        uni = Universe()
+        uni.add_field(self.field)
+        uni.add_field(AtomicField(self.fps.iloc[:1], field_values=self.vals[:1] * 2))
+        self.assertEqual(uni.field.nfields, 4)
+        self.assertEqual(uni.field.field_array.shape, (4, 125))
+        self.assertTrue(np.allclose(uni.field.field_values[3], self.vals[0] * 2))
+
+    def test_compact(self):
+        single = self.field.compact()
+        self.assertEqual(single.field_array.dtype, np.float32)
+        self.assertTrue(np.allclose(single.integrate(), self.field.integrate()))
+        quant = self.field.compact('int16')
+        self.assertEqual(quant.field_array.dtype, np.int16)
+        self.assertEqual(quant.field_scale.shape, (3, ))
+        err = np.abs(quant.field_values[2] - self.vals[2]).max()
+        self.assertLess(err, quant.field_scale[2])
+        self.assertTrue(np.allclose(quant.integrate(), self.field.integrate(), rtol=1e-4))
+        self.assertTrue(np.allclose(quant.slice_naive([2]).field_scale, quant.field_scale[2]))
+        uni = Universe()
+        uni.add_field(quant)
+        uni.add_field(quant.slice_naive([0]))
+        self.assertEqual(uni.field.field_array.dtype, np.int16)
+        self.assertTrue(np.allclose(uni.field.field_values[3], quant.field_values[0]))
+        # Quantized fields on different grids are kept as separate series
+        other = AtomicField(make_fps(rmin=-2, rmax=2, nr=4), field_values=self.vals[:1, :64])
+        uni.add_field(other.compact('int16'))
+        self.assertEqual(uni.field.nfields, 5)
+        self.assertIsNone(uni.field.field_array)
+        self.assertTrue(np.allclose(uni.field.field_values[4], self.vals[0, :64], atol=1e-3))
+        self.assertTrue(np.allclose(uni.field.field_values[1], self.vals[1], atol=1e-3))
+
+    def test_hdf(self):
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, 'field.hdf5')
+        try:
+            self.field.to_hdf(path)
+            self.field.to_hdf(path, key='quant', dtype='int16')
+            field = AtomicField.from_hdf(path)
+            self.assertTrue(np.allclose(field.field_array, self.vals))
+            self.assertIsNone(field.field_scale)
+            quant = AtomicField.from_hdf(path, key='quant')
+            self.assertEqual(quant.field_array.dtype, np.int16)
+            self.assertTrue(np.allclose(quant.field_values[1], self.vals[1],
+                                        atol=quant.field_scale[1]))
+            self.assertEqual(len(quant), 3)
+            self.assertIsNone(quant._pyramid)
+            self.field.pyramid(2)
+            self.field.to_hdf(path)
+            field = AtomicField.from_hdf(path)
+            self.assertEqual(len(field._pyramid), 2)
+            self.assertTrue(np.allclose(field.pyramid(2)[1].field_array,
+                                        self.field.pyramid(2)[1].field_array))
+        finally:
+            os.remove(path)
+            os.rmdir(tmpdir)
+
+    def test_pyramid(self):
+        half, quarter = self.field.pyramid(2)
+        self.assertIs(self.field.pyramid(1)[0], half)
+        self.assertTrue((half[['nx', 'ny', 'nz']] == 3).all().all())
+        self.assertTrue((quarter[['nx', 'ny', 'nz']] == 2).all().all())
+        self.assertTrue(np.allclose(half['dxi'], 2 * self.fps['dxi']))
+        self.assertTrue(np.allclose(half['ox'], self.fps['ox'] + self.fps['dxi'] / 2))
+        block = self.vals[0].reshape(5, 5, 5)[:2, :2, :2].mean()
+        self.assertAlmostEqual(half.field_array[0, 0], block)
+        self.assertIs(self.field.coarsen(125), self.field)
+        self.assertIs(self.field.coarsen(30, levels=2), half)
+        self.assertIs(self.field.coarsen(1, levels=2), quarter)
+        quant = self.field.compact('int16').pyramid(1)[0]
+        self.assertEqual(quant.field_array.dtype, np.int16)
+        self.assertTrue(np.allclose(quant.field_values[1], half.field_values[1],
+                                    atol=quant.field_scale[1]))
+        self.field.field_values = self.vals * 2
+        self.assertTrue(np.allclose(self.field.pyramid(1)[0].field_array,
+                                    half.field_array * 2))
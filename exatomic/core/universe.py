@@ -12,6 +12,7 @@ simulations), step number (e.g. geometry optimization), or an arbitrary index
 (e.g. density functional theory exchange correlation functional).
 """
 import six
+import numpy as np
 import pandas as pd
 from exa import DataFrame, Container, TypedMeta
 from .frame import Frame, compute_frame_from_atom
@@ -20,10 +21,12 @@ from .two import (AtomTwo, MoleculeTwo, compute_atom_two,
                   _compute_bond_count, _compute_bonds)
 from .molecule import (Molecule, compute_molecule, compute_molecule_com,
                        compute_molecule_count)
-from .field import AtomicField
+from .field import AtomicField, _field_array
 from .orbital import Orbital, Excitation, MOMatrix, DensityMatrix
 from .basis import Overlap, BasisSet, BasisSetOrder
 from exatomic.algorithms.orbital import add_molecular_orbitals
+from exatomic.algorithms.numerical import Shells
+from exatomic.algorithms.integrals import multipole_matrix, lower_triangle
 
 
 class Meta(TypedMeta):
@@ -139,6 +142,24 @@ class Universe(six.with_metaclass(Meta, Container)):
         """Compute number of molecules per frame."""
         self.frame['molecule_count'] = compute_molecule_count(self)
 
+    def compute_multipole(self, frame=None, origin=(0.0, 0.0, 0.0)):
+        """
+        Compute the dipole integrals of the basis functions (columns ix1, ix2
+        and ix3, as parsed from outputs that print them), e.g. for
+        :meth:`~exatomic.core.orbital.Excitation.from_universe`.
+
+        Args
+            frame (int): frame of atomic positions (default last frame)
+            origin (array): origin of the dipole operator
+        """
+        for attr in ['basis_set', 'basis_set_order']:
+            if not hasattr(self, attr):
+                raise AttributeError("universe must have {} attribute.".format(attr))
+        frame = self.atom.nframes - 1 if frame is None else frame
+        shells = Shells.from_universe(self, frame=frame)
+        mats = multipole_matrix(shells, order=1, origin=origin)
+        self.multipole = lower_triangle(mats, ['ix1', 'ix2', 'ix3'], frame)
+
     # def compute_density(self, mocoefs=None, orbocc=None):
     #     """Compute density from momatrix and occupation vector."""
     #     if not hasattr(self, 'momatrix'):
@@ -174,7 +195,13 @@ class Universe(six.with_metaclass(Meta, Container)):
                 newdx = range(len(self.field), len(self.field) + len(field))
                 field.index = newdx
                 new_field = pd.concat([self.field, field])
-                self.field = AtomicField(new_field, field_values=new_field_values)
+                # Keep quantized fields quantized (if they can be stacked)
+                dtype = None
+                if (self.field.field_scale is not None and field.field_scale is not None
+                        and _field_array(new_field_values) is not None):
+                    dtype = np.int16
+                self.field = AtomicField(new_field, field_values=new_field_values,
+                                         dtype=dtype)
         elif isinstance(field, list):
             if not hasattr(self, 'field'):
                 fields = pd.concat(field)
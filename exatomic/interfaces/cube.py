@@ -32,6 +32,7 @@ class Cube(six.with_metaclass(Meta, Editor)):
         cube.field_values        # Displays the list of field values
         uni = cube.to_universe() # Converts the cube file editor to a universe
         uni                      # Renders the cube file
+        Cube('my.cube', dtype='float32')    # Store field values compactly
 
     Warning:
         Be sure your cube is in atomic units.
@@ -84,7 +85,7 @@ class Cube(six.with_metaclass(Meta, Editor)):
                     'dyi', 'dyj', 'dyk', 'dzi', 'dzj', 'dzk']:
             df[col] = df[col].astype(np.float64)
         fields = [Series(data[~np.isnan(data)])]
-        self.field = AtomicField(df, field_values=fields)
+        self.field = AtomicField(df, field_values=fields, dtype=self.dtype)
 
     @classmethod
     def from_universe(cls, uni, idx, name=None, frame=None):
@@ -130,9 +131,11 @@ class Cube(six.with_metaclass(Meta, Editor)):
     def __init__(self, *args, **kwargs):
         label = kwargs.pop("label", None)
         field_type = kwargs.pop("field_type", None)
+        dtype = kwargs.pop("dtype", None)
         super(Cube, self).__init__(*args, **kwargs)
         self.label = label
         self.field_type = field_type
+        self.dtype = dtype
 
 
 
@@ -10,8 +10,8 @@ import pandas as pd
 from exatomic import __version__
 from .editor import Editor
 from exatomic.core.orbital import DensityMatrix
-from exatomic.core.basis import (solid_harmonics, lorder,
-                                 cart_lml_count, spher_lml_count)
+from exatomic.core.basis import (lorder, cart_lml_count, spher_lml_count)
+from exatomic.algorithms.basis import sh_keys
 from itertools import combinations_with_replacement as cwr
 
 
@@ -51,8 +51,7 @@ $END"""
 
 def _nbo_labels():
     """Generate dataframes of NBO label, L, and ml or l, m, n."""
-    sph = pd.DataFrame(list(solid_harmonics(6).keys()),
-                       columns=('L', 'ml'))
+    sph = pd.DataFrame(sh_keys(6), columns=('L', 'ml'))
     # See the NBO 6.0 manual for more details
     # This is the basis function labeling scheme
     # In order of increasing ml from most negative
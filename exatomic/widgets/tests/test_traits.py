@@ -6,9 +6,11 @@ import numpy as np
 from unittest import TestCase
 
 from exatomic import XYZ
-from ..traits import (atom_traits, field_traits,
+from ..traits import (atom_traits, field_traits, contour_traits,
                       two_traits, frame_traits,
-                      uni_traits)
+                      uni_traits, mesh_traits)
+from exatomic.core.field import AtomicField
+from exatomic.algorithms.orbital_util import make_fps
 
 h2 = '''2
 
@@ -41,6 +43,28 @@ class TestTraits(TestCase):
     def test_field_traits(self):
         pass
 
+    def test_mesh_traits(self):
+        fps = make_fps(rmin=-2, rmax=2, nr=11)
+        vals = np.random.RandomState(0).normal(size=11**3)
+        mesh = mesh_traits(AtomicField(fps, field_values=[vals]), 0, [0.5, -0.5])
+        (iso0, nv0, nf0), (iso1, nv1, nf1) = mesh['mesh_n']
+        self.assertEqual((iso0, iso1), (0.5, -0.5))
+        verts = np.frombuffer(mesh['mesh_v'], dtype=np.float32)
+        faces = np.frombuffer(mesh['mesh_f'], dtype=np.uint32)
+        self.assertEqual(len(verts), 3 * (nv0 + nv1))
+        self.assertEqual(len(faces), 3 * (nf0 + nf1))
+        self.assertLess(faces[:3 * nf0].max(), nv0)
+
+    def test_contour_traits(self):
+        fps = make_fps(rmin=-2, rmax=2, nr=11)
+        vals = np.random.RandomState(0).normal(size=11**3)
+        cont = contour_traits(AtomicField(fps, field_values=[vals]), 0, 4,
+                              [-2, 0], 'y', 0.0)
+        self.assertEqual(len(cont['cont_n']), 8)
+        self.assertEqual(cont['cont_n'][0][0], -1.0)
+        verts = np.frombuffer(cont['cont_v'], dtype=np.float32)
+        self.assertEqual(len(verts), 6 * sum(n for lev, n in cont['cont_n']))
+
     def test_two_traits(self):
         two = two_traits(self.uni)
         self.assertEqual(two['two_b0'], '[[0]]')
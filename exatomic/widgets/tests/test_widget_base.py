@@ -3,9 +3,12 @@
 # Distributed under the terms of the Apache License 2.0
 
 import os
+import numpy as np
 from os.path import isfile, isdir, join, abspath
 import exatomic
 from unittest import TestCase
+from exatomic.core.field import AtomicField
+from exatomic.algorithms.orbital_util import make_fps
 
 from ..widget_base import ExatomicScene, UniverseScene, ExatomicBox, _scene_grid
 
@@ -58,10 +61,35 @@ class TestExatomicScene(TestCase):
 
 class TestUniverseScene(TestCase):
 
+    def setUp(self):
+        fps = make_fps(rmin=-2, rmax=2, nr=11)
+        vals = np.random.RandomState(0).normal(size=11**3)
+        self.scn = UniverseScene(uni_field=AtomicField(fps, field_values=[vals]),
+                                 field_i=[[0]], field_idx=0, field_iso=0.5,
+                                 field_mesh=True)
+        # Record the trait names synced to the front end
+        self.sent = []
+        self.scn.send_state = self._record
+
+    def _record(self, key=None):
+        self.sent.extend([key] if isinstance(key, str) else key or [])
+
     def test_traits(self):
         scn = UniverseScene(atom_x='[[0.0,0.0]]')
         self.assertEqual(scn.atom_x, '[[0.0,0.0]]')
 
+    def test_update_mesh(self):
+        self.scn.field_show = True
+        self.assertGreater(len(self.scn.mesh_v), 0)
+        for name in ['mesh_v', 'mesh_f', 'mesh_n']:
+            self.assertIn(name, self.sent)
+
+    def test_update_contour(self):
+        self.scn.cont_show = True
+        self.assertGreater(len(self.scn.cont_v), 0)
+        for name in ['cont_v', 'cont_n']:
+            self.assertIn(name, self.sent)
+
 
 class TestExatomicBox(TestCase):
 
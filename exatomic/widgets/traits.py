@@ -14,6 +14,7 @@ import numpy as np
 import pandas as pd
 
 from exatomic.base import sym2radius, sym2color
+from exatomic.algorithms.isosurface import contour_levels
 
 
 
@@ -67,8 +68,8 @@ def atom_traits(df, atomcolors=None, atomradii=None):
     traits['atom_c'] = {i: colors[v] for i, v in symmap.items()}
     return traits
 
-def field_traits(df):
-    """Get field table traits."""
+def field_traits(df, values=True):
+    """Get field table traits (without the field values if values is False)."""
     df['frame'] = df['frame'].astype(int)
     df['nx'] = df['nx'].astype(int)
     df['ny'] = df['ny'].astype(int)
@@ -89,10 +90,38 @@ def field_traits(df):
     # for i in range(shape0):
     #     vals[i] = df.field_values[i].values
     # '[' + ','.join(listcomp) + ']'
-    vals = [f.to_json(orient='values',
-                      double_precision=5) for f in df.field_values]
+    vals = []
+    if values:
+        vals = [f.to_json(orient='values',
+                          double_precision=5) for f in df.field_values]
     return {'field_v': vals, 'field_i': idxs, 'field_p': fps}
 
+
+def mesh_traits(field, idx, isovalues):
+    """
+    Get isosurface traits of a field: vertices (float32) and faces (uint32,
+    numbered per surface) of all surfaces as binary buffers, and the
+    isovalue, number of vertices and number of faces of each surface.
+    """
+    meshes = field.isosurfaces(idx, isovalues)
+    counts = [[float(iso), len(v), len(f)]
+              for iso, (v, f) in zip(np.atleast_1d(isovalues), meshes)]
+    verts = np.concatenate([v for v, f in meshes]).astype(np.float32)
+    faces = np.concatenate([f for v, f in meshes]).astype(np.uint32)
+    return {'mesh_v': verts.tobytes(), 'mesh_f': faces.tobytes(), 'mesh_n': counts}
+
+
+def contour_traits(field, idx, num, lims, axis, value):
+    """
+    Get contour traits of a field slice: segment end points (float32) of all
+    levels as a binary buffer, and the level and number of segments of each
+    contour (negative levels first).
+    """
+    levels = contour_levels(num, lims)
+    segs, ptr = field.contours(idx, levels, axis=axis, value=value)
+    counts = [[float(lev), int(n)] for lev, n in zip(levels, np.diff(ptr))]
+    return {'cont_v': segs.astype(np.float32).tobytes(), 'cont_n': counts}
+
 #def two_traits(df, lbls):
 def two_traits(uni):
     """Get two table traitlets."""
@@ -131,8 +160,12 @@ def frame_traits(uni):
     return {}
 
 
-def uni_traits(uni, atomcolors=None, atomradii=None):
-    """Get Universe traits."""
+def uni_traits(uni, atomcolors=None, atomradii=None, mesh=False):
+    """
+    Get Universe traits. If mesh is True, field values are not sent to the
+    browser; isosurfaces are extracted in Python (see
+    :func:`~exatomic.widgets.traits.mesh_traits`) instead.
+    """
     unargs = {}
     fields = []
     if hasattr(uni, 'atom'):
@@ -140,6 +173,8 @@ def uni_traits(uni, atomcolors=None, atomradii=None):
     if hasattr(uni, 'atom_two'):
         unargs.update(two_traits(uni))
     if hasattr(uni, 'field'):
-        unargs.update(field_traits(uni.field))
+        unargs.update(field_traits(uni.field, values=not mesh))
         fields = ['null'] + unargs['field_i'][0]
+        if mesh:
+            unargs.update({'field_mesh': True, 'uni_field': uni.field})
     return unargs, fields
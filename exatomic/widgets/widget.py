@@ -383,11 +383,14 @@ class UniverseWidget(ExatomicBox):
         scenekwargs.update({'uni': True, 'test': False})
         atomcolors = scenekwargs.get('atomcolors', None)
         atomradii = scenekwargs.get('atomradii', None)
+        # Extract isosurfaces in Python and only send meshes to the browser
+        mesh = kwargs.pop('mesh', False)
         fields, masterkwargs = [], []
         for uni in unis:
             unargs, flds = uni_traits(uni,
                                       atomcolors=atomcolors,
-                                      atomradii=atomradii)
+                                      atomradii=atomradii,
+                                      mesh=mesh)
             fields = flds if len(flds) > len(fields) else fields
             unargs.update(scenekwargs)
             masterkwargs.append(unargs)
@@ -8,8 +8,8 @@ Universe Notebook Widget
 import os
 import numpy as np
 from base64 import b64decode
-from traitlets import (Bool, Int, Float, Unicode,
-                       List, Any, Dict, Instance, link)
+from traitlets import (Bool, Int, Float, Unicode, Bytes,
+                       List, Any, Dict, Instance, link, observe)
                        # Unused == Any, Instance
 
 from ipywidgets import (
@@ -20,7 +20,7 @@ from ipywidgets import (
     # FloatSlider, Play, IntRangeSlider, Dropdown, jslink
 )
 from exatomic import Universe, __js_version__
-from .traits import uni_traits
+from .traits import uni_traits, mesh_traits, contour_traits
 from .widget_utils import (_glo, _flo, _wlo, _hboxlo, _vboxlo, _bboxlo,
                            _ListDict, Folder, GUIBox, gui_field_widgets)
 
@@ -203,8 +203,69 @@ class UniverseScene(ExatomicScene):
     cont_num = Int(10).tag(sync=True)
     cont_lim = List([-8, -1]).tag(sync=True)
     cont_val = Float(0.0).tag(sync=True)
+    # Isosurfaces extracted in Python (binary buffers)
+    field_mesh = Bool(False).tag(sync=True)
+    mesh_v = Bytes().tag(sync=True)
+    mesh_f = Bytes().tag(sync=True)
+    mesh_n = List().tag(sync=True)
+    # Voxels per field (coarse pyramid level) of the field shown, 0 for all
+    field_budget = Int(0).tag(sync=True)
+    cont_v = Bytes().tag(sync=True)
+    cont_n = List().tag(sync=True)
     # Frame traits
 
+    def _field_position(self):
+        """Position of the current field in uni_field (None if not selected)."""
+        if self.field_idx is None or self.field_idx == 'null':
+            return None
+        try:
+            idx = self.field_i[self.frame_idx][int(self.field_idx)]
+        except IndexError:
+            return None
+        return list(self.uni_field.index).index(idx)
+
+    def _scene_field(self):
+        """
+        The field to extract surfaces and contours from: the finest pyramid
+        level within field_budget voxels (if set), else the full field.
+        """
+        if self.field_budget:
+            return self.uni_field.coarsen(self.field_budget)
+        return self.uni_field
+
+    @observe('field_idx', 'field_iso', 'field_show', 'frame_idx', 'field_budget')
+    def _update_mesh(self, change):
+        """Extract the (positive and negative) isosurfaces of the current field."""
+        if not (self.field_mesh and self.field_show) or self.uni_field is None:
+            return
+        idx = self._field_position()
+        if idx is None:
+            return
+        traits = mesh_traits(self._scene_field(), idx,
+                             [self.field_iso, -self.field_iso])
+        with self.hold_sync():
+            for name, value in traits.items():
+                setattr(self, name, value)
+
+    @observe('field_idx', 'frame_idx', 'cont_show', 'cont_axis', 'cont_num',
+             'cont_lim', 'cont_val', 'field_budget')
+    def _update_contour(self, change):
+        """Compute the contour lines of a slice of the current field."""
+        if not (self.field_mesh and self.cont_show) or self.uni_field is None:
+            return
+        idx = self._field_position()
+        if idx is None:
+            return
+        traits = contour_traits(self._scene_field(), idx, self.cont_num,
+                                self.cont_lim, self.cont_axis, self.cont_val)
+        with self.hold_sync():
+            for name, value in traits.items():
+                setattr(self, name, value)
+
+    def __init__(self, *args, **kwargs):
+        self.uni_field = kwargs.pop('uni_field', None)
+        super(UniverseScene, self).__init__(*args, **kwargs)
+
 
 
 @register
@@ -635,6 +635,34 @@ class App3D {
         return meshes;
     };
 
+    add_contour_buffers(verts, counts, colors) {
+        /*"""
+        add_contour_buffers
+        ------------------------
+        Create contour lines from a buffer of line segment end points
+        computed in Python; counts holds the level and number of segments
+        of each contour (in buffer order).
+        */
+        var meshes = [];
+        var off = 0;
+        for (var i = 0; i < counts.length; i++) {
+            var lev = counts[i][0];
+            var n = counts[i][1];
+            if (n) {
+                var geom = new THREE.BufferGeometry();
+                geom.addAttribute("position", new THREE.BufferAttribute(
+                    verts.subarray(6 * off, 6 * (off + n)), 3));
+                var color = (lev < 0) ? colors["neg"] : colors["pos"];
+                var mesh = new THREE.LineSegments(geom,
+                    new THREE.LineBasicMaterial({color: color, linewidth: 4}));
+                mesh.name = lev.toFixed(6);
+                meshes.push(mesh);
+            };
+            off += n;
+        };
+        return meshes;
+    };
+
     add_scalar_field(field, iso, opac, sides, colors) {
         /*"""
         add_scalar_field
@@ -656,6 +684,48 @@ class App3D {
         return meshes;
     };
 
+    add_mesh_buffers(verts, faces, counts, opac, colors) {
+        /*"""
+        add_mesh_buffers
+        -------------------------
+        Create isosurface meshes from vertex and face buffers extracted in
+        Python; counts holds the isovalue, number of vertices and number of
+        faces of each surface (in buffer order).
+        */
+        var meshes = [];
+        var voff = 0;
+        var foff = 0;
+        for (var i = 0; i < counts.length; i++) {
+            var iso = counts[i][0];
+            var nv = counts[i][1];
+            var nf = counts[i][2];
+            if (nf) {
+                var geom = new THREE.BufferGeometry();
+                geom.addAttribute("position", new THREE.BufferAttribute(
+                    verts.subarray(3 * voff, 3 * (voff + nv)), 3));
+                geom.setIndex(new THREE.BufferAttribute(
+                    faces.subarray(3 * foff, 3 * (foff + nf)), 1));
+                geom.computeVertexNormals();
+                var color = (iso < 0) ? colors["neg"] : colors["pos"];
+                var mesh = new THREE.Mesh(geom,
+                    new THREE.MeshPhongMaterial({
+                        color: color,
+                        specular: color,
+                        side: THREE.DoubleSide,
+                        shininess: 15,
+                        transparent: true,
+                        opacity: opac,
+                        reflectivity: 0.8
+                    }));
+                mesh.name = iso;
+                meshes.push(mesh);
+            };
+            voff += nv;
+            foff += nf;
+        };
+        return meshes;
+    };
+
     march_cubes1(field, iso, opac) {
         var start = new Date().getTime();
         var nnx = field.nx - 1;
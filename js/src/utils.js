@@ -88,6 +88,15 @@ var mesolv = function(obj, key) {
 };
 
 
+var buffer_view = function(buf, type) {
+    // View a binary buffer (DataView or ArrayBuffer) as a typed array
+    if (buf instanceof DataView) {
+        return new type(buf.buffer, buf.byteOffset,
+                        buf.byteLength / type.BYTES_PER_ELEMENT);
+    };
+    return new type(buf);
+};
+
 var linspace = function(min, max, n) {
     var n1 = n - 1;
     var step = (max - min) / n1;
@@ -453,6 +462,7 @@ module.exports = {
     repeat_obj: repeat_obj,
     factorial2: factorial2,
     linspace: linspace,
+    buffer_view: buffer_view,
     mapper: mapper,
     scalar_field: scalar_field,
     SolidHarmonic: SolidHarmonic,
@@ -90,6 +90,7 @@ var UniverseSceneView = base.ExatomicSceneView.extend({
     add_field: function() {
         this.app3d.clear_meshes("field");
         if (!this.model.get("field_show")) { return };
+        if (this.model.get("field_mesh")) { return this.add_field_mesh() };
         var fldx = this.model.get("field_idx");
         if (fldx === "null") { return };
         var fdx = this.model.get("frame_idx");
@@ -123,9 +124,23 @@ var UniverseSceneView = base.ExatomicSceneView.extend({
         };
     },
 
+    add_field_mesh: function() {
+        // Isosurfaces extracted in Python and shipped as binary buffers
+        this.app3d.clear_meshes("field");
+        if (!this.model.get("field_show")) { return };
+        var counts = this.model.get("mesh_n");
+        if (!counts.length) { return };
+        var verts = utils.buffer_view(this.model.get("mesh_v"), Float32Array);
+        var faces = utils.buffer_view(this.model.get("mesh_f"), Uint32Array);
+        this.app3d.meshes["field"] = this.app3d.add_mesh_buffers(
+            verts, faces, counts, this.model.get("field_o"), this.colors());
+        this.app3d.add_meshes("field");
+    },
+
     add_contour: function() {
         this.app3d.clear_meshes("contour");
         if (!this.model.get("cont_show")) { return };
+        if (this.model.get("field_mesh")) { return this.add_contour_buffers() };
         var fldx = this.model.get("field_idx");
         // Specifically test for string null
         if (fldx === "null") { return };
@@ -163,6 +178,18 @@ var UniverseSceneView = base.ExatomicSceneView.extend({
         };
     },
 
+    add_contour_buffers: function() {
+        // Contour lines computed in Python and shipped as a binary buffer
+        this.app3d.clear_meshes("contour");
+        if (!this.model.get("cont_show")) { return };
+        var counts = this.model.get("cont_n");
+        if (!counts.length) { return };
+        var verts = utils.buffer_view(this.model.get("cont_v"), Float32Array);
+        this.app3d.meshes["contour"] = this.app3d.add_contour_buffers(
+            verts, counts, this.colors());
+        this.app3d.add_meshes("contour");
+    },
+
     add_axis: function() {
         this.app3d.clear_meshes("generic");
         if (this.model.get("axis")) {
@@ -178,12 +205,14 @@ var UniverseSceneView = base.ExatomicSceneView.extend({
         this.listenTo(this.model, "change:atom_3d", this.add_atom);
         this.listenTo(this.model, "change:field_idx", this.add_field);
         this.listenTo(this.model, "change:field_show", this.add_field);
+        this.listenTo(this.model, "change:mesh_n", this.add_field_mesh);
         this.listenTo(this.model, "change:field_idx", this.add_contour);
         this.listenTo(this.model, "change:cont_show", this.add_contour);
         this.listenTo(this.model, "change:cont_axis", this.add_contour);
         this.listenTo(this.model, "change:cont_num", this.add_contour);
         this.listenTo(this.model, "change:cont_lim", this.add_contour);
         this.listenTo(this.model, "change:cont_val", this.add_contour);
+        this.listenTo(this.model, "change:cont_n", this.add_contour_buffers);
         this.listenTo(this.model, "change:atom_3d", this.add_axis);
         this.listenTo(this.model, "change:axis", this.add_axis);
     }